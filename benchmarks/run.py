@@ -0,0 +1,244 @@
+"""
+Benchmarks icon-cli against a local mock ICON node and tracker.
+
+Run from the repository root:
+
+    python -m benchmarks.run
+    python -m benchmarks.run --latency 20 --output results.json
+    python -m benchmarks.run --baseline results.json
+
+Every benchmark is run `--repeat` times against tests.mock_node.MockIconNode and the
+fastest run is reported. With `--baseline`, the exit status is 1 if any benchmark is
+more than `--tolerance` slower than in the baseline file.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+from icon_cli.cache import Cache
+from tests.mock_node import MockIconNode
+
+NETWORK = "mainnet"
+
+# Map of benchmark name to a function that runs it against a mock node and returns the
+# number of operations it performed.
+BENCHMARKS: Dict[str, Callable[[MockIconNode], int]] = {}
+
+
+def benchmark(name: str):
+    def register(function: Callable[[MockIconNode], int]):
+        BENCHMARKS[name] = function
+        return function
+
+    return register
+
+
+###########
+# STARTUP #
+###########
+
+
+@benchmark("startup.import_main")
+def bench_import_main(node: MockIconNode) -> int:
+    subprocess.run([sys.executable, "-c", "import icon_cli.main"], check=True)
+    return 1
+
+
+@benchmark("startup.query_help")
+def bench_query_help(node: MockIconNode) -> int:
+    code = "import sys; from icon_cli.main import app; sys.argv = ['icon', 'query', '--help']; app()"  # fmt: skip
+    subprocess.run([sys.executable, "-c", code], check=True, stdout=subprocess.DEVNULL)
+    return 1
+
+
+############
+# IcxQuery #
+############
+
+
+@benchmark("query.get_balance")
+def bench_get_balance(node: MockIconNode) -> int:
+    from icon_cli.icx import IcxQuery
+
+    icx = IcxQuery(NETWORK)
+    for i in range(100):
+        icx.get_balance(f"hx{i:040x}")
+    return 100
+
+
+@benchmark("query.get_balances_batch")
+def bench_get_balances(node: MockIconNode) -> int:
+    from icon_cli.icx import IcxQuery
+
+    addresses = [f"hx{i:040x}" for i in range(1000)]
+    IcxQuery(NETWORK).get_balances(addresses, chunk_size=100)
+    return len(addresses)
+
+
+@benchmark("query.batch_calls_concurrent")
+def bench_batch_calls(node: MockIconNode) -> int:
+    from icon_cli.icx import IcxQuery
+
+    token = "cx" + "1" * 40
+    with IcxQuery(NETWORK).batch(100, concurrency=4) as batch:
+        for i in range(1000):
+            batch.call(token, "balanceOf", {"_owner": f"hx{i:040x}"})
+    return len(batch)
+
+
+@benchmark("query.iter_blocks")
+def bench_iter_blocks(node: MockIconNode) -> int:
+    from icon_cli.icx import IcxQuery
+
+    start = node.height - 1999
+    blocks = IcxQuery(NETWORK).iter_blocks(start, node.height, chunk_size=100)
+    return sum(1 for _ in blocks)
+
+
+#########
+# IcxTx #
+#########
+
+
+@benchmark("tx.send_transaction")
+def bench_send_transaction(node: MockIconNode) -> int:
+    icx = _get_icx_tx()
+    for i in range(50):
+        icx.send_transaction(icx.build_transaction(f"hx{i:040x}", 1, nonce=i))
+    return 50
+
+
+@benchmark("tx.bulk_send")
+def bench_bulk_send(node: MockIconNode) -> int:
+    from icon_cli.bulk import BulkSender
+
+    rows = [{"index": i, "to": f"hx{i:040x}", "value": 1, "method": None, "params": {}} for i in range(200)]  # fmt: skip
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        BulkSender(_get_icx_tx(), Path(tmp_dir) / "results.jsonl").send(rows)
+    return len(rows)
+
+
+#######
+# Cps #
+#######
+
+
+@benchmark("cps.get_active_proposals")
+def bench_cps_active_proposals(node: MockIconNode) -> int:
+    from icon_cli.cps import Cps
+
+    return len(Cps(NETWORK).get_active_proposals())
+
+
+@benchmark("cps.get_snapshot")
+def bench_cps_snapshot(node: MockIconNode) -> int:
+    from icon_cli.cps import Cps
+
+    return len(Cps(NETWORK).get_snapshot()["active_proposals"])
+
+
+###########
+# Tracker #
+###########
+
+
+@benchmark("tracker.iter_address_transactions")
+def bench_tracker_transactions(node: MockIconNode) -> int:
+    from icon_cli.tracker import Tracker
+
+    address = "hx" + "1" * 40
+    return sum(1 for _ in Tracker(NETWORK).iter_address_transactions(address))
+
+
+##############################
+# INTERNAL UTILITY FUNCTIONS #
+##############################
+
+
+def _get_icx_tx():
+    from iconsdk.wallet.wallet import KeyWallet
+
+    from icon_cli.icx import IcxTx
+
+    # Skip the keystore file and password prompt with a throwaway wallet.
+    wallet = KeyWallet.create()
+    load_keystore = IcxTx._load_keystore
+    IcxTx._load_keystore = staticmethod(lambda name, password: wallet)
+    try:
+        return IcxTx(NETWORK, "benchmark", None)
+    finally:
+        IcxTx._load_keystore = load_keystore
+
+
+def run(names: list, latency: float, repeat: int) -> Dict[str, dict]:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Responses at fixed heights would be cached after the first run, so every
+        # run starts from an empty cache of its own.
+        Cache.CACHE_FILE = f"{tmp_dir}/cache.db"
+        with MockIconNode(NETWORK, latency=latency, contributors=50, tracker_transactions=1000) as node:  # fmt: skip
+            for name in names:
+                timings = []
+                for _ in range(repeat):
+                    Cache.clear()
+                    node.reset_counters()
+                    started_at = time.perf_counter()
+                    operations = BENCHMARKS[name](node)
+                    timings.append(time.perf_counter() - started_at)
+                seconds = min(timings)
+                results[name] = {
+                    "seconds": round(seconds, 6),
+                    "operations": operations,
+                    "operations_per_second": round(operations / seconds, 2),
+                    "http_requests": node.http_requests,
+                }
+    return results
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> list:  # fmt: skip
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result["seconds"] / baseline[name]["seconds"]
+        if ratio > 1 + tolerance:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark icon-cli against a local mock ICON node.")  # fmt: skip
+    parser.add_argument("names", nargs="*", help="Benchmarks to run, or name prefixes (e.g. query). Defaults to all.")  # fmt: skip
+    parser.add_argument("--latency", type=float, default=0, help="Latency of every mock node request in milliseconds.")  # fmt: skip
+    parser.add_argument("--repeat", type=int, default=3, help="The number of runs per benchmark.")  # fmt: skip
+    parser.add_argument("--output", type=Path, help="Write the results to a JSON file.")  # fmt: skip
+    parser.add_argument("--baseline", type=Path, help="A JSON file of earlier results to compare against.")  # fmt: skip
+    parser.add_argument("--tolerance", type=float, default=0.25, help="The allowed slowdown against the baseline (0.25 is 25%%).")  # fmt: skip
+    args = parser.parse_args()
+
+    names = [name for name in BENCHMARKS if not args.names or name.startswith(tuple(args.names))]  # fmt: skip
+    results = run(names, args.latency / 1000, args.repeat)
+
+    print(f"{'benchmark':<40} {'seconds':>10} {'ops/s':>12} {'requests':>9}")
+    for name, result in results.items():
+        print(f"{name:<40} {result['seconds']:>10.4f} {result['operations_per_second']:>12.1f} {result['http_requests']:>9}")  # fmt: skip
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.baseline is not None:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)  # fmt: skip
+        for name, ratio in regressions:
+            print(f"REGRESSION: {name} is {ratio:.2f}x slower than the baseline.")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -21,6 +21,7 @@ DEFAULT_NETWORKS = {
     "mainnet": IcxNetwork(
         name="mainnet",
         api_endpoint="https://api.icon.community",
+        api_endpoints=["https://ctz.solidwallet.io"],
         nid=1,
         tracker_endpoint="https://tracker.icon.community",
     ),
@@ -94,10 +95,14 @@ def initialize() -> None:
         with open(CONFIG_FILE, "w+", encoding="utf-8") as f:
             yaml.safe_dump(DEFAULT_CONFIG.dict(), f)
 
-    with open(CONFIG_FILE, "r") as f:
-        config = yaml.safe_load(f)
 
-    return AppConfig(**config)
+def __getattr__(name: str):
+    # CONFIG is loaded on first access through Config, which caches the parsed file.
+    if name == "CONFIG":
+        from icon_cli.config import Config
 
+        return Config.read_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-CONFIG = initialize()
+
+initialize()
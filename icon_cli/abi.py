@@ -0,0 +1,197 @@
+import time
+from typing import Callable, Dict, List
+
+from icon_cli.cache import Cache
+from icon_cli.config import Config
+from icon_cli.contracts import Contracts
+from icon_cli.decoder import Decoder
+from icon_cli.icx import IcxQuery
+
+
+class AbiCache:
+    """
+    Caches contract ABIs per network and contract, together with a precompiled table
+    of each method's inputs, so repeated calls to the same contract don't fetch and
+    parse the ABI again.
+
+    A cached ABI is trusted for `abi_cache_ttl` seconds from config.yml. After that it's
+    revalidated by comparing the contract's current deploy transaction hash from the
+    chain SCORE's `getScoreStatus`, and only fetched again if the contract was updated.
+    """
+
+    # The pseudo JSON-RPC method name that ABI entries are stored under in the Cache.
+    CACHE_METHOD = "abi"
+
+    # Functions that convert a user-supplied string to the type an ABI input expects.
+    COERCERS = {
+        "Address": lambda value: AbiCache._to_address(value),
+        "bool": lambda value: AbiCache._to_bool(value),
+        "bytes": lambda value: value if value.startswith("0x") else f"0x{value.encode().hex()}",  # fmt: skip
+        "int": lambda value: AbiCache._to_int(value),
+        "str": str,
+    }
+
+    # Entries loaded in this process, keyed by network and contract address.
+    _entries = {}
+
+    def __init__(self) -> None:
+        pass
+
+    @classmethod
+    def get_abi(cls, icx: IcxQuery, contract_address: str) -> List[dict]:
+        """
+        Returns the ABI of a contract from the cache, fetching it if it isn't cached
+        or the contract was updated.
+
+        Args:
+            icx: An IcxQuery object for the contract's network.
+            contract_address: An ICON contract address.
+        """
+        return cls._get_entry(icx, contract_address)["abi"]
+
+    @classmethod
+    def get_methods(
+        cls,
+        icx: IcxQuery,
+        contract_address: str,
+        readonly: bool = False,
+    ) -> Dict[str, dict]:
+        """
+        Returns a dictionary of method name to method for the readonly or writable
+        methods of a contract, in alphabetical order. Each method has "name",
+        "readonly", "payable" and "inputs" keys, and each input has "name", "type" and
+        "optional" keys.
+
+        Args:
+            icx: An IcxQuery object for the contract's network.
+            contract_address: An ICON contract address.
+            readonly: Return readonly methods instead of writable methods.
+        """
+        methods = cls._get_entry(icx, contract_address)["methods"]
+        return {name: method for name, method in methods.items() if method["readonly"] is readonly}  # fmt: skip
+
+    @classmethod
+    def get_decoder(cls, icx: IcxQuery, contract_address: str, method: str) -> Callable:  # fmt: skip
+        """
+        Returns a function that decodes the result of a readonly method with
+        `Decoder.from_abi()`. Results of methods that aren't in the ABI are returned as
+        they are.
+
+        Args:
+            icx: An IcxQuery object for the contract's network.
+            contract_address: An ICON contract address.
+            method: The name of the readonly method.
+        """
+        for item in cls.get_abi(icx, contract_address):
+            if item["type"] == "function" and item["name"] == method:
+                return Decoder.from_abi(item)
+        return Decoder.from_abi({})
+
+    @classmethod
+    def coerce(cls, param_type: str, value: str):
+        """
+        Converts a user-supplied string to the type of an ABI input. Raises a
+        ValueError if the value is invalid for the type.
+
+        Args:
+            param_type: The type of an ABI input (e.g. "Address" or "int").
+            value: The user-supplied value.
+        """
+        coercer = cls.COERCERS.get(param_type, str)
+        return coercer(value.strip())
+
+    @classmethod
+    def compile_methods(cls, abi: List[dict]) -> Dict[str, dict]:
+        """
+        Returns a dictionary of method name to method for every function in an ABI,
+        in alphabetical order.
+
+        Args:
+            abi: The ABI of a contract.
+        """
+        methods = {}
+        for item in sorted(abi, key=lambda item: item["name"]):
+            if item["type"] != "function":
+                continue
+            methods[item["name"]] = {
+                "name": item["name"],
+                "readonly": item.get("readonly") in ("0x1", True),
+                "payable": item.get("payable") in ("0x1", True),
+                "inputs": [
+                    {
+                        "name": param["name"],
+                        "type": param["type"],
+                        "optional": "default" in param,
+                    }
+                    for param in item.get("inputs", [])
+                ],
+            }
+        return methods
+
+    ##############################
+    # INTERNAL UTILITY FUNCTIONS #
+    ##############################
+
+    @classmethod
+    def _get_entry(cls, icx: IcxQuery, contract_address: str) -> dict:
+        key = (icx.network, contract_address)
+        entry = cls._entries.get(key)
+        if entry is None and Cache.enabled is True:
+            hit, entry = Cache.get(icx.network, cls.CACHE_METHOD, {"address": contract_address})  # fmt: skip
+        if entry is not None and time.time() - entry["validated_at"] < cls._get_ttl():
+            cls._entries[key] = entry
+            return entry
+
+        deploy_tx_hash = cls._get_deploy_tx_hash(icx, contract_address)
+        if entry is None or deploy_tx_hash is None or entry["deploy_tx_hash"] != deploy_tx_hash:  # fmt: skip
+            abi = icx.get_score_api(contract_address)
+            entry = {
+                "abi": abi,
+                "methods": cls.compile_methods(abi),
+                "deploy_tx_hash": deploy_tx_hash,
+            }
+        entry["validated_at"] = time.time()
+
+        cls._entries[key] = entry
+        if Cache.enabled is True:
+            Cache.set(icx.network, cls.CACHE_METHOD, {"address": contract_address}, entry)  # fmt: skip
+        return entry
+
+    @staticmethod
+    def _get_deploy_tx_hash(icx: IcxQuery, contract_address: str) -> str:
+        from iconsdk.exception import JSONRPCException
+
+        chain_address = Contracts.get_contract_address_from_name("chain", icx.network)
+        try:
+            status = icx.call(chain_address, "getScoreStatus", {"address": contract_address})  # fmt: skip
+        except JSONRPCException:
+            # Without a deploy hash the ABI is always fetched again after the TTL.
+            return None
+        return status.get("current", {}).get("deployTxHash")
+
+    @staticmethod
+    def _get_ttl() -> int:
+        return Config.read_config().abi_cache_ttl
+
+    @staticmethod
+    def _to_address(value: str) -> str:
+        value = value.casefold()
+        if len(value) != 42 or value[:2] not in ("cx", "hx"):
+            raise ValueError(f"{value} is not a valid address.")
+        return value
+
+    @staticmethod
+    def _to_int(value: str) -> int:
+        # Hex with a 0x prefix after the sign, and decimal otherwise, so a leading zero
+        # ("010") is decimal rather than an error like int(value, 0).
+        if value.lstrip("+-")[:2].casefold() == "0x":
+            return int(value, 16)
+        return int(value)
+
+    @staticmethod
+    def _to_bool(value: str) -> bool:
+        if value.casefold() in ("1", "0x1", "true", "yes", "y"):
+            return True
+        if value.casefold() in ("0", "0x0", "false", "no", "n"):
+            return False
+        raise ValueError(f"{value} is not a valid bool.")
@@ -0,0 +1,188 @@
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+
+from icon_cli import CONFIG_DIR
+
+AGENT_SOCKET = f"{CONFIG_DIR}/agent.sock"
+
+
+class SigningAgent:
+    """
+    Holds decrypted keystores in memory and signs transaction hashes for clients that
+    connect to a Unix socket, so the keystore KDF only runs once per agent session.
+
+    The agent shuts itself down and drops its keys once its TTL expires.
+    """
+
+    DEFAULT_TTL = 3600
+
+    def __init__(
+        self,
+        wallets: dict,
+        ttl: int = DEFAULT_TTL,
+        socket_path: str = AGENT_SOCKET,
+    ) -> None:
+        self.wallets = wallets
+        self.ttl = ttl
+        self.socket_path = socket_path
+        self.expires_at = time.time() + ttl
+        self.server = None
+
+    def serve_forever(self) -> None:
+        """
+        Listens on the agent socket until the TTL expires or a client sends "stop".
+        """
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+        agent = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                try:
+                    request = json.loads(self.rfile.readline())
+                    response = agent.handle_request(request)
+                except Exception as e:
+                    response = {"error": str(e)}
+                self.wfile.write(json.dumps(response).encode() + b"\n")
+
+        # Only the current user may connect to the socket.
+        old_umask = os.umask(0o177)
+        try:
+            self.server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)  # fmt: skip
+        finally:
+            os.umask(old_umask)
+
+        timer = threading.Timer(self.ttl, self.stop)
+        timer.daemon = True
+        timer.start()
+        try:
+            self.server.serve_forever()
+        finally:
+            timer.cancel()
+            self.server.server_close()
+            self.wallets.clear()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    def stop(self) -> None:
+        # shutdown() blocks until serve_forever() returns, so call it from another thread.
+        threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+    def handle_request(self, request: dict) -> dict:
+        """
+        Handles a single client request.
+
+        Args:
+            request: A dictionary with an "action" key ("status", "address", "sign" or
+                "stop") and the arguments for that action.
+        """
+        action = request.get("action")
+        if action == "status":
+            return {
+                "pid": os.getpid(),
+                "keystores": {name: wallet.get_address() for name, wallet in self.wallets.items()},  # fmt: skip
+                "expires_at": int(self.expires_at),
+            }
+        elif action == "stop":
+            self.stop()
+            return {"stopped": True}
+
+        wallet = self.wallets.get(request.get("keystore"))
+        if wallet is None:
+            return {"error": f"{request.get('keystore')} is not loaded in the agent."}
+        if action == "address":
+            return {"address": wallet.get_address()}
+        elif action == "sign":
+            # Only sign 32-byte transaction hashes, never arbitrary payloads.
+            data = bytes.fromhex(request["data"])
+            if len(data) != 32:
+                return {"error": "The agent only signs 32-byte hashes."}
+            return {"signature": wallet.sign(data).hex()}
+        return {"error": f"{action} is not a supported action."}
+
+
+class AgentWallet:
+    """
+    A wallet that asks the signing agent to sign on its behalf. It implements the same
+    interface as iconsdk's KeyWallet for signing transactions.
+    """
+
+    def __init__(
+        self,
+        keystore_name: str,
+        address: str,
+        socket_path: str = AGENT_SOCKET,
+    ) -> None:
+        self.keystore_name = keystore_name
+        self.address = address
+        self.socket_path = socket_path
+
+    def get_address(self) -> str:
+        return self.address
+
+    def sign(self, data: bytes) -> bytes:
+        payload = {"action": "sign", "keystore": self.keystore_name, "data": data.hex()}
+        response = AgentClient.request(payload, self.socket_path)
+        if "error" in response:
+            raise RuntimeError(f"Signing agent error: {response['error']}")
+        return bytes.fromhex(response["signature"])
+
+
+class AgentClient:
+    def __init__(self) -> None:
+        pass
+
+    @staticmethod
+    def request(payload: dict, socket_path: str = AGENT_SOCKET) -> dict:
+        """
+        Sends a request to the signing agent and returns its response.
+
+        Args:
+            payload: The request to send.
+            socket_path: Path to the agent's Unix socket.
+        """
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(10)
+            s.connect(socket_path)
+            s.sendall(json.dumps(payload).encode() + b"\n")
+            with s.makefile("rb") as f:
+                return json.loads(f.readline())
+
+    @classmethod
+    def get_status(cls, socket_path: str = AGENT_SOCKET) -> dict:
+        """
+        Returns the agent's status, or None if no agent is running.
+
+        Args:
+            socket_path: Path to the agent's Unix socket.
+        """
+        if not os.path.exists(socket_path):
+            return None
+        try:
+            return cls.request({"action": "status"}, socket_path)
+        except (OSError, ValueError):
+            return None
+
+    @classmethod
+    def get_wallet(cls, keystore_name: str, socket_path: str = AGENT_SOCKET) -> AgentWallet:  # fmt: skip
+        """
+        Returns an AgentWallet if a running agent holds the keystore, and None otherwise.
+
+        Args:
+            keystore_name: The name of an imported keystore.
+            socket_path: Path to the agent's Unix socket.
+        """
+        if not os.path.exists(socket_path):
+            return None
+        try:
+            response = cls.request({"action": "address", "keystore": keystore_name}, socket_path)  # fmt: skip
+        except (OSError, ValueError):
+            return None
+        if "address" not in response:
+            return None
+        return AgentWallet(keystore_name, response["address"], socket_path)
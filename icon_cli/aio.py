@@ -0,0 +1,358 @@
+import asyncio
+import copy
+import time
+from decimal import Decimal
+from json import JSONDecodeError
+
+import aiohttp
+from iconsdk.builder.transaction_builder import Transaction
+from iconsdk.exception import JSONRPCException
+from iconsdk.signed_transaction import SignedTransaction
+from iconsdk.wallet.wallet import KeyWallet
+
+from icon_cli import EXA
+from icon_cli.batch import IcxBatch
+from icon_cli.config import Config
+from icon_cli.endpoints import Endpoint, EndpointPool
+from icon_cli.icx import IcxQuery, IcxTx
+from icon_cli.steps import StepEstimator
+from icon_cli.tokens import Tokens
+from icon_cli.trace import Tracer
+from icon_cli.utils import Utils
+
+
+class AsyncIcx:
+    """
+    An asyncio counterpart to Icx that talks to an ICON node through a pooled aiohttp
+    session, so that many queries can be in flight on a single event loop.
+
+    Requests are routed through the network's EndpointPool, so they share the latency
+    and failure history of the sync clients and fail over and stick to endpoints in the
+    same way as `EndpointPool.post()`.
+
+    The session is created on first use and should be closed with `close()`, or by
+    using the object as an async context manager.
+    """
+
+    DEFAULT_MAX_CONNECTIONS = 100
+    DEFAULT_TIMEOUT = 10
+
+    def __init__(
+        self,
+        network: str,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        timeout: int = DEFAULT_TIMEOUT,
+        session: aiohttp.ClientSession = None,
+    ) -> None:
+        _network = Config.get_network(network)
+        self.network = network
+        self.api_endpoint = _network.api_endpoint
+        self.nid = _network.nid
+        self.pool = EndpointPool.get(network)
+        self.max_connections = max_connections
+        self.timeout = timeout
+
+        self._session = session
+        self._owns_session = session is None
+        self._request_id = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _request(self, method: str, params: dict = None):
+        """
+        Sends a JSON-RPC request and returns its result.
+
+        Raises a JSONRPCException if the node returns an error or a response that isn't
+        JSON, in the same way as IcxProvider, and the last aiohttp error if no endpoint
+        could answer.
+
+        Args:
+            method: A JSON-RPC method name (e.g. "icx_getBalance").
+            params: The JSON-RPC params for the request.
+        """
+        self._request_id += 1
+        payload = {"jsonrpc": "2.0", "method": method, "id": self._request_id}
+        if params:
+            payload["params"] = params
+
+        sticky = method in self.pool.STICKY_METHODS
+        submit = method in self.pool.SUBMIT_METHODS
+        session = self._get_session()
+        error = None
+        for attempt, endpoint in enumerate(self.pool.get_route(sticky), start=1):
+            if error is not None:
+                Tracer.record_retry(method, attempt - 1, str(error))
+            started_at = time.monotonic()
+            try:
+                response = await self._post(session, endpoint, payload)
+            except aiohttp.ClientConnectorError as e:
+                # The request never reached the endpoint.
+                self.pool.record_failure(endpoint, e)
+                error = e
+                continue
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.pool.record_failure(endpoint, e)
+                if submit and not (isinstance(e, aiohttp.ClientResponseError) and e.status == 429):  # fmt: skip
+                    # The node may have the transaction, so it isn't sent again.
+                    raise
+                error = e
+                continue
+            except JSONRPCException as e:
+                self.pool.record_failure(endpoint, e)
+                if submit:
+                    raise
+                error = e
+                continue
+            self.pool.record_success(endpoint, time.monotonic() - started_at, sticky)
+            break
+        else:
+            raise error
+
+        if "error" in response:
+            raise JSONRPCException(response["error"])
+        return response["result"]
+
+    async def _post(
+        self,
+        session: aiohttp.ClientSession,
+        endpoint: Endpoint,
+        payload: dict,
+    ) -> dict:
+        # Returns the decoded response of one endpoint, or raises a ClientResponseError
+        # for a status that fails over, like EndpointPool.post().
+        async with session.post(f"{endpoint.url}/api/v3", json=payload) as r:
+            if r.status in self.pool.FAILOVER_STATUS_CODES:
+                r.raise_for_status()
+            # ICON nodes return JSON-RPC errors with non-2xx status codes.
+            try:
+                return await r.json(content_type=None)
+            except JSONDecodeError as e:
+                r.raise_for_status()
+                raise JSONRPCException(f"Unknown response: {e.doc}")
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_connections)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+
+class AsyncIcxQuery(AsyncIcx):
+    def __init__(self, network: str, **kwargs) -> None:
+        super().__init__(network, **kwargs)
+
+    async def call(
+        self,
+        to: str,
+        method: str,
+        params: dict = {},
+        height: int = None,
+    ) -> dict:
+        call_params = IcxBatch.build_call_params(to, method, params, height)
+        result = await self._request("icx_call", call_params)
+        return result
+
+    async def gather(self, *coroutines, return_exceptions: bool = False) -> list:
+        """
+        Runs many queries concurrently and returns their results in order.
+
+        Args:
+            coroutines: Coroutines returned by the query methods of this class.
+            return_exceptions: Return exceptions as results instead of raising the first one.
+        """
+        return await asyncio.gather(*coroutines, return_exceptions=return_exceptions)
+
+    ##########################
+    # Built-In Query Methods #
+    ##########################
+
+    async def get_balance(
+        self,
+        address: str,
+        in_loop: bool = False,
+    ) -> int | Decimal:
+        result = await self._request("icx_getBalance", {"address": address})
+        balance = Utils.to_int(result)
+        if in_loop is True:
+            return balance
+        else:
+            return Decimal(balance) / EXA
+
+    async def get_block(
+        self,
+        block_height: int = -1,
+    ) -> dict:
+        """
+        Returns information about a specific block on the ICON blockchain.
+
+        Args:
+            block_height: The block height to query.
+        """
+        if block_height == -1:
+            result = await self._request("icx_getLastBlock")
+        else:
+            result = await self._request("icx_getBlockByHeight", {"height": hex(block_height)})  # fmt: skip
+        return IcxBatch.convert_block(result)
+
+    async def get_score_api(
+        self,
+        contract_address: str,
+        block_height: int = None,
+    ) -> dict:
+        """
+        Returns the ABI for a SCORE on the ICON blockchain.
+
+        Args:
+            contract_address: The contract to get the ABI for.
+            block_height: The block height to query.
+        """
+        params = {"address": contract_address}
+        if block_height is not None:
+            params["height"] = hex(block_height)
+        result = await self._request("icx_getScoreApi", params)
+        return result
+
+    async def get_token_balance(
+        self,
+        address: str,
+        token_symbol: str,
+        network: str,
+        in_loop: bool = False,
+    ) -> int | Decimal:
+        token = Tokens.get_token(token_symbol).dict()
+        params = {"_owner": address}
+        result = await self.call(token[network], "balanceOf", params)
+        token_balance = Utils.to_int(result)
+        if in_loop is True:
+            return token_balance
+        else:
+            return Decimal(token_balance) / EXA
+
+    async def get_transaction(
+        self,
+        tx_hash: str,
+    ) -> dict:
+        """
+        Returns details of a transaction on the ICON blockchain.
+
+        Args:
+            tx_hash: An ICX transaction hash.
+        """
+        result = await self._request("icx_getTransactionByHash", {"txHash": tx_hash})
+        return IcxBatch.convert_transaction(result)
+
+    async def get_transaction_result(
+        self,
+        tx_hash: str,
+    ) -> dict:
+        """
+        Returns the result of a transaction on the ICON blockchain.
+
+        Args:
+            tx_hash: An ICX transaction hash.
+        """
+        result = await self._request("icx_getTransactionResult", {"txHash": tx_hash})
+        return IcxBatch.convert_transaction_result(result)
+
+
+class AsyncIcxTx(AsyncIcxQuery):
+    """
+    An asyncio counterpart to IcxTx.
+
+    Creating the object decrypts the keystore synchronously, which blocks the event
+    loop for the keystore KDF. Inside a running loop, create it with `await
+    AsyncIcxTx.load(...)` instead, which decrypts the keystore in the default executor.
+    """
+
+    def __init__(
+        self,
+        network: str,
+        keystore_name: str,
+        keystore_password: str,
+        wallet: KeyWallet = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(network, **kwargs)
+
+        self.keystore_name = keystore_name
+        self.keystore_password = keystore_password
+        if wallet is None:
+            wallet = IcxTx._load_keystore(self.keystore_name, self.keystore_password)  # fmt: skip
+        self.wallet = wallet
+        self.wallet_address = self.wallet.get_address()
+        # StepEstimator is synchronous, so estimates go through an IcxQuery.
+        self._icx = None
+
+    @classmethod
+    async def load(
+        cls,
+        network: str,
+        keystore_name: str,
+        keystore_password: str,
+        **kwargs,
+    ) -> "AsyncIcxTx":
+        """
+        Returns an AsyncIcxTx whose keystore was decrypted in the default executor, so
+        the KDF doesn't block the event loop.
+
+        Args:
+            network: Name of the network (e.g. "mainnet").
+            keystore_name: The name of the keystore to sign with.
+            keystore_password: The keystore's password.
+        """
+        loop = asyncio.get_running_loop()
+        wallet = await loop.run_in_executor(None, IcxTx._load_keystore, keystore_name, keystore_password)  # fmt: skip
+        return cls(network, keystore_name, keystore_password, wallet=wallet, **kwargs)
+
+    ########################
+    # TRANSACTION BUILDERS #
+    ########################
+
+    # Building a transaction doesn't touch the network, so the builders are shared with IcxTx.
+    build_transaction = IcxTx.build_transaction
+    build_call_transaction = IcxTx.build_call_transaction
+
+    async def estimate_step_limit(self, tx: Transaction) -> int:
+        """
+        Returns a step limit for a transaction like `IcxTx.estimate_step_limit()`. The
+        estimate runs in the default executor, since StepEstimator is synchronous.
+
+        Args:
+            tx: An unsigned transaction.
+        """
+        if self._icx is None:
+            self._icx = IcxQuery(self.network)
+        # Conversion needs a step limit, which isn't part of the estimate request.
+        tx = copy.copy(tx)
+        tx.step_limit = 0
+        params = SignedTransaction.convert_tx_to_jsonrpc_request(tx, self.wallet)
+        loop = asyncio.get_running_loop()
+        step_limit = await loop.run_in_executor(None, StepEstimator.get_step_limit, self._icx, params)  # fmt: skip
+        return step_limit if step_limit is not None else IcxTx.DEFAULT_STEP_LIMIT
+
+    async def send_transaction(self, tx: Transaction, step_limit: int = None) -> str:
+        """
+        Signs and sends a transaction and returns its hash.
+
+        Args:
+            tx: An unsigned transaction.
+            step_limit: The step limit to sign with. Defaults to the transaction's own
+                step limit, or an estimate if it has none.
+        """
+        if step_limit is None:
+            step_limit = tx.step_limit or await self.estimate_step_limit(tx)
+        signed_tx = SignedTransaction(tx, self.wallet, step_limit)
+        tx_hash = await self._request("icx_sendTransaction", signed_tx.signed_transaction_dict)  # fmt: skip
+        return tx_hash
@@ -0,0 +1,268 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, List
+from urllib.parse import urlsplit
+
+from iconsdk.utils.converter import (
+    convert,
+    get_block_template_to_convert_transactions_for_genesis,
+)
+from iconsdk.utils.templates import BLOCK_0_1a, TRANSACTION, TRANSACTION_RESULT
+from requests.exceptions import RequestException
+
+from icon_cli.cache import Cache
+from icon_cli.httpreq import HttpReq
+from icon_cli.models import RpcResult
+from icon_cli.utils import Utils
+
+if TYPE_CHECKING:
+    from icon_cli.endpoints import EndpointPool
+
+
+class IcxBatch:
+    """
+    Collects ICON JSON-RPC requests and sends them as JSON-RPC 2.0 batch posts.
+
+    Requests are queued with the builder methods below, and each builder returns the
+    index of its result in the list returned by `execute()`. A batch can also be used
+    as a context manager, in which case it's executed on exit and the results are
+    available on the `results` attribute.
+
+    When a network is given, immutable requests are answered from the on-disk Cache
+    and their results are stored in it, like requests made through IcxProvider. When an
+    EndpointPool is given, each post is routed across its endpoints with failover, and
+    `api_url` only supplies the path of the API.
+    """
+
+    DEFAULT_CHUNK_SIZE = 100
+
+    def __init__(
+        self,
+        api_url: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        network: str = None,
+        concurrency: int = 1,
+        pool: "EndpointPool" = None,
+    ) -> None:
+        if chunk_size < 1:
+            raise ValueError("Batch chunk size must be a positive integer.")
+        if concurrency < 1:
+            raise ValueError("Batch concurrency must be a positive integer.")
+
+        self.api_url = api_url
+        self.chunk_size = chunk_size
+        self.network = network
+        self.concurrency = concurrency
+        self.pool = pool
+        self.requests = []
+        self.results = []
+
+    def __enter__(self) -> "IcxBatch":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.execute()
+
+    def __len__(self) -> int:
+        return len(self.requests)
+
+    ####################
+    # REQUEST BUILDERS #
+    ####################
+
+    def add(
+        self,
+        method: str,
+        params: dict = None,
+        converter: Callable = None,
+    ) -> int:
+        """
+        Queues a raw JSON-RPC request and returns the index of its result.
+
+        Args:
+            method: A JSON-RPC method name (e.g. "icx_getBalance").
+            params: The JSON-RPC params for the request.
+            converter: An optional function that's applied to a successful result.
+        """
+        self.requests.append((method, params, converter))
+        return len(self.requests) - 1
+
+    def call(
+        self,
+        to: str,
+        method: str,
+        params: dict = {},
+        height: int = None,
+    ) -> int:
+        """
+        Queues a readonly contract call.
+
+        Args:
+            to: The contract address to call.
+            method: The name of the readonly method.
+            params: A dictionary of params for the method.
+            height: The block height to query.
+        """
+        return self.add("icx_call", self.build_call_params(to, method, params, height))
+
+    def get_balance(self, address: str, height: int = None) -> int:
+        """
+        Queues an ICX balance query. The result is returned in loop.
+
+        Args:
+            address: An ICX wallet or contract address.
+            height: The block height to query.
+        """
+        params = {"address": address}
+        if height is not None:
+            params["height"] = hex(height)
+        return self.add("icx_getBalance", params, Utils.to_int)
+
+    def get_block(self, block_height: int) -> int:
+        """
+        Queues a block query.
+
+        Args:
+            block_height: The block height to query.
+        """
+        return self.add(
+            "icx_getBlockByHeight",
+            {"height": hex(block_height)},
+            self.convert_block,
+        )
+
+    def get_transaction_result(self, tx_hash: str) -> int:
+        """
+        Queues a transaction result query.
+
+        Args:
+            tx_hash: An ICX transaction hash.
+        """
+        return self.add(
+            "icx_getTransactionResult",
+            {"txHash": tx_hash},
+            self.convert_transaction_result,
+        )
+
+    #############
+    # EXECUTION #
+    #############
+
+    def execute(self) -> List[RpcResult]:
+        """
+        Sends all queued requests that aren't cached in chunks of `chunk_size`, with up
+        to `concurrency` chunks in flight, and returns one RpcResult per request in
+        the order the requests were queued.
+        """
+        results = [None] * len(self.requests)
+        uncached = []
+        for index, (method, params, converter) in enumerate(self.requests):
+            if self._is_cacheable(method, params):
+                hit, value = Cache.get(self.network, method, params)
+                if hit is True:
+                    results[index] = self._convert(RpcResult(method=method, params=params, result=value), converter)  # fmt: skip
+                    continue
+            uncached.append(index)
+
+        chunks = [uncached[start : start + self.chunk_size] for start in range(0, len(uncached), self.chunk_size)]  # fmt: skip
+        requests = [[self.requests[index] for index in chunk] for chunk in chunks]
+        if self.concurrency > 1 and len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                chunk_results = list(executor.map(self._execute_chunk, requests))
+        else:
+            chunk_results = [self._execute_chunk(chunk) for chunk in requests]
+
+        for chunk, chunk_requests, raw_results in zip(chunks, requests, chunk_results):
+            for index, (method, params, converter), result in zip(chunk, chunk_requests, raw_results):  # fmt: skip
+                if result.ok and self._is_cacheable(method, params):
+                    Cache.set(self.network, method, params, result.result)
+                results[index] = self._convert(result, converter)
+
+        self.results = results
+        return results
+
+    @staticmethod
+    def build_call_params(
+        to: str,
+        method: str,
+        params: dict = {},
+        height: int = None,
+    ) -> dict:
+        call_params = {"to": to, "dataType": "call", "data": {"method": method}}
+        if params:
+            call_params["data"]["params"] = params
+        if height is not None:
+            call_params["height"] = hex(height)
+        return call_params
+
+    @staticmethod
+    def convert_block(block: dict) -> dict:
+        template = get_block_template_to_convert_transactions_for_genesis(block, BLOCK_0_1a)  # fmt: skip
+        return convert(block, template)
+
+    @staticmethod
+    def convert_transaction(tx: dict) -> dict:
+        return convert(tx, TRANSACTION)
+
+    @staticmethod
+    def convert_transaction_result(tx_result: dict) -> dict:
+        return convert(tx_result, TRANSACTION_RESULT)
+
+    ##############################
+    # INTERNAL UTILITY FUNCTIONS #
+    ##############################
+
+    def _execute_chunk(self, chunk: list) -> List[RpcResult]:
+        payload = []
+        for request_id, (method, params, _) in enumerate(chunk):
+            request = {"jsonrpc": "2.0", "method": method, "id": request_id}
+            if params:
+                request["params"] = params
+            payload.append(request)
+
+        try:
+            if self.pool is not None:
+                responses = self.pool.post(urlsplit(self.api_url).path, payload)
+            else:
+                responses = HttpReq.post(self.api_url, payload)
+        except (RequestException, ValueError) as e:
+            # A transport failure only fails the requests in this chunk.
+            return [
+                RpcResult(
+                    method=method,
+                    params=params,
+                    error={"code": -32000, "message": str(e)},
+                )
+                for method, params, _ in chunk
+            ]
+
+        # Some nodes answer a batch with a single error object (e.g. payload too large).
+        if isinstance(responses, dict):
+            responses = [{**responses, "id": request_id} for request_id in range(len(chunk))]  # fmt: skip
+
+        responses_by_id = {response.get("id"): response for response in responses}
+
+        results = []
+        for request_id, (method, params, _) in enumerate(chunk):
+            response = responses_by_id.get(request_id)
+            if response is None:
+                error = {"code": -32603, "message": "No response for request in batch."}
+                results.append(RpcResult(method=method, params=params, error=error))
+            elif "error" in response:
+                results.append(RpcResult(method=method, params=params, error=response["error"]))  # fmt: skip
+            else:
+                results.append(RpcResult(method=method, params=params, result=response.get("result")))  # fmt: skip
+        return results
+
+    def _is_cacheable(self, method: str, params: dict) -> bool:
+        return self.network is not None and Cache.is_cacheable(method, params)
+
+    @staticmethod
+    def _convert(result: RpcResult, converter: Callable = None) -> RpcResult:
+        if result.ok is False or converter is None:
+            return result
+        try:
+            return RpcResult(method=result.method, params=result.params, result=converter(result.result))  # fmt: skip
+        except Exception as e:
+            error = {"code": -32603, "message": f"Could not convert result: {e}"}
+            return RpcResult(method=result.method, params=result.params, error=error)
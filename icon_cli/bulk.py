@@ -0,0 +1,257 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from decimal import Decimal, InvalidOperation
+from hashlib import sha3_256
+from pathlib import Path
+from typing import Iterator, List
+
+from iconsdk.exception import JSONRPCException
+from requests.exceptions import RequestException
+
+from icon_cli import EXA
+from icon_cli.icx import IcxTx
+
+
+class BulkSender:
+    """
+    Sends many transactions from one CSV or JSONL file with a single IcxTx wallet.
+
+    Every row is a transfer with "to" and "value" (in ICX) keys, and optionally a
+    "method" and "params" for a contract call. Transactions are signed one at a time
+    and submitted by a bounded pool of workers, and every submission is appended to a
+    JSONL results file right away so an interrupted run can be resumed.
+    """
+
+    DEFAULT_CONCURRENCY = 8
+
+    def __init__(
+        self,
+        icx: IcxTx,
+        results_path: Path,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> None:
+        self.icx = icx
+        self.results_path = results_path
+        self.concurrency = concurrency
+
+    def send(self, rows: List[dict]) -> List[dict]:
+        """
+        Signs and submits every row that hasn't been submitted according to the results
+        file, fetches the final status of each transaction, and returns the results
+        ordered by row index.
+
+        Args:
+            rows: Rows returned by `read_rows()`.
+        """
+        results = self.read_results(self.results_path)
+        pending_rows = [row for row in rows if results.get(row["index"], {}).get("status") in (None, "signed", "failed")]  # fmt: skip
+
+        # A transaction past the node's timestamp window can never be included. Rows
+        # whose transactions aren't on chain by then are signed with a new timestamp.
+        expired = {row["index"]: results[row["index"]] for row in pending_rows if self._is_expired(results.get(row["index"], {}))}  # fmt: skip
+        if len(expired) > 0:
+            self._update_statuses(expired, timeout=0)
+            for result in expired.values():
+                if result["status"] in ("signed", "failed"):
+                    del result["timestamp"]
+            pending_rows = [row for row in pending_rows if results[row["index"]].get("status") in (None, "signed", "failed")]  # fmt: skip
+
+        with open(self.results_path, "a", encoding="utf-8") as results_file:
+            for result in self._submit(pending_rows, results):
+                results[result["index"]] = result
+                results_file.write(json.dumps(result) + "\n")
+                results_file.flush()
+
+        self._update_statuses(results)
+        self.write_results(self.results_path, results)
+        return [results[index] for index in sorted(results)]
+
+    @staticmethod
+    def read_rows(path: Path) -> List[dict]:
+        """
+        Reads transfers from a CSV file with a header row, or from a JSONL file.
+
+        Args:
+            path: Path to a .csv or .jsonl file.
+        """
+        with open(path, "r", encoding="utf-8-sig") as f:
+            if Path(path).suffix.lower() == ".csv":
+                records = list(csv.DictReader(f))
+            else:
+                records = [json.loads(line) for line in f if line.strip()]
+
+        rows = []
+        for index, record in enumerate(records):
+            params = record.get("params") or {}
+            if isinstance(params, str):
+                params = json.loads(params)
+            try:
+                value = Decimal(str(record.get("value") or 0))
+            except InvalidOperation:
+                raise ValueError(f"Row {index} has an invalid value: {record.get('value')}")  # fmt: skip
+            rows.append(
+                {
+                    "index": index,
+                    "to": record["to"].strip(),
+                    "value": value,
+                    "method": record.get("method") or None,
+                    "params": params,
+                }
+            )
+        return rows
+
+    @staticmethod
+    def read_results(path: Path) -> dict:
+        """
+        Returns a dictionary of row index to result. When a row has more than one line
+        in the file, the last line wins.
+
+        Args:
+            path: Path to a JSONL results file.
+        """
+        results = {}
+        if not os.path.exists(path):
+            return results
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    result = json.loads(line)
+                    results[result["index"]] = result
+        return results
+
+    @staticmethod
+    def write_results(path: Path, results: dict) -> None:
+        """
+        Atomically replaces the results file with one line per row, ordered by index.
+
+        Args:
+            path: Path to a JSONL results file.
+            results: A dictionary of row index to result.
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for index in sorted(results):
+                f.write(json.dumps(results[index]) + "\n")
+        os.replace(tmp_path, path)
+
+    ##############################
+    # INTERNAL UTILITY FUNCTIONS #
+    ##############################
+
+    def _sign(self, row: dict, timestamp: int, step_limit: int = None) -> dict:
+        from iconsdk.signed_transaction import SignedTransaction
+
+        # The row index is used as the nonce so identical transfers get distinct hashes,
+        # and a fixed timestamp makes re-signing a row reproduce the same hash.
+        if row["method"] is None:
+            tx = self.icx.build_transaction(
+                row["to"],
+                row["value"],
+                nonce=row["index"],
+                timestamp=timestamp,
+            )
+        else:
+            tx = self.icx.build_call_transaction(
+                row["to"],
+                int(row["value"] * EXA),
+                row["method"],
+                row["params"],
+                nonce=row["index"],
+                timestamp=timestamp,
+            )
+        if step_limit is None:
+            step_limit = self.icx.estimate_step_limit(tx)
+        signed_tx = SignedTransaction(tx, self.icx.wallet, step_limit)
+        return signed_tx.signed_transaction_dict
+
+    def _submit(self, rows: List[dict], results: dict) -> Iterator[dict]:
+        """
+        Signs rows in order and submits them with at most `concurrency` requests in
+        flight, yielding a "signed" result before each submission and a final result
+        after it.
+
+        A row is re-signed with the timestamp and step limit recorded in its previous
+        result, so a resumed run produces the same transaction hash and can't pay a row
+        twice, unless `send()` dropped the timestamp because it expired. Rows that share
+        a contract, method and parameter shape share one step estimate, so estimating
+        adds a request per kind of row rather than per row.
+        """
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            in_flight = {}
+            for row in rows:
+                # Wait for a free worker so only `concurrency` signed payloads are held.
+                if len(in_flight) >= self.concurrency:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield self._make_result(in_flight.pop(future), future)
+
+                previous_result = results.get(row["index"], {})
+                timestamp = previous_result.get("timestamp") or int(time.time() * 10**6)  # fmt: skip
+                step_limit = previous_result.get("step_limit")
+                if step_limit is None and "timestamp" in previous_result:
+                    # Results from before step estimation were signed with the default.
+                    step_limit = self.icx.DEFAULT_STEP_LIMIT
+                params = self._sign(row, timestamp, step_limit)
+                result = {
+                    "index": row["index"],
+                    "to": row["to"],
+                    "value": str(row["value"]),
+                    "method": row["method"],
+                    "timestamp": timestamp,
+                    "step_limit": int(params["stepLimit"], 16),
+                    "tx_hash": self._get_tx_hash(params),
+                    "status": "signed",
+                    "error": None,
+                }
+                yield result
+
+                future = executor.submit(self.icx.provider.make_request, "icx_sendTransaction", params)  # fmt: skip
+                in_flight[future] = result
+            for future in list(in_flight):
+                yield self._make_result(in_flight.pop(future), future)
+
+    @staticmethod
+    def _make_result(signed_result: dict, future) -> dict:
+        result = dict(signed_result)
+        try:
+            result["tx_hash"] = future.result()
+            result["status"] = "submitted"
+        except (JSONRPCException, RequestException) as e:
+            result["status"] = "failed"
+            result["error"] = str(e)
+        return result
+
+    @staticmethod
+    def _is_expired(result: dict) -> bool:
+        if result.get("timestamp") is None:
+            return False
+        return time.time() * 10**6 - result["timestamp"] > IcxTx.TIMESTAMP_WINDOW
+
+    @staticmethod
+    def _get_tx_hash(params: dict) -> str:
+        from iconsdk.libs.serializer import serialize
+
+        unsigned_params = {k: v for k, v in params.items() if k != "signature"}
+        return f"0x{sha3_256(serialize(unsigned_params)).hexdigest()}"
+
+    def _update_statuses(self, results: dict, timeout: float = 60) -> None:
+        """
+        Waits for every submitted transaction to be final or for the timeout to expire.
+        Transactions whose submission failed are checked once, since an earlier run
+        may have submitted them.
+        """
+        submitted = [r for r in results.values() if r["status"] in ("signed", "submitted")]  # fmt: skip
+        failed = [r for r in results.values() if r["status"] == "failed"]
+        for pending, pending_timeout in [(submitted, timeout), (failed, 0)]:
+            tx_results = self.icx.wait_for_results([r["tx_hash"] for r in pending], pending_timeout)  # fmt: skip
+            for result in pending:
+                tx_result = tx_results[result["tx_hash"]]
+                if tx_result.ok:
+                    result["status"] = "success" if tx_result.result["status"] == 1 else "failure"  # fmt: skip
+                    result["block_height"] = tx_result.result["blockHeight"]
+                    result["error"] = None
+                    if tx_result.result.get("failure") is not None:
+                        result["error"] = str(tx_result.result["failure"])
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from icon_cli import DATA_DIR
+from icon_cli.config import Config
+from icon_cli.trace import Tracer
+
+
+class Cache:
+    """
+    A size-bounded SQLite cache for JSON-RPC responses that can never change.
+
+    Only requests pinned to a block height (or a block/transaction hash) are cached,
+    so a cached response is always identical to what the node would return. Entries
+    are evicted least-recently-used first once the cache grows beyond
+    `cache_max_size_mb` in config.yml. An entry's access time is only rewritten when
+    it's older than TOUCH_INTERVAL, so most hits are a single read.
+    """
+
+    CACHE_FILE = f"{DATA_DIR}/cache.db"
+
+    # Methods whose response is immutable when the request is pinned to a height.
+    HEIGHT_PINNED_METHODS = ["icx_call", "icx_getBalance", "icx_getScoreApi", "icx_getTotalSupply"]  # fmt: skip
+    # Methods whose response is immutable for any successful request.
+    IMMUTABLE_METHODS = ["icx_getBlockByHash", "icx_getBlockByHeight", "icx_getTransactionByHash", "icx_getTransactionResult"]  # fmt: skip
+
+    # How many writes to allow between checks of the total cache size.
+    EVICTION_CHECK_INTERVAL = 100
+    # How many seconds a hit can be from the recorded access time before it's updated.
+    TOUCH_INTERVAL = 60
+
+    enabled = True
+
+    _local = threading.local()
+    _max_size = None
+    _writes_since_eviction_check = 0
+    _lock = threading.Lock()
+
+    def __init__(self) -> None:
+        pass
+
+    @classmethod
+    def is_cacheable(cls, method: str, params: dict = None) -> bool:
+        """
+        Returns True if the response to a JSON-RPC request is immutable.
+
+        Args:
+            method: A JSON-RPC method name (e.g. "icx_call").
+            params: The JSON-RPC params for the request.
+        """
+        if cls.enabled is False:
+            return False
+        if method in cls.IMMUTABLE_METHODS:
+            return True
+        if method in cls.HEIGHT_PINNED_METHODS:
+            return params is not None and "height" in params
+        return False
+
+    @classmethod
+    def get(cls, network: str, method: str, params: dict = None) -> tuple:
+        """
+        Returns a tuple of (hit, value) for a JSON-RPC request.
+
+        Args:
+            network: Name of the network (e.g. "mainnet").
+            method: A JSON-RPC method name (e.g. "icx_call").
+            params: The JSON-RPC params for the request.
+        """
+        key = cls._make_key(network, method, params)
+        db = cls._get_connection()
+        row = db.execute("SELECT value, accessed_at FROM responses WHERE key = ?", (key,)).fetchone()  # fmt: skip
+        Tracer.record_cache(method, row is not None)
+        if row is None:
+            return False, None
+        now = time.time()
+        if now - row[1] > cls.TOUCH_INTERVAL:
+            db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            db.commit()
+        return True, json.loads(row[0])
+
+    @classmethod
+    def set(cls, network: str, method: str, params: dict, value) -> None:
+        """
+        Stores the result of a JSON-RPC request.
+
+        Args:
+            network: Name of the network (e.g. "mainnet").
+            method: A JSON-RPC method name (e.g. "icx_call").
+            params: The JSON-RPC params for the request.
+            value: The JSON-serializable result of the request.
+        """
+        key = cls._make_key(network, method, params)
+        value = json.dumps(value, separators=(",", ":"))
+        db = cls._get_connection()
+        db.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+            (key, network, method, value, len(value), time.time()),
+        )
+        db.commit()
+
+        with cls._lock:
+            cls._writes_since_eviction_check += 1
+            check_size = cls._writes_since_eviction_check >= cls.EVICTION_CHECK_INTERVAL  # fmt: skip
+            if check_size:
+                cls._writes_since_eviction_check = 0
+        if check_size:
+            cls.evict()
+
+    @classmethod
+    def evict(cls) -> int:
+        """
+        Deletes least-recently-used entries until the cache is under 90% of its
+        maximum size, and returns the number of deleted entries.
+        """
+        db = cls._get_connection()
+        total_size = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]  # fmt: skip
+        if total_size <= cls._get_max_size():
+            return 0
+
+        excess = total_size - int(cls._get_max_size() * 0.9)
+        deleted, freed = 0, 0
+        keys = []
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY accessed_at"):  # fmt: skip
+            if freed >= excess:
+                break
+            keys.append((key,))
+            freed += size
+            deleted += 1
+        db.executemany("DELETE FROM responses WHERE key = ?", keys)
+        db.commit()
+        return deleted
+
+    @classmethod
+    def stats(cls) -> dict:
+        """
+        Returns the location, size and number of entries of the cache, in total and
+        per network and method.
+        """
+        db = cls._get_connection()
+        rows = db.execute(
+            "SELECT network, method, COUNT(*), SUM(size) FROM responses GROUP BY network, method ORDER BY network, method"  # fmt: skip
+        ).fetchall()
+        return {
+            "path": cls.CACHE_FILE,
+            "entries": sum(row[2] for row in rows),
+            "size": sum(row[3] for row in rows),
+            "max_size": cls._get_max_size(),
+            "methods": [
+                {
+                    "network": network,
+                    "method": method,
+                    "entries": entries,
+                    "size": size,
+                }
+                for network, method, entries, size in rows
+            ],
+        }
+
+    @classmethod
+    def clear(cls) -> int:
+        """
+        Deletes every entry in the cache and returns the number of deleted entries.
+        """
+        db = cls._get_connection()
+        deleted = db.execute("DELETE FROM responses").rowcount
+        db.commit()
+        db.execute("VACUUM")
+        return deleted
+
+    ##############################
+    # INTERNAL UTILITY FUNCTIONS #
+    ##############################
+
+    @classmethod
+    def _get_connection(cls) -> sqlite3.Connection:
+        # SQLite connections can't be shared between threads, so keep one per thread.
+        db = getattr(cls._local, "db", None)
+        if db is None:
+            os.makedirs(os.path.dirname(cls.CACHE_FILE), exist_ok=True)
+            db = sqlite3.connect(cls.CACHE_FILE, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, network TEXT, method TEXT, value TEXT, size INTEGER, accessed_at REAL)"  # fmt: skip
+            )
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"  # fmt: skip
+            )
+            cls._local.db = db
+        return db
+
+    @classmethod
+    def _get_max_size(cls) -> int:
+        if cls._max_size is None:
+            cls._max_size = Config.read_config().cache_max_size_mb * 1024 * 1024
+        return cls._max_size
+
+    @staticmethod
+    def _make_key(network: str, method: str, params: dict = None) -> str:
+        request = json.dumps([network, method, params], sort_keys=True)
+        return hashlib.sha256(request.encode()).hexdigest()
@@ -0,0 +1,96 @@
+import os
+from datetime import datetime
+from typing import List
+
+import typer
+from rich import print
+
+from icon_cli.agent import AgentClient, SigningAgent
+from icon_cli.config import Config
+from icon_cli.icx import IcxTx
+from icon_cli.utils import Utils
+from icon_cli.validators import Validators
+
+app = typer.Typer(help="Run a local agent that holds decrypted keystores.")
+
+
+@app.command()
+def start(
+    keystore_names: List[str] = typer.Option(
+        [Config.get_default_keystore()],
+        "--keystore",
+        "-k",
+        help="A keystore to load into the agent. Can be used more than once.",
+    ),
+    ttl: int = typer.Option(
+        SigningAgent.DEFAULT_TTL,
+        "--ttl",
+        help="Number of seconds to keep the keystores decrypted.",
+    ),
+    foreground: bool = typer.Option(
+        False,
+        "--foreground",
+        help="Run the agent in the foreground instead of as a background process.",
+    ),
+):
+    """
+    Decrypt keystores once and serve signing requests from icon-cli commands.
+    """
+    if AgentClient.get_status() is not None:
+        Utils.exit("An agent is already running. Stop it with `icon agent stop`.", "error")  # fmt: skip
+
+    keystore_names = [name for name in keystore_names if name is not None]
+    if len(keystore_names) == 0:
+        Utils.exit("Please specify a keystore with --keystore.", "error")
+
+    # Decrypt every keystore up front, prompting for passwords in the foreground.
+    wallets = {}
+    for keystore_name in keystore_names:
+        Validators.validate_keystore_name(keystore_name)
+        print(f"Loading {keystore_name}...")
+        wallets[keystore_name] = IcxTx._load_keystore(keystore_name, None)
+
+    agent = SigningAgent(wallets, ttl)
+    if foreground is True:
+        print(f"Agent is listening on {agent.socket_path}. Press Ctrl+C to stop.")
+        try:
+            agent.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    # Detach from the terminal so the agent keeps running after this command exits.
+    pid = os.fork()
+    if pid > 0:
+        Utils.exit(f"Agent started with PID {pid} for {ttl} seconds.", "success")
+    os.setsid()
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    agent.serve_forever()
+    os._exit(0)
+
+
+@app.command()
+def status():
+    """
+    View the keystores held by the running agent.
+    """
+    agent_status = AgentClient.get_status()
+    if agent_status is None:
+        Utils.exit("No agent is running.", "ok")
+    expires_at = datetime.fromtimestamp(agent_status["expires_at"])
+    print(f"PID: {agent_status['pid']}")
+    print(f"Expires: {expires_at.isoformat(sep=' ', timespec='seconds')}")
+    Utils.print_json(agent_status["keystores"])
+
+
+@app.command()
+def stop():
+    """
+    Stop the running agent and discard its decrypted keystores.
+    """
+    if AgentClient.get_status() is None:
+        Utils.exit("No agent is running.", "ok")
+    AgentClient.request({"action": "stop"})
+    Utils.exit("Agent has been stopped.", "success")
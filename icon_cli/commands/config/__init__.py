@@ -6,12 +6,13 @@ from pathlib import Path
 import typer
 from rich import print
 
-from icon_cli.commands.config import keystore
+from icon_cli.commands.config import cache, keystore
 from icon_cli.config import Config
 from icon_cli.utils import Utils
 
 app = typer.Typer(help="Configure settings for icon-cli.")
 
+app.add_typer(cache.app, name="cache")
 app.add_typer(keystore.app, name="keystore")
 
 
@@ -0,0 +1,44 @@
+import typer
+from rich import print
+
+from icon_cli.cache import Cache
+from icon_cli.utils import Utils
+
+app = typer.Typer(help="Manage the on-disk response cache.")
+
+
+@app.command()
+def clear():
+    """
+    Delete every entry in the response cache.
+    """
+    deleted = Cache.clear()
+    Utils.exit(f"{deleted} cached responses have been deleted.", "success")
+
+
+@app.command()
+def stats():
+    """
+    View the size and contents of the response cache.
+    """
+    from rich.table import Table
+
+    cache_stats = Cache.stats()
+
+    table = Table(title=cache_stats["path"])
+    table.add_column("Network")
+    table.add_column("Method")
+    table.add_column("Entries", justify="right")
+    table.add_column("Size (KB)", justify="right")
+    for row in cache_stats["methods"]:
+        table.add_row(
+            row["network"],
+            row["method"],
+            str(row["entries"]),
+            f"{row['size'] / 1024:,.1f}",
+        )
+    print(table)
+    print(
+        f"{cache_stats['entries']} entries, "
+        f"{cache_stats['size'] / 1024 / 1024:,.2f} MB of {cache_stats['max_size'] / 1024 / 1024:,.0f} MB"  # fmt: skip
+    )
@@ -0,0 +1,85 @@
+import json
+from pathlib import Path
+
+import typer
+
+from icon_cli.config import Config
+from icon_cli.cps import Cps
+from icon_cli.utils import Utils
+from icon_cli.validators import Validators
+
+app = typer.Typer(help="Snapshot the Contribution Proposal System.")
+
+
+@app.command()
+def snapshot(
+    height: int = typer.Option(
+        None,
+        "--height",
+        min=0,
+        help="The block height to snapshot. Defaults to the last block.",
+    ),
+    directory: Path = typer.Option(
+        Cps.SNAPSHOT_DIR,
+        "--directory",
+        "-d",
+        file_okay=False,
+        help="The directory to write snapshots to.",
+    ),
+    network: str = typer.Option(
+        Config.get_default_network(),
+        "--network",
+        "-n",
+        callback=Validators.validate_network,
+    ),
+):
+    """
+    Save the contributors, active proposals, progress reports, validators and
+    treasury balance of the CPS to a snapshot file, and print its path.
+    """
+    cps_snapshot = Cps(network).get_snapshot(height)
+    typer.echo(Cps.write_snapshot(cps_snapshot, directory))
+
+
+@app.command()
+def diff(
+    old: Path = typer.Argument(
+        None,
+        exists=True,
+        dir_okay=False,
+        help="The earlier snapshot. Defaults to the second newest in --directory.",
+    ),
+    new: Path = typer.Argument(
+        None,
+        exists=True,
+        dir_okay=False,
+        help="The later snapshot. Defaults to the newest in --directory.",
+    ),
+    directory: Path = typer.Option(
+        Cps.SNAPSHOT_DIR,
+        "--directory",
+        "-d",
+        file_okay=False,
+        help="The directory of snapshots to compare when no files are given.",
+    ),
+    network: str = typer.Option(
+        Config.get_default_network(),
+        "--network",
+        "-n",
+        callback=Validators.validate_network,
+    ),
+):
+    """
+    Print what changed in the CPS between two snapshots as JSON.
+    """
+    if old is None or new is None:
+        paths = Cps.list_snapshots(network, directory)
+        if len(paths) < 2:
+            Utils.exit(f"Two {network} snapshots are needed in {directory}. Run 'icon cps snapshot' first.", "error")  # fmt: skip
+        old, new = (paths[-2], paths[-1]) if old is None else (old, paths[-1])
+
+    try:
+        changes = Cps.diff_snapshots(Cps.read_snapshot(old), Cps.read_snapshot(new))
+    except ValueError as e:
+        Utils.exit(str(e), "error")
+    typer.echo(json.dumps(changes, indent=4, default=str))
@@ -0,0 +1,203 @@
+import json
+
+import typer
+from rich import print
+
+from icon_cli.config import Config
+from icon_cli.contracts import Contracts
+from icon_cli.icx import IcxQuery
+from icon_cli.index import Indexer
+from icon_cli.utils import Utils
+from icon_cli.validators import Validators
+
+app = typer.Typer(help="Index ICON blocks into a local database.")
+query_app = typer.Typer(help="Query the local index.")
+app.add_typer(query_app, name="query")
+
+
+@app.command()
+def sync(
+    start: int = typer.Option(
+        0,
+        "--from",
+        min=0,
+        help="The first block height to index. Only used for an empty index.",
+    ),
+    end: int = typer.Option(
+        None,
+        "--to",
+        min=0,
+        help="The last block height to index. Defaults to the latest block.",
+    ),
+    include_results: bool = typer.Option(
+        False,
+        "--tx-results",
+        help="Also index transaction statuses and event logs. Only used for an empty index.",  # fmt: skip
+    ),
+    window: int = typer.Option(
+        IcxQuery.DEFAULT_PREFETCH_WINDOW,
+        "--window",
+        min=1,
+        help="The number of batches of blocks to fetch ahead.",
+    ),
+    chunk_size: int = typer.Option(
+        100,
+        "--chunk-size",
+        min=1,
+        help="The number of blocks to fetch in a single request.",
+    ),
+    network: str = typer.Option(
+        Config.get_default_network(),
+        "--network",
+        "-n",
+        callback=Validators.validate_network,
+    ),
+):
+    """
+    Index new blocks, continuing from the last indexed block.
+    """
+    indexer = Indexer(network)
+    try:
+        count = indexer.sync(
+            start,
+            end,
+            include_results,
+            window,
+            chunk_size,
+            on_commit=lambda height: print(f"Indexed up to block {height}."),
+        )
+    finally:
+        indexer.close()
+    Utils.exit(f"Indexed {count} blocks.", "success")
+
+
+@app.command()
+def status(
+    network: str = typer.Option(
+        Config.get_default_network(),
+        "--network",
+        "-n",
+        callback=Validators.validate_network,
+    ),
+):
+    """
+    View the indexed block range and the size of the index.
+    """
+    indexer = Indexer(network)
+    print(indexer.get_status())
+    indexer.close()
+
+
+@query_app.command()
+def address(
+    address: str = typer.Argument(
+        ...,
+        callback=Validators.validate_address,
+        help="An ICX wallet or contract address.",
+    ),
+    events: bool = typer.Option(
+        False,
+        "--events",
+        help="Show event logs that mention the address instead of transactions.",
+    ),
+    limit: int = typer.Option(100, "--limit"),
+    offset: int = typer.Option(0, "--offset"),
+    network: str = typer.Option(
+        Config.get_default_network(),
+        "--network",
+        "-n",
+        callback=Validators.validate_network,
+    ),
+):
+    """
+    View transactions sent from or to an address, newest first.
+    """
+    indexer = Indexer(network)
+    if events is True:
+        _print_rows(indexer.get_event_logs(address, limit=limit, offset=offset))
+    else:
+        _print_rows(indexer.get_address_transactions(address, limit, offset))
+    indexer.close()
+
+
+@query_app.command()
+def contract(
+    contract_address: str = typer.Argument(
+        ...,
+        callback=Validators.validate_contract_address,
+        help="An ICON contract address.",
+    ),
+    method: str = typer.Option(
+        None,
+        "--method",
+        "-m",
+        help="Only show calls to this method.",
+    ),
+    limit: int = typer.Option(100, "--limit"),
+    offset: int = typer.Option(0, "--offset"),
+    network: str = typer.Option(
+        Config.get_default_network(),
+        "--network",
+        "-n",
+        callback=Validators.validate_network,
+    ),
+):
+    """
+    View transactions sent to a contract, newest first.
+    """
+    if not contract_address.startswith("cx"):
+        contract_address = Contracts.get_contract_address_from_name(contract_address, network)  # fmt: skip
+
+    indexer = Indexer(network)
+    _print_rows(indexer.get_contract_transactions(contract_address, method, limit, offset))  # fmt: skip
+    indexer.close()
+
+
+@query_app.command()
+def method(
+    method_name: str = typer.Argument(
+        ...,
+        help="The name of a contract method.",
+    ),
+    limit: int = typer.Option(100, "--limit"),
+    offset: int = typer.Option(0, "--offset"),
+    network: str = typer.Option(
+        Config.get_default_network(),
+        "--network",
+        "-n",
+        callback=Validators.validate_network,
+    ),
+):
+    """
+    View calls to a method on any contract, newest first.
+    """
+    indexer = Indexer(network)
+    _print_rows(indexer.get_method_transactions(method_name, limit, offset))
+    indexer.close()
+
+
+@query_app.command()
+def block(
+    block_height: int = typer.Argument(
+        ...,
+        help="A block number on the ICON blockchain.",
+    ),
+    network: str = typer.Option(
+        Config.get_default_network(),
+        "--network",
+        "-n",
+        callback=Validators.validate_network,
+    ),
+):
+    """
+    View the transactions in a block.
+    """
+    indexer = Indexer(network)
+    _print_rows(indexer.get_block_transactions(block_height))
+    indexer.close()
+
+
+def _print_rows(rows: list) -> None:
+    # Plain JSONL so results can be piped into other tools.
+    for row in rows:
+        typer.echo(json.dumps(row))
@@ -1,9 +1,14 @@
+import json
+from pathlib import Path
+from typing import List
+
 import typer
 from rich import print
 
 from icon_cli.config import Config
 from icon_cli.icx import IcxQuery
 from icon_cli.tracker import Tracker
+from icon_cli.utils import Utils
 
 app = typer.Typer(help="Query a node on the ICON network.")
 from icon_cli.validators import Validators
@@ -26,18 +31,86 @@ def abi(
     """
     View the ABI of an ICON SCORE.
     """
+    from icon_cli.abi import AbiCache
+
     icx = IcxQuery(network)
-    abi = icx.get_score_api(contract_address)
+    abi = AbiCache.get_abi(icx, contract_address)
     print(abi)
 
 
+@app.command()
+def batch(
+    batch_file: Path = typer.Argument(
+        ...,
+        exists=True,
+        file_okay=True,
+        readable=True,
+        resolve_path=True,
+        help="A JSONL file with one query per line.",
+    ),
+    network: str = typer.Option(
+        Config.get_default_network(),
+        "--network",
+        "-n",
+        help="The name of the ICON network to use.",
+    ),
+    chunk_size: int = typer.Option(
+        100,
+        "--chunk-size",
+        help="The maximum number of queries to send in a single request.",
+    ),
+):
+    """
+    Run many queries as JSON-RPC batch requests.
+
+    Each line of the batch file is a JSON object with a "type" key ("call", "balance",
+    "block", or "tx_result") and the arguments for that query, for example:
+    {"type": "balance", "address": "hx..."}. Results are printed as JSONL in the same
+    order as the input.
+    """
+    icx = IcxQuery(network)
+    batch = icx.batch(chunk_size)
+
+    # Map query types to the IcxBatch builder that queues them.
+    builders = {
+        "balance": batch.get_balance,
+        "block": batch.get_block,
+        "call": batch.call,
+        "tx_result": batch.get_transaction_result,
+    }
+
+    with open(batch_file, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                query = json.loads(line)
+                builder = builders[query.pop("type")]
+                builder(**query)
+            except (json.JSONDecodeError, KeyError, TypeError):
+                Utils.exit(f"Line {line_number} of {batch_file} is not a valid query.", "error")  # fmt: skip
+
+    for index, result in enumerate(batch.execute()):
+        if result.ok:
+            typer.echo(
+                json.dumps({"index": index, "result": result.result}, default=str)
+            )
+        else:
+            typer.echo(json.dumps({"index": index, "error": result.error}))
+
+
 @app.command()
 def balance(
-    address: str = typer.Argument(
-        Config.get_default_keystore_address(),
-        help="An ICON wallet address.",
+    addresses: List[str] = typer.Argument(
+        None,
+        help="One or more ICON addresses. Defaults to the default keystore's address.",
         show_default=False,
     ),
+    addresses_file: typer.FileText = typer.Option(
+        None,
+        "--file",
+        help="A file with one address per line, or - to read from stdin.",
+    ),
     network: str = typer.Option(
         Config.get_default_network(),
         "--network",
@@ -50,20 +123,78 @@ def balance(
         help="Display the output value in loop.",
         show_default=False,
     ),
-    token_symbol: str = typer.Option(
-        None, "--token", "-t", help="An IRC-2 token symbol."
+    token_symbols: List[str] = typer.Option(
+        [],
+        "--token",
+        "-t",
+        help="An IRC-2 token symbol. Can be used more than once.",
+        show_default=False,
+    ),
+    output_format: str = typer.Option(
+        "table",
+        "--format",
+        help="table, csv or jsonl.",
     ),
 ):
     """
-    View balance details for an ICX address.
+    View ICX and token balances for one or more addresses.
     """
+    import csv
+    import sys
+
+    from icon_cli.tokens import Tokens
+
+    if output_format not in ("table", "csv", "jsonl"):
+        Utils.exit(f"{output_format} is not a supported format. Use table, csv or jsonl.", "error")  # fmt: skip
+
+    addresses = list(addresses or [])
+    if addresses_file is not None:
+        addresses.extend(line.strip() for line in addresses_file if line.strip())
+    if len(addresses) == 0:
+        if Config.get_default_keystore_address() is None:
+            Utils.exit("Please provide an address or set a default keystore.", "error")
+        addresses = [Config.get_default_keystore_address()]
+    addresses = [Validators.validate_address(address) for address in addresses]
+
+    for token_symbol in token_symbols:
+        try:
+            token = Tokens.get_token(token_symbol)
+        except KeyError:
+            Utils.exit(f"{token_symbol} is not a known token.", "error")
+        if getattr(token, network) is None:
+            Utils.exit(f"{token.symbol} is not deployed on {network}.", "error")
+
     icx = IcxQuery(network)
-    if token_symbol is None:
-        balance = icx.get_balance(address, in_loop=in_loop)
-        print(f"{balance} ICX")
+
+    # A single balance is printed on its own, as this command always has.
+    if len(addresses) == 1 and len(token_symbols) <= 1 and output_format == "table":
+        if len(token_symbols) == 0:
+            balance = icx.get_balance(addresses[0], in_loop=in_loop)
+            print(f"{balance} ICX")
+        else:
+            balance = icx.get_token_balance(addresses[0], token_symbols[0], network, in_loop)  # fmt: skip
+            print(balance)
+        return
+
+    balances = icx.get_balances(addresses, token_symbols, in_loop)
+    columns = list(balances[0].keys())
+
+    if output_format == "jsonl":
+        for row in balances:
+            typer.echo(json.dumps(row, default=str))
+    elif output_format == "csv":
+        writer = csv.DictWriter(sys.stdout, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(balances)
     else:
-        balance = icx.get_token_balance(address, token_symbol, network)
-        print(balance)
+        from rich.table import Table
+
+        table = Table()
+        for column in columns:
+            table.add_column(column, justify="left" if column == "address" else "right")  # fmt: skip
+        for row in balances:
+            table.add_row(*["-" if value is None else str(value) for value in row.values()])  # fmt: skip
+        print(table)
 
 
 @app.command()
@@ -87,6 +218,370 @@ def block(
     print(block)
 
 
+@app.command()
+def blocks(
+    start: int = typer.Option(
+        ...,
+        "--from",
+        min=0,
+        help="The first block height to export.",
+    ),
+    end: int = typer.Option(
+        None,
+        "--to",
+        min=0,
+        help="The last block height to export. Defaults to the latest block.",
+    ),
+    output: Path = typer.Option(
+        ...,
+        "--output",
+        "-o",
+        help="The file to write to, or a directory for Parquet.",
+    ),
+    export_format: str = typer.Option(
+        None,
+        "--format",
+        "-f",
+        help="jsonl, csv or parquet. Defaults to the output's extension.",
+    ),
+    include_results: bool = typer.Option(
+        False,
+        "--tx-results",
+        help="Include the result of every transaction.",
+    ),
+    resume: bool = typer.Option(
+        False,
+        "--resume",
+        help="Continue an interrupted export from its last written block.",
+    ),
+    window: int = typer.Option(
+        IcxQuery.DEFAULT_PREFETCH_WINDOW,
+        "--window",
+        min=1,
+        help="The number of batches of blocks to fetch ahead.",
+    ),
+    chunk_size: int = typer.Option(
+        100,
+        "--chunk-size",
+        min=1,
+        help="The number of blocks to fetch in a single request.",
+    ),
+    network: str = typer.Option(
+        Config.get_default_network(),
+        "--network",
+        "-n",
+        help="The name of the ICON network to use.",
+    ),
+):
+    """
+    Export a range of blocks to JSONL, CSV or Parquet.
+    """
+    from icon_cli.export import BLOCK_WRITERS
+
+    if export_format is None:
+        export_format = output.suffix.lstrip(".").lower()
+    if export_format not in BLOCK_WRITERS:
+        Utils.exit(f"{export_format} is not a supported format. Use one of: {', '.join(BLOCK_WRITERS)}.", "error")  # fmt: skip
+    if export_format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            Utils.exit("Exporting to Parquet requires pyarrow (pip install pyarrow).", "error")  # fmt: skip
+    if output.exists() and resume is False:
+        Utils.exit(f"{output} already exists. Pass --resume to continue exporting to it.", "error")  # fmt: skip
+
+    icx = IcxQuery(network)
+    if end is None:
+        end = icx.get_block()["height"]
+
+    count = 0
+    with BLOCK_WRITERS[export_format](output) as writer:
+        last_height = writer.get_last_height()
+        if last_height is not None:
+            start = max(start, last_height + 1)
+        for block in icx.iter_blocks(start, end, include_results, window, chunk_size):
+            writer.write(block)
+            count += 1
+
+    print(f"Exported {count} blocks to {output}.")
+
+
+@app.command()
+def call(
+    contract_address: str = typer.Argument(
+        ...,
+        help="An ICON contract address or name.",
+    ),
+    method: str = typer.Argument(
+        ...,
+        help="A readonly method of the contract.",
+    ),
+    params: List[str] = typer.Option(
+        [],
+        "--param",
+        "-p",
+        help="A param as name=value, converted to the type in the ABI. Can be used more than once.",  # fmt: skip
+        show_default=False,
+    ),
+    height: int = typer.Option(
+        None,
+        "--height",
+        min=0,
+        help="The block height to query. Defaults to the last block.",
+    ),
+    raw: bool = typer.Option(
+        False,
+        "--raw",
+        help="Print the result as the node returns it.",
+    ),
+    network: str = typer.Option(
+        Config.get_default_network(),
+        "--network",
+        "-n",
+        help="The name of the ICON network to use.",
+    ),
+):
+    """
+    Call a readonly method of a contract and print its result as JSON, decoded with the
+    method's outputs in the ABI (e.g. an "int" output of "0x64" is printed as 100).
+    """
+    from icon_cli.abi import AbiCache
+    from icon_cli.contracts import Contracts
+
+    if not contract_address.startswith("cx"):
+        contract_address = Contracts.get_contract_address_from_name(contract_address, network)  # fmt: skip
+
+    icx = IcxQuery(network)
+    methods = AbiCache.get_methods(icx, contract_address, readonly=True)
+    if method not in methods:
+        Utils.exit(f"{method} is not a readonly method of {contract_address}.", "error")  # fmt: skip
+
+    input_types = {param["name"]: param["type"] for param in methods[method]["inputs"]}
+    call_params = {}
+    for param in params:
+        name, separator, value = param.partition("=")
+        if separator == "" or name not in input_types:
+            Utils.exit(f"{param} is not a param of {method}. Use name=value.", "error")
+        try:
+            value = AbiCache.coerce(input_types[name], value)
+        except ValueError as e:
+            Utils.exit(f"Invalid value for {name}: {e}", "error")
+        # JSON-RPC params are strings, so numbers and bools are sent as hex.
+        if isinstance(value, bool):
+            value = hex(int(value))
+        elif isinstance(value, int):
+            value = hex(value)
+        call_params[name] = value
+
+    result = icx.call(contract_address, method, call_params, height)
+    if raw is False:
+        result = AbiCache.get_decoder(icx, contract_address, method)(result)
+    typer.echo(json.dumps(result, indent=4, default=str))
+
+
+@app.command()
+def endpoints(
+    network: str = typer.Option(
+        Config.get_default_network(),
+        "--network",
+        "-n",
+        callback=Validators.validate_network,
+        help="The name of the ICON network to use.",
+    ),
+):
+    """
+    Check the health, latency and block height of every API endpoint of a network.
+    """
+    from rich.table import Table
+
+    from icon_cli.endpoints import EndpointPool
+
+    table = Table(title=network)
+    for column in ["Endpoint", "Available", "Latency (ms)", "Height", "Error"]:
+        table.add_column(column)
+    for endpoint in EndpointPool.get(network).check_health():
+        table.add_row(
+            endpoint["url"],
+            "yes" if endpoint["available"] else "no",
+            str(endpoint["latency_ms"]),
+            str(endpoint["height"]),
+            endpoint["last_error"],
+        )
+    print(table)
+
+
+@app.command()
+def history(
+    address: str = typer.Argument(
+        ...,
+        callback=Validators.validate_address,
+        help="An ICX wallet or contract address.",
+    ),
+    fetch_all: bool = typer.Option(
+        False,
+        "--all",
+        help="Fetch every transaction instead of the latest --limit transactions.",
+    ),
+    limit: int = typer.Option(
+        25,
+        "--limit",
+        min=1,
+        help="The number of transactions to fetch without --all.",
+    ),
+    output_format: str = typer.Option(
+        "table",
+        "--format",
+        "-f",
+        help="table or jsonl. jsonl prints transactions as they arrive.",
+    ),
+    network: str = typer.Option(
+        Config.get_default_network(),
+        "--network",
+        "-n",
+        help="The name of the ICON network to use.",
+    ),
+):
+    """
+    View the transaction history of an address from the tracker, newest first.
+    """
+    from itertools import islice
+
+    if output_format not in ("table", "jsonl"):
+        Utils.exit(f"{output_format} is not a supported format. Use table or jsonl.", "error")  # fmt: skip
+
+    tracker = Tracker(network)
+    if fetch_all is True:
+        transactions = tracker.iter_address_transactions(address)
+    else:
+        # Only request the pages needed for `limit` transactions.
+        page_size = min(limit, Tracker.MAX_PAGE_SIZE)
+        prefetch = min(Tracker.DEFAULT_PREFETCH_PAGES, max(1, -(-limit // page_size) - 1))  # fmt: skip
+        transactions = islice(tracker.iter_address_transactions(address, page_size, prefetch), limit)  # fmt: skip
+
+    if output_format == "jsonl":
+        for transaction in transactions:
+            typer.echo(json.dumps(transaction))
+        return
+
+    from rich.table import Table
+
+    table = Table(title=address)
+    for column in ["Hash", "Block", "From", "To", "Value", "Method", "Status"]:
+        table.add_column(column)
+    for transaction in transactions:
+        table.add_row(
+            transaction.get("hash"),
+            str(transaction.get("block_number")),
+            transaction.get("from_address"),
+            transaction.get("to_address"),
+            str(transaction.get("value_decimal", transaction.get("value"))),
+            transaction.get("method"),
+            "success" if transaction.get("status") == "0x1" else "failure",
+        )
+    print(table)
+
+
+@app.command()
+def series(
+    target: str = typer.Argument(
+        ...,
+        help="A contract address or name to call, or an address whose ICX balance to sample.",  # fmt: skip
+    ),
+    method: str = typer.Argument(
+        None,
+        help="A readonly method to sample. Omit it to sample the ICX balance of the target.",  # fmt: skip
+    ),
+    start: int = typer.Option(..., "--from", min=0, help="The first block height."),
+    end: int = typer.Option(
+        None,
+        "--to",
+        min=0,
+        help="The last block height. Defaults to the latest block.",
+    ),
+    step: int = typer.Option(
+        43200,
+        "--step",
+        min=1,
+        help="The number of blocks between samples. Defaults to about a day.",
+    ),
+    params: str = typer.Option(
+        "{}",
+        "--params",
+        help="The method's params as a JSON object.",
+    ),
+    field: str = typer.Option(
+        None,
+        "--field",
+        help="A key (or dotted path) to extract from a dictionary result.",
+    ),
+    decimals: int = typer.Option(
+        None,
+        "--decimals",
+        help="Divide integer values by 10 ** decimals.",
+    ),
+    timestamps: bool = typer.Option(
+        True,
+        help="Add the timestamp of every sampled block.",
+    ),
+    output: Path = typer.Option(
+        None,
+        "--output",
+        "-o",
+        help="A CSV file to write to. Defaults to stdout.",
+    ),
+    concurrency: int = typer.Option(
+        4,
+        "--concurrency",
+        min=1,
+        help="The maximum number of batch requests in flight.",
+    ),
+    network: str = typer.Option(
+        Config.get_default_network(),
+        "--network",
+        "-n",
+        help="The name of the ICON network to use.",
+    ),
+):
+    """
+    Sample a readonly method or an ICX balance at many block heights as CSV.
+    """
+    import csv
+    import sys
+    from contextlib import nullcontext
+
+    from icon_cli.contracts import Contracts
+    from icon_cli.series import Series
+
+    if not target.startswith(("cx", "hx")):
+        target = Contracts.get_contract_address_from_name(target, network)
+    try:
+        params = json.loads(params)
+    except json.JSONDecodeError:
+        Utils.exit("--params must be a JSON object.", "error")
+
+    icx = IcxQuery(network)
+    if end is None:
+        end = icx.get_block()["height"]
+    if end < start:
+        Utils.exit("--to must not be lower than --from.", "error")
+    heights = Series.get_heights(start, end, step)
+
+    if method is None:
+        rows = Series.sample_balance(icx, target, heights, timestamps, concurrency)
+    else:
+        rows = Series.sample_call(icx, target, method, heights, params, field, decimals, timestamps, concurrency)  # fmt: skip
+
+    with open(output, "w", newline="", encoding="utf-8") if output else nullcontext(sys.stdout) as f:  # fmt: skip
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        for row in rows:
+            if row.get("timestamp") is not None:
+                row["timestamp"] = row["timestamp"].isoformat()
+            if isinstance(row["value"], (dict, list)):
+                row["value"] = json.dumps(row["value"])
+            writer.writerow(row)
+
+
 @app.command()
 def tx(
     tx_hash: str = typer.Argument(
@@ -1,13 +1,16 @@
 import json
+from pathlib import Path
 
 import typer
 from rich import inspect, print
 
-from icon_cli import CONFIG
+from icon_cli.abi import AbiCache
+from icon_cli.bulk import BulkSender
 from icon_cli.commands.tx import gov
 from icon_cli.config import Config
 from icon_cli.contracts import Contracts
-from icon_cli.icx import IcxTx
+from icon_cli.icx import IcxQuery, IcxTx
+from icon_cli.offline import OfflineTx
 from icon_cli.utils import Utils
 from icon_cli.validators import Validators
 
@@ -39,6 +42,11 @@ def call(
         "--password",
         "-p",
     ),
+    wait: bool = typer.Option(
+        False,
+        "--wait",
+        help="Wait for the transaction to be confirmed and print its result.",
+    ),
     build_only: bool = False,
 ):
     """
@@ -53,17 +61,11 @@ def call(
     # Initialize IcxTx object.
     icx = IcxTx(network, keystore_name, keystore_password)
 
-    # Load ABI for the contract.
-    abi = icx.get_score_api(contract_address)
-
-    # Create a dictionary that maps method name to its ABI.
-    tx_methods = {}
-    for method in abi:
-        if method["type"] == "function" and "readonly" not in method.keys():
-            tx_methods[method["name"]] = method
+    # Load the writable methods of the contract from the ABI cache.
+    tx_methods = AbiCache.get_methods(icx, contract_address)
 
     # Create an alphabetical list of method names.
-    method_names = sorted(list(tx_methods.keys()))
+    method_names = list(tx_methods.keys())
 
     # Create a numbered list of method names and join elements with a newline.
     method_choices = "\n".join(
@@ -100,21 +102,19 @@ def call(
         param_name = param["name"]
         param_type = param["type"]
 
-        # Ask user to provide a value for the param.
-        param_value = typer.prompt(f"Provide a value for {param_name} ({param_type})")
+        # Ask user to provide a value for the param. Optional params can be skipped.
+        if param["optional"] is True:
+            param_value = typer.prompt(f"Provide a value for {param_name} ({param_type}, optional)", default="", show_default=False)  # fmt: skip
+            if param_value == "":
+                continue
+        else:
+            param_value = typer.prompt(f"Provide a value for {param_name} ({param_type})")  # fmt: skip
 
-        # Do some type checking.
-        if param_type == "Address":
-            Validators.validate_address(param_value)
-        elif param_type == "bool":
-            param_value = bool(param_value)
-        elif param_type == "int":
-            param_value = int(param_value)
-        elif param_type == "str":
-            param_value = str(param_value)
-
-        # Add param to the `params` dictionary.
-        params[param_name] = param_value
+        # Convert the value to the param's type.
+        try:
+            params[param_name] = AbiCache.coerce(param_type, param_value)
+        except ValueError as e:
+            Utils.exit(f"Invalid value for {param_name}: {e}", "error")
 
     # Build transaction.
     tx = icx.build_call_transaction(
@@ -138,6 +138,8 @@ def call(
         # Send transaction.
         tx_hash = icx.send_transaction(tx)
         print(tx_hash)
+        if wait is True:
+            print(icx.wait_for_transaction(tx_hash))
 
 
 @app.command()
@@ -163,6 +165,11 @@ def send(
         "--password",
         "-p",
     ),
+    wait: bool = typer.Option(
+        False,
+        "--wait",
+        help="Wait for the transaction to be confirmed and print its result.",
+    ),
     build_only: bool = False,
 ):
     """
@@ -177,3 +184,234 @@ def send(
 
     tx_hash = icx.send_transaction(tx)
     print(tx_hash)
+    if wait is True:
+        print(icx.wait_for_transaction(tx_hash))
+
+
+@app.command("batch-send")
+def batch_send(
+    batch_file: Path = typer.Argument(
+        ...,
+        exists=True,
+        dir_okay=False,
+        help="A CSV or JSONL file with to, value, and optional method and params columns.",  # fmt: skip
+    ),
+    network: str = typer.Option(
+        Config.get_default_network(),
+        "--network",
+        "-n",
+        callback=Validators.validate_network,
+    ),
+    keystore_name: str = typer.Option(
+        Config.get_default_keystore(),
+        "--keystore",
+        "-k",
+    ),
+    keystore_password: str = typer.Option(
+        None,
+        "--password",
+        "-p",
+    ),
+    results_path: Path = typer.Option(
+        None,
+        "--results",
+        help="JSONL file to record results in. Defaults to <batch_file>.results.jsonl.",  # fmt: skip
+    ),
+    concurrency: int = typer.Option(
+        BulkSender.DEFAULT_CONCURRENCY,
+        "--concurrency",
+        min=1,
+    ),
+):
+    """
+    Send every transaction in a CSV or JSONL file. Re-running the command with the same
+    results file resumes an interrupted batch without sending any row twice.
+    """
+    if results_path is None:
+        results_path = batch_file.with_suffix(".results.jsonl")
+
+    try:
+        rows = BulkSender.read_rows(batch_file)
+    except (KeyError, ValueError) as e:
+        Utils.exit(f"Could not read {batch_file}: {e}", "error")
+
+    icx = IcxTx(network, keystore_name, keystore_password)
+    results = BulkSender(icx, results_path, concurrency).send(rows)
+
+    statuses = [result["status"] for result in results]
+    print(f"Results written to {results_path}")
+    for status in ["success", "failure", "submitted", "failed"]:
+        print(f"{status}: {statuses.count(status)}")
+
+
+@app.command()
+def build(
+    batch_file: Path = typer.Argument(
+        ...,
+        exists=True,
+        dir_okay=False,
+        help="A CSV or JSONL file with to, value, and optional method and params columns.",  # fmt: skip
+    ),
+    out_dir: Path = typer.Argument(
+        ...,
+        file_okay=False,
+        help="The directory to write one unsigned transaction file per row to.",
+    ),
+    network: str = typer.Option(
+        Config.get_default_network(),
+        "--network",
+        "-n",
+        callback=Validators.validate_network,
+    ),
+    keystore_name: str = typer.Option(
+        Config.get_default_keystore(),
+        "--keystore",
+        "-k",
+    ),
+    from_address: str = typer.Option(
+        None,
+        "--from",
+        help="The address that will sign the transactions. Defaults to the address of the keystore.",  # fmt: skip
+    ),
+    step_limit: int = typer.Option(
+        IcxTx.DEFAULT_STEP_LIMIT,
+        "--step-limit",
+        min=1,
+    ),
+):
+    """
+    Build unsigned transactions for every row in a CSV or JSONL file without a keystore
+    password or a connection to a node, to be signed with `icon tx sign`.
+    """
+    if from_address is None:
+        if keystore_name is None:
+            Utils.exit("Please provide a --from address or a --keystore.", "error")
+        from_address = Config.get_keystore_public_key(f"{keystore_name}.json")
+    from_address = Validators.validate_address(from_address)
+
+    try:
+        rows = BulkSender.read_rows(batch_file)
+    except (KeyError, ValueError) as e:
+        Utils.exit(f"Could not read {batch_file}: {e}", "error")
+
+    nid = Config.get_network(network).nid
+    transactions = OfflineTx.build(rows, from_address, network, nid, step_limit)
+    OfflineTx.write(transactions, out_dir)
+    print(f"Wrote {len(transactions)} unsigned transactions to {out_dir}")
+
+
+@app.command()
+def sign(
+    tx_dir: Path = typer.Argument(
+        ...,
+        exists=True,
+        file_okay=False,
+        help="A directory of transaction files written by `icon tx build`.",
+    ),
+    out_dir: Path = typer.Option(
+        None,
+        "--out",
+        file_okay=False,
+        help="The directory to write signed transactions to. Defaults to signing them in place.",  # fmt: skip
+    ),
+    keystore_name: str = typer.Option(
+        Config.get_default_keystore(),
+        "--keystore",
+        "-k",
+    ),
+    keystore_password: str = typer.Option(
+        None,
+        "--password",
+        "-p",
+    ),
+    processes: int = typer.Option(
+        None,
+        "--processes",
+        min=1,
+        help="The number of signing processes. Defaults to the number of CPUs.",
+    ),
+    timestamp: int = typer.Option(
+        None,
+        "--timestamp",
+        min=0,
+        help="The timestamp to stamp every transaction with, in microseconds. Defaults to now.",  # fmt: skip
+    ),
+):
+    """
+    Stamp a directory of transactions with the current time and sign them without a
+    connection to a node. Large directories are signed in parallel by a pool of
+    processes. Signing a directory again re-stamps it, e.g. if it wasn't submitted in
+    time.
+    """
+    try:
+        transactions = [transaction for _, transaction in OfflineTx.read(tx_dir)]
+    except (KeyError, ValueError) as e:
+        Utils.exit(f"Could not read {tx_dir}: {e}", "error")
+
+    wallet = IcxTx._load_keystore(keystore_name, keystore_password)
+    try:
+        signed_transactions = OfflineTx.sign(transactions, wallet, processes, timestamp)
+    except ValueError as e:
+        Utils.exit(str(e), "error")
+
+    OfflineTx.write(signed_transactions, out_dir or tx_dir)
+    print(f"Signed {len(signed_transactions)} transactions in {out_dir or tx_dir}")
+
+
+@app.command()
+def submit(
+    tx_dir: Path = typer.Argument(
+        ...,
+        exists=True,
+        file_okay=False,
+        help="A directory of transaction files signed by `icon tx sign`.",
+    ),
+    network: str = typer.Option(
+        Config.get_default_network(),
+        "--network",
+        "-n",
+        callback=Validators.validate_network,
+    ),
+    chunk_size: int = typer.Option(
+        OfflineTx.DEFAULT_SUBMIT_CHUNK_SIZE,
+        "--chunk-size",
+        min=1,
+        help="The maximum number of transactions to send in a single request.",
+    ),
+    concurrency: int = typer.Option(
+        OfflineTx.DEFAULT_SUBMIT_CONCURRENCY,
+        "--concurrency",
+        min=1,
+    ),
+    wait: bool = typer.Option(
+        False,
+        "--wait",
+        help="Wait for the transactions to be confirmed and print their status.",
+    ),
+):
+    """
+    Submit a directory of signed transactions in bulk and print a JSON line with the
+    result of each one. Nodes reject transactions more than 5 minutes from their
+    timestamp, so submit them within 5 minutes of `icon tx sign`, or sign them again.
+    """
+    try:
+        transactions = [transaction for _, transaction in OfflineTx.read(tx_dir)]
+    except (KeyError, ValueError) as e:
+        Utils.exit(f"Could not read {tx_dir}: {e}", "error")
+
+    icx = IcxQuery(network)
+    try:
+        results = OfflineTx.submit(icx, transactions, chunk_size, concurrency)
+    except ValueError as e:
+        Utils.exit(str(e), "error")
+
+    if wait is True:
+        submitted = [result for result in results if result["status"] == "submitted"]
+        tx_results = icx.wait_for_results([result["tx_hash"] for result in submitted])
+        for result in submitted:
+            tx_result = tx_results[result["tx_hash"]]
+            if tx_result.ok:
+                result["status"] = "success" if tx_result.result["status"] == 1 else "failure"  # fmt: skip
+
+    for result in results:
+        typer.echo(json.dumps(result))
@@ -1,13 +1,16 @@
+import json
 import os
 import shutil
 from datetime import datetime
 from pathlib import Path
 
 import typer
+from iconsdk.exception import JSONRPCException
 from rich import print
 
 from icon_cli.config import Config
 from icon_cli.contracts import Contracts
+from icon_cli.governance import Governance
 from icon_cli.icx import IcxTx
 from icon_cli.utils import Utils
 from icon_cli.validators import Validators
@@ -33,6 +36,11 @@ def claim_iscore(
         "--password",
         "-p",
     ),
+    wait: bool = typer.Option(
+        False,
+        "--wait",
+        help="Wait for the transaction to be confirmed and print its result.",
+    ),
 ):
     """
     Claim ICX staking rewards.
@@ -43,6 +51,122 @@ def claim_iscore(
     )
     tx_hash = icx.send_transaction(tx)
     print(tx_hash)
+    if wait is True:
+        print(icx.wait_for_transaction(tx_hash))
+
+
+@app.command()
+def proposals(
+    status: str = typer.Option(
+        None,
+        "--status",
+        "-s",
+        help=f"Only list proposals with a status: {', '.join(Governance.STATUSES.values())}.",  # fmt: skip
+    ),
+    full_sync: bool = typer.Option(
+        False,
+        "--full-sync",
+        help="Fetch every proposal instead of only refreshing the open ones.",
+    ),
+    output_format: str = typer.Option(
+        "table",
+        "--format",
+        "-f",
+        help="table or jsonl.",
+    ),
+    network: str = typer.Option(
+        Config.get_default_network(),
+        "--network",
+        "-n",
+        callback=Validators.validate_network,
+    ),
+):
+    """
+    List network proposals, newest first.
+    """
+    if output_format not in ("table", "jsonl"):
+        Utils.exit(f"{output_format} is not a supported format. Use table or jsonl.", "error")  # fmt: skip
+    if status is not None and status not in Governance.STATUSES.values():
+        Utils.exit(f"{status} is not a proposal status.", "error")
+
+    network_proposals = Governance(network).get_proposals(full_sync)
+    rows = []
+    for proposal in network_proposals:
+        proposal_status = Governance.STATUSES.get(proposal["status"], str(proposal["status"]))  # fmt: skip
+        if status is not None and proposal_status != status:
+            continue
+        votes = proposal.get("vote", {})
+        rows.append(
+            {
+                "id": proposal["id"],
+                "title": proposal["contents"].get("title"),
+                "proposer": proposal.get("proposerName"),
+                "status": proposal_status,
+                "start_height": proposal["startBlockHeight"],
+                "end_height": proposal["endBlockHeight"],
+                "agree": votes.get("agree", {}).get("amount"),
+                "disagree": votes.get("disagree", {}).get("amount"),
+            }
+        )
+
+    if output_format == "jsonl":
+        for row in rows:
+            typer.echo(json.dumps(row, default=str))
+        return
+
+    from rich.table import Table
+
+    table = Table()
+    for column in ["ID", "Title", "Proposer", "Status", "Start", "End", "Agree", "Disagree"]:  # fmt: skip
+        table.add_column(column)
+    for row in rows:
+        table.add_row(*["-" if value is None else str(value) for value in row.values()])  # fmt: skip
+    print(table)
+
+
+@app.command()
+def votes(
+    proposal_id: str = typer.Argument(
+        ...,
+        help="Transaction hash for a network proposal.",
+    ),
+    output_format: str = typer.Option(
+        "table",
+        "--format",
+        "-f",
+        help="table or jsonl.",
+    ),
+    network: str = typer.Option(
+        Config.get_default_network(),
+        "--network",
+        "-n",
+        callback=Validators.validate_network,
+    ),
+):
+    """
+    List the votes cast on a network proposal.
+    """
+    if output_format not in ("table", "jsonl"):
+        Utils.exit(f"{output_format} is not a supported format. Use table or jsonl.", "error")  # fmt: skip
+
+    try:
+        proposal_votes = Governance(network).get_votes(proposal_id)
+    except JSONRPCException:
+        Utils.exit(f"{proposal_id} is not a valid network proposal.", "error")
+
+    if output_format == "jsonl":
+        for proposal_vote in proposal_votes:
+            typer.echo(json.dumps(proposal_vote, default=str))
+        return
+
+    from rich.table import Table
+
+    table = Table(title=proposal_id)
+    for column in ["Address", "Name", "Vote", "Amount", "Timestamp", "Tx Hash"]:
+        table.add_column(column)
+    for proposal_vote in proposal_votes:
+        table.add_row(*["-" if value is None else str(value) for value in proposal_vote.values()])  # fmt: skip
+    print(table)
 
 
 @app.command()
@@ -67,6 +191,11 @@ def vote(
         "--password",
         "-p",
     ),
+    wait: bool = typer.Option(
+        False,
+        "--wait",
+        help="Wait for the transaction to be confirmed and print its result.",
+    ),
 ):
     """
     Cast a vote on an ICON network proposal.
@@ -82,7 +211,7 @@ def vote(
         Utils.exit(f"{proposal_id} is not a valid network proposal.")
 
     print(f"Title: {proposal_details['contents']['title']}")
-    print(f"Description: {proposal_details['contents']['title']}")
+    print(f"Description: {proposal_details['contents']['description']}")
     print(f"Proposed By: {proposal_details['proposerName']} ({proposal_details['proposer']})")  # fmt: skip
 
     vote_decision = typer.confirm("Would you like to approve this network proposal?")  # fmt: skip
@@ -104,3 +233,5 @@ def vote(
     tx_hash = icx.send_transaction(tx)
 
     print(tx_hash)
+    if wait is True:
+        print(icx.wait_for_transaction(tx_hash))
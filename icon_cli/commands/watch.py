@@ -0,0 +1,146 @@
+import json
+from pathlib import Path
+from typing import Iterator
+
+import typer
+
+from icon_cli.config import Config
+from icon_cli.icx import IcxQuery
+from icon_cli.utils import Utils
+from icon_cli.validators import Validators
+from icon_cli.watch import Watcher
+
+app = typer.Typer(help="Stream new blocks and contract events as they're produced.")
+
+
+@app.command()
+def blocks(
+    start: int = typer.Option(
+        None,
+        "--start",
+        min=0,
+        help="The first block height. Defaults to the next block.",
+    ),
+    limit: int = typer.Option(
+        None,
+        "--limit",
+        min=1,
+        help="Stop after this many blocks.",
+    ),
+    output: Path = typer.Option(
+        None,
+        "--output",
+        "-o",
+        dir_okay=False,
+        help="Append JSON lines to a file instead of printing them.",
+    ),
+    transport: str = typer.Option(
+        "auto",
+        "--transport",
+        help="websocket, poll, or auto to fall back to polling if the node has no websocket.",  # fmt: skip
+    ),
+    poll_interval: float = typer.Option(
+        Watcher.DEFAULT_POLL_INTERVAL,
+        "--poll-interval",
+        min=0.1,
+        help="Seconds between polls when polling.",
+    ),
+    network: str = typer.Option(
+        Config.get_default_network(),
+        "--network",
+        "-n",
+        callback=Validators.validate_network,
+    ),
+):
+    """
+    Print every new block as a JSON line as soon as it's produced.
+    """
+    watcher = _get_watcher(network, transport, poll_interval)
+    _write_lines(watcher.iter_blocks(start), output, limit)
+
+
+@app.command()
+def events(
+    contract: str = typer.Option(
+        ...,
+        "--contract",
+        "-c",
+        callback=Validators.validate_contract_address,
+    ),
+    signature: str = typer.Option(
+        ...,
+        "--signature",
+        "-s",
+        help='The event\'s signature, e.g. "Transfer(Address,Address,int,bytes)".',
+    ),
+    start: int = typer.Option(
+        None,
+        "--start",
+        min=0,
+        help="The first block height. Defaults to the next block.",
+    ),
+    limit: int = typer.Option(
+        None,
+        "--limit",
+        min=1,
+        help="Stop after this many events.",
+    ),
+    output: Path = typer.Option(
+        None,
+        "--output",
+        "-o",
+        dir_okay=False,
+        help="Append JSON lines to a file instead of printing them.",
+    ),
+    transport: str = typer.Option(
+        "auto",
+        "--transport",
+        help="websocket, poll, or auto to fall back to polling if the node has no websocket.",  # fmt: skip
+    ),
+    poll_interval: float = typer.Option(
+        Watcher.DEFAULT_POLL_INTERVAL,
+        "--poll-interval",
+        min=0.1,
+        help="Seconds between polls when polling.",
+    ),
+    network: str = typer.Option(
+        Config.get_default_network(),
+        "--network",
+        "-n",
+        callback=Validators.validate_network,
+    ),
+):
+    """
+    Print every new event of a contract with a signature as a decoded JSON line.
+    """
+    if "(" not in signature or not signature.endswith(")"):
+        Utils.exit(f"{signature} is not an event signature.", "error")
+    watcher = _get_watcher(network, transport, poll_interval)
+    _write_lines(watcher.iter_events(contract, signature, start), output, limit)
+
+
+def _get_watcher(network: str, transport: str, poll_interval: float) -> Watcher:
+    try:
+        return Watcher(IcxQuery(network), transport, poll_interval)
+    except ValueError as e:
+        Utils.exit(str(e), "error")
+
+
+def _write_lines(items: Iterator[dict], output: Path, limit: int) -> None:
+    output_file = open(output, "a", encoding="utf-8") if output is not None else None
+    try:
+        for count, item in enumerate(items, start=1):
+            line = json.dumps(item, default=str)
+            if output_file is not None:
+                output_file.write(line + "\n")
+                output_file.flush()
+            else:
+                typer.echo(line)
+            if limit is not None and count >= limit:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        items.close()
+        if output_file is not None:
+            output_file.close()
@@ -6,11 +6,18 @@ from pathlib import Path
 
 import yaml
 
-from icon_cli import CONFIG_FILE, KEYSTORE_DIR
-from icon_cli.models import AppConfig
+from icon_cli import CONFIG_FILE, DEFAULT_NETWORKS, KEYSTORE_DIR
+from icon_cli.models import AppConfig, IcxNetwork
+from icon_cli.trace import Tracer
 
 
 class Config:
+
+    # Parsed config.yml and keystore addresses, invalidated when the file's mtime changes.
+    _config = None
+    _config_mtime = None
+    _keystore_addresses = {}
+
     def __init__(self) -> None:
         pass
 
@@ -23,6 +30,8 @@ class Config:
     @classmethod
     def get_default_keystore_address(cls) -> str:
         default_keystore = cls.get_default_keystore()
+        if default_keystore is None:
+            return None
         address = cls.get_keystore_public_key(f"{default_keystore}.json")
         return address
 
@@ -32,9 +41,24 @@ class Config:
         default_network = config.default_network
         return default_network
 
+    @classmethod
+    def get_network(cls, network: str) -> IcxNetwork:
+        """
+        Returns the endpoints and network ID of a network, from `custom_networks` in
+        config.yml if the network is defined there and the built-in networks otherwise.
+
+        Args:
+            network: Name of the network (e.g. "mainnet").
+        """
+        custom_network = cls._read_config().custom_networks.get(network)
+        if custom_network is not None:
+            return custom_network
+        return DEFAULT_NETWORKS[network]
+
     @classmethod
     def read_config(cls) -> AppConfig:
-        config = cls._read_config()
+        # Return a copy so that callers can modify it without changing the cached config.
+        config = cls._read_config().copy(deep=True)
         return config
 
     @classmethod
@@ -47,6 +71,8 @@ class Config:
         """
         with open(CONFIG_FILE, "w+") as f:
             yaml.safe_dump(config.dict(), f)
+        cls._config = config.copy(deep=True)
+        cls._config_mtime = os.stat(CONFIG_FILE).st_mtime_ns
         return
 
     ####################
@@ -74,8 +100,14 @@ class Config:
 
     @classmethod
     def get_keystore_public_key(cls, keystore_filename: Path) -> str:
-        keystore_data = cls.read_keystore(f"{KEYSTORE_DIR}/{keystore_filename}")
+        keystore_path = f"{KEYSTORE_DIR}/{keystore_filename}"
+        mtime = os.stat(keystore_path).st_mtime_ns
+        cached = cls._keystore_addresses.get(keystore_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        keystore_data = cls.read_keystore(keystore_path)
         public_key = keystore_data["address"]
+        cls._keystore_addresses[keystore_path] = (mtime, public_key)
         return public_key
 
     @classmethod
@@ -91,10 +123,17 @@ class Config:
 
     @classmethod
     def _read_config(cls) -> AppConfig:
-        with open(CONFIG_FILE, "r") as f:
-            data = yaml.safe_load(f)
-            config = AppConfig(**data)
-        return config
+        """
+        Returns the parsed config.yml, which is only read from disk again if the file
+        has been modified since it was last parsed.
+        """
+        mtime = os.stat(CONFIG_FILE).st_mtime_ns
+        if cls._config is None or mtime != cls._config_mtime:
+            with Tracer.phase("config"), open(CONFIG_FILE, "r") as f:
+                data = yaml.safe_load(f)
+                cls._config = AppConfig(**data)
+            cls._config_mtime = mtime
+        return cls._config
 
     @staticmethod
     def _copy_file(source, destination) -> None:
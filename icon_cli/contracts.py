@@ -23,6 +23,10 @@ class Contracts:
             sejong="cx0000000000000000000000000000000000000001",
             localhost="cx0000000000000000000000000000000000000001",
         ),
+        "cps": IcxContract(
+            name="Contribution Proposal System",
+            mainnet="cx9f4ab72f854d3ccdc59aa6f2c3e2215dd62e879f",
+        ),
         "balancedDex": IcxContract(
             name="Balanced DEX",
             mainnet="cxa0af3165c08318e988cb30993b3048335b94af6c",
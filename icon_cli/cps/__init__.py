@@ -0,0 +1,353 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+
+from iconsdk.exception import JSONRPCException
+
+from icon_cli import DATA_DIR
+from icon_cli.contracts import Contracts
+from icon_cli.decoder import Decoder
+from icon_cli.icx import IcxQuery
+from icon_cli.utils import Utils
+
+
+class Cps(IcxQuery):
+
+    DEFAULT_MAX_WORKERS = 16
+
+    # The numeric fields of the proposals and progress reports the CPS contract returns.
+    # Every other field (hashes, addresses, titles and statuses) is a string.
+    VOTE_SCHEMA = {field: "int" for field in ["total_votes", "approved_votes", "rejected_votes", "total_voters", "approve_voters", "reject_voters", "budget_adjustment"]}  # fmt: skip
+    PROPOSAL_SCHEMA = {**VOTE_SCHEMA, **{field: "int" for field in ["approved_reports", "last_progress_report", "new_progress_report", "percentage_completed", "project_duration", "sponsor_deposit_amount", "sponsored_timestamp", "timestamp", "total_budget"]}}  # fmt: skip
+    PROGRESS_REPORT_SCHEMA = {**VOTE_SCHEMA, **{field: "int" for field in ["additional_budget", "additional_month", "budget_approve_voters", "budget_approved_votes", "budget_reject_voters", "budget_rejected_votes", "timestamp"]}}  # fmt: skip
+
+    # Decoders for the results of each method, compiled once.
+    DECODERS = {
+        "get_active_proposals": Decoder.compile([PROPOSAL_SCHEMA]),
+        "get_progress_reports": Decoder.compile({"data": [PROGRESS_REPORT_SCHEMA], "count": "int"}),  # fmt: skip
+        "get_remaining_progress_reports_to_vote": Decoder.compile([PROGRESS_REPORT_SCHEMA]),  # fmt: skip
+        "get_remaining_proposals_to_vote": Decoder.compile([PROPOSAL_SCHEMA]),
+        "get_treasury_balance": Decoder.compile({"ICX": "int", "bnUSD": "int"}),
+        "get_validators": Decoder.compile([{"delegated": "int"}]),
+    }
+
+    SNAPSHOT_VERSION = 1
+    SNAPSHOT_DIR = f"{DATA_DIR}/cps"
+    # The field that identifies each item of a snapshot's lists, for diffing.
+    SNAPSHOT_KEYS = {"active_proposals": "ipfs_hash", "progress_reports": "report_hash", "validators": "address"}  # fmt: skip
+
+    def __init__(self, network) -> None:
+        super().__init__(network)
+
+        if network != "mainnet":
+            Utils.exit("This command only supports mainnet at this time.", "error")
+
+    ##############################
+    # PROPOSALS/PROGRESS REPORTS #
+    ##############################
+
+    def get_active_proposals(self, max_workers: int = DEFAULT_MAX_WORKERS) -> list:
+        """
+        Returns the active proposals of every CPS contributor.
+
+        Contributors are queried concurrently, and proposals are returned grouped by
+        contributor in sorted address order so the output is the same on every run.
+
+        Args:
+            max_workers: The maximum number of contributors to query at the same time.
+        """
+        contributor_addresses = sorted(set(self.get_contributors()))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            proposals_by_contributor = executor.map(
+                self._get_active_proposals, contributor_addresses
+            )
+            active_proposals = [proposal for proposals in proposals_by_contributor for proposal in proposals]  # fmt: skip
+        return active_proposals
+
+    def get_progress_reports(self):
+        params = {"_status": "_waiting", "_start_index": 0}
+        progress_reports = self.call(
+            Contracts.get_contract_address_from_name("cps", self.network),
+            "get_progress_reports",
+            params,
+        )
+        return self.DECODERS["get_progress_reports"](progress_reports)
+
+    def get_remaining_progress_reports_to_vote(self, address: str):
+        params = {"_wallet_address": address, "_project_type": "progress_reports"}
+        progress_reports = self.call(
+            Contracts.get_contract_address_from_name("cps", self.network),
+            "get_remaining_project",
+            params,
+        )
+        return self.DECODERS["get_remaining_progress_reports_to_vote"](progress_reports)
+
+    def get_remaining_proposals_to_vote(self, address: str):
+        params = {"_wallet_address": address, "_project_type": "proposal"}
+        proposals = self.call(
+            Contracts.get_contract_address_from_name("cps", self.network),
+            "get_remaining_project",
+            params,
+        )
+        return self.DECODERS["get_remaining_proposals_to_vote"](proposals)
+
+    def vote_progress_report(
+        self,
+        wallet,
+        vote: str,
+        reason: str,
+        ipfs_key: str,
+        report_key: str,
+        vote_change: int,
+    ):
+        params = {
+            "_vote": vote,
+            "_vote_reason": reason,
+            "_ipfs_key": ipfs_key,
+            "_report_key": report_key,
+            "_vote_change": vote_change,
+        }
+        transaction = self.build_call_transaction(
+            wallet,
+            Contracts.get_contract_address_from_name("cps", self.network),
+            0,
+            "vote_progress_report",
+            params,
+        )
+        tx_hash = self.send_transaction(wallet, transaction)
+        return tx_hash
+
+    def vote_proposal(
+        self, wallet, vote: str, reason: str, ipfs_key: str, vote_change: int
+    ):
+        params = {
+            "_vote": vote,
+            "_vote_reason": reason,
+            "_ipfs_key": ipfs_key,
+            "_vote_change": vote_change,
+        }
+        transaction = self.build_call_transaction(
+            wallet,
+            Contracts.get_contract_address_from_name("cps", self.network),
+            0,
+            "vote_proposal",
+            params,
+        )
+        tx_hash = self.send_transaction(wallet, transaction)
+        return tx_hash
+
+    ################
+    # CONTRIBUTORS #
+    ################
+
+    def get_contributors(self) -> list:
+        contributors = self.call(
+            Contracts.get_contract_address_from_name("cps", self.network),
+            "get_contributors",
+        )
+        return contributors
+
+    def get_validators(self) -> list:
+        validators = self.call(
+            Contracts.get_contract_address_from_name("cps", self.network), "get_PReps"
+        )
+        return self.DECODERS["get_validators"](validators)
+
+    ############
+    # TREASURY #
+    ############
+
+    def get_treasury_balance(self, block_height: int = None) -> int:
+        balance = self.call(
+            Contracts.get_contract_address_from_name("cps", self.network),
+            "get_remaining_fund",
+            height=block_height,
+        )
+        return self.DECODERS["get_treasury_balance"](balance)
+
+    #############
+    # SNAPSHOTS #
+    #############
+
+    def get_snapshot(
+        self,
+        block_height: int = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> dict:
+        """
+        Returns the contributors, active proposals, progress reports, validators and
+        treasury balance of the CPS at a block height.
+
+        Every query is pinned to the same height, so the parts of a snapshot agree with
+        each other. The contributor-independent queries are sent as one batch post, and
+        the active proposals of every contributor and the remaining pages of progress
+        reports as another. Pinned queries are answered from the on-disk cache if a
+        height is collected again.
+
+        Args:
+            block_height: The block height to query. Defaults to the last block.
+            max_workers: The maximum number of batch posts in flight.
+        """
+        if block_height is None:
+            block_height = self.get_block()["height"]
+        cps = Contracts.get_contract_address_from_name("cps", self.network)
+
+        with self.batch() as batch:
+            batch.call(cps, "get_contributors", height=block_height)
+            batch.call(cps, "get_progress_reports", {"_status": "_waiting", "_start_index": 0}, block_height)  # fmt: skip
+            batch.call(cps, "get_PReps", height=block_height)
+            batch.call(cps, "get_remaining_fund", height=block_height)
+        contributors, progress_reports, validators, treasury = self._get_results(batch.results)  # fmt: skip
+
+        # The first page tells how many progress reports there are and the page size.
+        progress_reports = self.DECODERS["get_progress_reports"](progress_reports)
+        report_count = progress_reports["count"]
+        progress_reports = progress_reports["data"]
+        page_size = len(progress_reports)
+        report_starts = list(range(page_size, report_count, page_size)) if page_size > 0 else []  # fmt: skip
+
+        contributor_addresses = sorted(set(contributors))
+        with self.batch(concurrency=max_workers) as batch:
+            for address in contributor_addresses:
+                batch.call(cps, "get_active_proposals", {"_wallet_address": address}, block_height)  # fmt: skip
+            for start in report_starts:
+                batch.call(cps, "get_progress_reports", {"_status": "_waiting", "_start_index": start}, block_height)  # fmt: skip
+        results = self._get_results(batch.results)
+        active_proposals = [proposal for proposals in results[: len(contributor_addresses)] for proposal in self.DECODERS["get_active_proposals"](proposals)]  # fmt: skip
+        for page in results[len(contributor_addresses) :]:
+            progress_reports.extend(self.DECODERS["get_progress_reports"](page)["data"])
+        progress_reports.extend(self._get_progress_report_pages(cps, len(progress_reports), report_count, block_height))  # fmt: skip
+
+        return {
+            "version": self.SNAPSHOT_VERSION,
+            "network": self.network,
+            "height": block_height,
+            "contributors": contributor_addresses,
+            "active_proposals": active_proposals,
+            "progress_reports": progress_reports,
+            "validators": self.DECODERS["get_validators"](validators),
+            "treasury": self.DECODERS["get_treasury_balance"](treasury),
+        }
+
+    @classmethod
+    def write_snapshot(cls, snapshot: dict, directory: Path = None) -> Path:
+        """
+        Writes a snapshot to a directory, named after its height, and returns its path.
+
+        Args:
+            snapshot: A snapshot returned by `get_snapshot()`.
+            directory: The directory to write to. Defaults to SNAPSHOT_DIR.
+        """
+        directory = Path(directory if directory is not None else cls.SNAPSHOT_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{snapshot['network']}-{snapshot['height']:012d}.json"
+        tmp_path = path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(snapshot, indent=4, default=str) + "\n", encoding="utf-8")  # fmt: skip
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def read_snapshot(cls, path: Path) -> dict:
+        """
+        Returns a snapshot written by `write_snapshot()`.
+
+        Args:
+            path: The path of the snapshot file.
+        """
+        snapshot = json.loads(Path(path).read_text(encoding="utf-8"))
+        if snapshot.get("version") != cls.SNAPSHOT_VERSION:
+            raise ValueError(f"{path} isn't a version {cls.SNAPSHOT_VERSION} CPS snapshot.")  # fmt: skip
+        return snapshot
+
+    @classmethod
+    def list_snapshots(cls, network: str, directory: Path = None) -> List[Path]:
+        """
+        Returns the paths of a network's snapshots in a directory, oldest first.
+
+        Args:
+            network: The name of the ICON network.
+            directory: The directory to look in. Defaults to SNAPSHOT_DIR.
+        """
+        directory = Path(directory if directory is not None else cls.SNAPSHOT_DIR)
+        return sorted(directory.glob(f"{network}-*.json"))
+
+    @classmethod
+    def diff_snapshots(cls, old: dict, new: dict) -> dict:
+        """
+        Returns what changed between two snapshots: contributors that were added or
+        removed, the proposals, progress reports and validators that were added,
+        removed or changed (with the old and new value of every changed field), and the
+        old and new value of every changed treasury balance.
+
+        Args:
+            old: The earlier snapshot.
+            new: The later snapshot.
+        """
+        diff = {
+            "from_height": old["height"],
+            "to_height": new["height"],
+            "contributors": {
+                "added": sorted(set(new["contributors"]) - set(old["contributors"])),
+                "removed": sorted(set(old["contributors"]) - set(new["contributors"])),
+            },
+        }
+        for section, key in cls.SNAPSHOT_KEYS.items():
+            old_items = {item[key]: item for item in old[section]}
+            new_items = {item[key]: item for item in new[section]}
+            changed = {}
+            for item_key, item in new_items.items():
+                if item_key in old_items and item != old_items[item_key]:
+                    changed[item_key] = cls._diff_fields(old_items[item_key], item)
+            diff[section] = {
+                "added": [item for item_key, item in new_items.items() if item_key not in old_items],  # fmt: skip
+                "removed": [item for item_key, item in old_items.items() if item_key not in new_items],  # fmt: skip
+                "changed": changed,
+            }
+        diff["treasury"] = cls._diff_fields(old["treasury"], new["treasury"])
+        return diff
+
+    ##############################
+    # INTERNAL UTILITY FUNCTIONS #
+    ##############################
+
+    @staticmethod
+    def _diff_fields(old: dict, new: dict) -> dict:
+        fields = list(old) + [field for field in new if field not in old]
+        return {field: [old.get(field), new.get(field)] for field in fields if old.get(field) != new.get(field)}  # fmt: skip
+
+    @staticmethod
+    def _get_results(results: list) -> list:
+        errors = [result.error for result in results if not result.ok]
+        if len(errors) > 0:
+            raise JSONRPCException(errors[0])
+        return [result.result for result in results]
+
+    def _get_progress_report_pages(
+        self,
+        cps: str,
+        start: int,
+        count: int,
+        block_height: int,
+    ) -> list:
+        # Pages one at a time from `start` until `count` reports are read, in case the
+        # contract returned a short page.
+        progress_reports = []
+        while start + len(progress_reports) < count:
+            params = {"_status": "_waiting", "_start_index": start + len(progress_reports)}  # fmt: skip
+            page = self.call(cps, "get_progress_reports", params, height=block_height)
+            page = self.DECODERS["get_progress_reports"](page)["data"]
+            if len(page) == 0:
+                break
+            progress_reports.extend(page)
+        return progress_reports
+
+    def _get_active_proposals(self, address: str):
+        params = {"_wallet_address": address}
+        proposals = self.call(
+            Contracts.get_contract_address_from_name("cps", self.network),
+            "get_active_proposals",
+            params,
+        )
+        return self.DECODERS["get_active_proposals"](proposals)
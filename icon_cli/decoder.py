@@ -0,0 +1,112 @@
+from decimal import Decimal
+from typing import Callable, Union
+
+from icon_cli import EXA
+
+
+class Decoder:
+    """
+    Decodes contract call results with a schema that's compiled once into a function,
+    instead of checking every value of every result for a "0x" prefix.
+
+    A schema is one of:
+        - A type name: "int" (hex to int), "loop" (hex loop to a Decimal of whole
+          units), "bool" (hex to bool), or "str", "Address" and "bytes", which are left
+          as they are. Unknown type names are also left as they are.
+        - A callable that converts a value.
+        - A dictionary of key to schema. Keys that aren't in the schema are left as
+          they are, so a string that happens to start with "0x" is never decoded.
+        - A list with one schema, which decodes every item of a list.
+
+    Dictionaries and lists are decoded in place and returned.
+    """
+
+    TYPES = {
+        "bool": lambda value: int(value, 16) != 0,
+        "int": lambda value: int(value, 16),
+        "loop": lambda value: Decimal(int(value, 16)) / EXA,
+    }
+
+    def __init__(self) -> None:
+        pass
+
+    @classmethod
+    def compile(cls, schema: Union[str, Callable, dict, list]) -> Callable:
+        """
+        Returns a function that decodes a value with a schema.
+
+        Args:
+            schema: A schema as described above.
+        """
+        if isinstance(schema, dict):
+            return cls._compile_dict(schema)
+        if isinstance(schema, list):
+            return cls._compile_list(schema[0])
+        if callable(schema):
+            return schema
+        convert = cls.TYPES.get(schema)
+        if convert is None:
+            return cls._identity
+        return cls._tolerant(convert)
+
+    @classmethod
+    def from_abi(cls, method: dict) -> Callable:
+        """
+        Returns a function that decodes the result of a readonly method from its ABI.
+        ABIs don't describe the fields of "dict" and "list" outputs, so those are left
+        as they are.
+
+        Args:
+            method: A function from a contract's ABI.
+        """
+        outputs = method.get("outputs") or []
+        if len(outputs) != 1:
+            return cls._identity
+        return cls.compile(outputs[0]["type"])
+
+    ##############################
+    # INTERNAL UTILITY FUNCTIONS #
+    ##############################
+
+    @staticmethod
+    def _identity(value):
+        return value
+
+    @staticmethod
+    def _tolerant(convert: Callable) -> Callable:
+        # Contracts return an empty string or null for some unset numbers, which are
+        # left as they are rather than failing the whole result.
+        def decode(value):
+            try:
+                return convert(value)
+            except (TypeError, ValueError):
+                return value
+
+        return decode
+
+    @classmethod
+    def _compile_dict(cls, schema: dict) -> Callable:
+        decoders = [(key, cls.compile(value)) for key, value in schema.items()]
+        decoders = [(key, decode) for key, decode in decoders if decode is not cls._identity]  # fmt: skip
+
+        def decode(value):
+            if not isinstance(value, dict):
+                return value
+            for key, decode_value in decoders:
+                if key in value:
+                    value[key] = decode_value(value[key])
+            return value
+
+        return decode
+
+    @classmethod
+    def _compile_list(cls, schema) -> Callable:
+        decode_item = cls.compile(schema)
+
+        def decode(value):
+            if not isinstance(value, list):
+                return value
+            value[:] = [decode_item(item) for item in value]
+            return value
+
+        return decode
@@ -0,0 +1,270 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from json import JSONDecodeError
+from typing import List
+
+import requests
+
+from icon_cli.config import Config
+from icon_cli.httpreq import HttpReq
+from icon_cli.trace import Tracer
+
+
+class Endpoint:
+    """
+    The routing state of one API endpoint in an EndpointPool.
+    """
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        # An exponentially weighted moving average of response times in seconds, or
+        # None until the endpoint has answered a request.
+        self.latency = None
+        self.height = None
+        self.failures = 0
+        # The time.monotonic() value before which the endpoint isn't used.
+        self.available_at = 0.0
+        self.last_error = None
+
+    def to_dict(self) -> dict:
+        return {
+            "url": self.url,
+            "available": self.available_at <= time.monotonic(),
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,  # fmt: skip
+            "height": self.height,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+class EndpointPool:
+    """
+    Routes JSON-RPC posts for a network across a pool of API endpoints: the network's
+    `api_endpoint` and its `api_endpoints`, from `custom_networks` in config.yml if the
+    network is defined there.
+
+    Each request goes to an endpoint picked at random with a weight of 1/latency², so
+    the fastest endpoint gets most of the traffic while the others are still measured.
+    An endpoint that fails (a connection error, a timeout, a rate limit or a gateway
+    error) is skipped for a cooldown that doubles with every consecutive failure, and
+    the request fails over to the next fastest endpoint.
+
+    Transactions, and lookups of their results, stick to the endpoint that the first
+    transaction was sent to, since a node knows about its own pending transactions
+    before its peers do. A transaction is only sent to another endpoint if it provably
+    never reached the first one, so a slow node can't make us submit it twice.
+    """
+
+    # Methods that are routed to the sticky endpoint.
+    STICKY_METHODS = ["icx_sendTransaction", "icx_sendTransactionAndWait", "icx_getTransactionResult", "icx_waitTransactionResult", "icx_getTransactionByHash"]  # fmt: skip
+    # Methods that are only failed over if the request never reached the endpoint.
+    SUBMIT_METHODS = ["icx_sendTransaction", "icx_sendTransactionAndWait"]
+    # HTTP status codes that mean the endpoint, not the request, is the problem.
+    FAILOVER_STATUS_CODES = [429, 502, 503, 504]
+
+    # The weight of a new response time in the latency average.
+    LATENCY_SMOOTHING = 0.3
+    # The cooldown after a first failure, doubled for every consecutive failure.
+    MIN_COOLDOWN = 2
+    MAX_COOLDOWN = 300
+    # An endpoint that's more blocks than this behind the others is treated as failed.
+    MAX_BLOCK_LAG = 10
+    HEALTH_CHECK_TIMEOUT = 3
+
+    # Pools created in this process, keyed by network and endpoint URLs.
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, network: str, urls: List[str]) -> None:
+        self.network = network
+        self.endpoints = [Endpoint(url.rstrip("/")) for url in dict.fromkeys(urls)]
+        self._sticky = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get(cls, network: str) -> "EndpointPool":
+        """
+        Returns the shared pool for a network, so that every Icx object in a process
+        routes with the same latency and failure history.
+
+        Args:
+            network: Name of the network (e.g. "mainnet").
+        """
+        _network = Config.get_network(network)
+        urls = tuple([_network.api_endpoint] + _network.api_endpoints)
+        with cls._pools_lock:
+            pool = cls._pools.get((network, urls))
+            if pool is None:
+                pool = cls(network, list(urls))
+                cls._pools[(network, urls)] = pool
+        return pool
+
+    def post(self, path: str, payload, timeout: int = None):
+        """
+        Posts a JSON-RPC payload to the best endpoint, failing over to the others, and
+        returns the decoded JSON response like `HttpReq.post()`. Raises the last error
+        if no endpoint could answer.
+
+        Args:
+            path: The path of the API (e.g. "/api/v3").
+            payload: A JSON-RPC request or a list of requests.
+            timeout: Request timeout in seconds. Defaults to `http_timeout` in config.yml.
+        """
+        rpcs = payload if isinstance(payload, list) else [payload]
+        methods = {rpc.get("method") for rpc in rpcs}
+        sticky = len(methods & set(self.STICKY_METHODS)) > 0
+        submit = len(methods & set(self.SUBMIT_METHODS)) > 0
+
+        error = None
+        for attempt, endpoint in enumerate(self.get_route(sticky), start=1):
+            if error is not None:
+                Tracer.record_retry(Tracer.get_request_name(endpoint.url + path, payload), attempt - 1, str(error))  # fmt: skip
+            started_at = time.monotonic()
+            try:
+                r = HttpReq.post_response(endpoint.url + path, payload, timeout)
+            except requests.ConnectionError as e:
+                # The request never reached the endpoint (a connect timeout is also a
+                # ConnectionError), so it's always safe to send it elsewhere.
+                self.record_failure(endpoint, e)
+                error = e
+                continue
+            except requests.Timeout as e:
+                self.record_failure(endpoint, e)
+                if submit:
+                    raise
+                error = e
+                continue
+
+            if r.status_code in self.FAILOVER_STATUS_CODES:
+                error = requests.HTTPError(f"{r.status_code} {r.reason} from {endpoint.url}", response=r)  # fmt: skip
+                self.record_failure(endpoint, error)
+                if submit and r.status_code != 429:
+                    # A gateway error doesn't tell us if the node got the transaction.
+                    raise error
+                continue
+            try:
+                # ICON nodes return JSON-RPC errors with non-2xx status codes.
+                response = r.json()
+            except JSONDecodeError as e:
+                self.record_failure(endpoint, e)
+                if submit:
+                    r.raise_for_status()
+                    raise
+                # Like `HttpReq.post()`, an error status is raised instead of the body.
+                error = e if r.ok else requests.HTTPError(f"{r.status_code} {r.reason} from {endpoint.url}", response=r)  # fmt: skip
+                continue
+
+            self.record_success(endpoint, time.monotonic() - started_at, sticky)
+            return response
+        raise error
+
+    def get_route(self, sticky: bool = False) -> List[Endpoint]:
+        """
+        Returns the endpoints in the order to try them: a latency-weighted random pick
+        (or the sticky endpoint) first, then the other available endpoints from fastest
+        to slowest, then endpoints in a cooldown from the soonest available.
+
+        Args:
+            sticky: Start with the endpoint that transactions are sent to.
+        """
+        now = time.monotonic()
+        with self._lock:
+            available = [e for e in self.endpoints if e.available_at <= now]
+            cooling = sorted([e for e in self.endpoints if e.available_at > now], key=lambda e: e.available_at)  # fmt: skip
+            if len(available) == 0:
+                return cooling
+
+            if sticky is True and self._sticky in available:
+                first = self._sticky
+            elif all(e.latency is None for e in available):
+                # Nothing's been measured yet, so keep the configured order.
+                first = available[0]
+            else:
+                # Unmeasured endpoints are assumed to be as fast as the fastest one, so
+                # they get traffic and a measurement.
+                fastest = min(e.latency for e in available if e.latency is not None)
+                weights = [1 / max(e.latency if e.latency is not None else fastest, 0.001) ** 2 for e in available]  # fmt: skip
+                first = random.choices(available, weights)[0]
+
+            others = sorted([e for e in available if e is not first], key=lambda e: e.latency if e.latency is not None else 0)  # fmt: skip
+        return [first] + others + cooling
+
+    def check_health(self) -> List[dict]:
+        """
+        Requests the last block from every endpoint at once, records their latency and
+        height, puts endpoints that fail or lag behind the others in a cooldown, and
+        returns the state of every endpoint.
+        """
+
+        def get_height(endpoint: Endpoint) -> None:
+            payload = {"jsonrpc": "2.0", "method": "icx_getLastBlock", "id": 1}
+            started_at = time.monotonic()
+            try:
+                r = HttpReq.post_response(f"{endpoint.url}/api/v3", payload, self.HEALTH_CHECK_TIMEOUT)  # fmt: skip
+                endpoint.height = r.json()["result"]["height"]
+            except (requests.RequestException, ValueError, KeyError, TypeError) as e:
+                self.record_failure(endpoint, e)
+                return
+            self.record_success(endpoint, time.monotonic() - started_at)
+
+        with ThreadPoolExecutor(max_workers=len(self.endpoints)) as executor:
+            list(executor.map(get_height, self.endpoints))
+
+        heights = [e.height for e in self.endpoints if e.height is not None]
+        for endpoint in self.endpoints:
+            if endpoint.height is not None and max(heights) - endpoint.height > self.MAX_BLOCK_LAG:  # fmt: skip
+                self.record_failure(endpoint, f"{max(heights) - endpoint.height} blocks behind")  # fmt: skip
+        return self.get_status()
+
+    def get_status(self) -> List[dict]:
+        """
+        Returns the URL, availability, average latency, last seen height, consecutive
+        failures and last error of every endpoint.
+        """
+        with self._lock:
+            return [endpoint.to_dict() for endpoint in self.endpoints]
+
+    def record_success(
+        self,
+        endpoint: Endpoint,
+        latency: float,
+        sticky: bool = False,
+    ) -> None:
+        """
+        Records a response from an endpoint, for requests that aren't sent with
+        `post()` (e.g. by the asyncio clients).
+
+        Args:
+            endpoint: The endpoint that answered.
+            latency: The response time in seconds.
+            sticky: Make it the endpoint that transactions are sent to.
+        """
+        with self._lock:
+            if endpoint.latency is None:
+                endpoint.latency = latency
+            else:
+                endpoint.latency += self.LATENCY_SMOOTHING * (
+                    latency - endpoint.latency
+                )
+            endpoint.failures = 0
+            endpoint.available_at = 0.0
+            if sticky is True:
+                self._sticky = endpoint
+
+    def record_failure(self, endpoint: Endpoint, error) -> None:
+        """
+        Records a failed request to an endpoint and puts it in a cooldown.
+
+        Args:
+            endpoint: The endpoint that failed.
+            error: The error, or a description of it.
+        """
+        with self._lock:
+            endpoint.failures += 1
+            cooldown = min(self.MIN_COOLDOWN * 2 ** (endpoint.failures - 1), self.MAX_COOLDOWN)  # fmt: skip
+            endpoint.available_at = time.monotonic() + cooldown
+            endpoint.last_error = str(error)
+            if self._sticky is endpoint:
+                self._sticky = None
@@ -0,0 +1,221 @@
+import csv
+import json
+import os
+import re
+from abc import ABC, abstractmethod
+from decimal import Decimal
+from pathlib import Path
+
+
+class BlockWriter(ABC):
+    """
+    Base class for writers that stream blocks to a file in height order.
+
+    Writers append to an existing export, and `get_last_height()` returns the height of
+    the last block that was completely written so an interrupted export can resume.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+
+    def __enter__(self) -> "BlockWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    @abstractmethod
+    def write(self, block: dict) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    @abstractmethod
+    def get_last_height(self) -> int:
+        pass
+
+    @staticmethod
+    def to_json(value) -> str:
+        return json.dumps(value, default=BlockWriter._json_default, separators=(",", ":"))  # fmt: skip
+
+    @staticmethod
+    def to_row(block: dict) -> dict:
+        """
+        Flattens a block into a row for tabular formats. Transactions are kept as a
+        JSON string.
+
+        Args:
+            block: A block returned by `IcxQuery.iter_blocks()`.
+        """
+        return {
+            "height": block["height"],
+            "block_hash": block["block_hash"],
+            "prev_block_hash": block["prev_block_hash"],
+            "time_stamp": block["time_stamp"],
+            "peer_id": block["peer_id"],
+            "transaction_count": len(block["confirmed_transaction_list"]),
+            "transactions": BlockWriter.to_json(block["confirmed_transaction_list"]),
+        }
+
+    @staticmethod
+    def _json_default(value):
+        if isinstance(value, bytes):
+            return f"0x{value.hex()}"
+        if isinstance(value, Decimal):
+            return str(value)
+        raise TypeError(f"{type(value).__name__} is not JSON serializable.")
+
+
+class LineBlockWriter(BlockWriter):
+    """
+    Base class for writers of line-oriented formats. A partial line left behind by an
+    interrupted export is truncated before writing resumes.
+    """
+
+    def __init__(self, path: Path) -> None:
+        super().__init__(path)
+        last_line = self._truncate_partial_line()
+        self.f = open(self.path, "a", encoding="utf-8", newline="")
+        if last_line is None:
+            self.write_header()
+
+    def write_header(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.f.close()
+
+    def get_last_height(self) -> int:
+        last_line = self._read_last_line()
+        if last_line is None:
+            return None
+        return self.parse_height(last_line)
+
+    @abstractmethod
+    def parse_height(self, line: str) -> int:
+        pass
+
+    def _read_last_line(self) -> str:
+        if not self.path.exists():
+            return None
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            buffer = b""
+            # Read backwards until the buffer holds a complete line.
+            while position > 0 and buffer.count(b"\n") < 2:
+                read_size = min(65536, position)
+                position -= read_size
+                f.seek(position)
+                buffer = f.read(read_size) + buffer
+        lines = [line for line in buffer.split(b"\n") if line.strip()]
+        if len(lines) == 0:
+            return None
+        return lines[-1].decode("utf-8")
+
+    def _truncate_partial_line(self) -> str:
+        if not self.path.exists():
+            return None
+        with open(self.path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            # Drop everything after the last newline.
+            while position > 0:
+                read_size = min(65536, position)
+                position -= read_size
+                f.seek(position)
+                newline_index = f.read(read_size).rfind(b"\n")
+                if newline_index != -1:
+                    f.truncate(position + newline_index + 1)
+                    break
+            else:
+                f.truncate(0)
+        return self._read_last_line()
+
+
+class JsonlBlockWriter(LineBlockWriter):
+    def write(self, block: dict) -> None:
+        self.f.write(self.to_json(block) + "\n")
+
+    def parse_height(self, line: str) -> int:
+        return json.loads(line)["height"]
+
+
+class CsvBlockWriter(LineBlockWriter):
+
+    FIELDS = ["height", "block_hash", "prev_block_hash", "time_stamp", "peer_id", "transaction_count", "transactions"]  # fmt: skip
+
+    def __init__(self, path: Path) -> None:
+        self.writer = None
+        super().__init__(path)
+
+    def write_header(self) -> None:
+        self._get_writer().writeheader()
+
+    def write(self, block: dict) -> None:
+        self._get_writer().writerow(self.to_row(block))
+
+    def parse_height(self, line: str) -> int:
+        height = next(csv.reader([line]))[0]
+        if height == "height":
+            return None
+        return int(height)
+
+    def _get_writer(self) -> csv.DictWriter:
+        if self.writer is None:
+            self.writer = csv.DictWriter(self.f, fieldnames=self.FIELDS)
+        return self.writer
+
+
+class ParquetBlockWriter(BlockWriter):
+    """
+    Writes blocks to a directory of Parquet files with `rows_per_file` blocks each.
+    Every file is named after the first and last height it holds and is only moved
+    into place once it's complete, so an export can resume from the last file.
+    Requires pyarrow.
+    """
+
+    DEFAULT_ROWS_PER_FILE = 10_000
+
+    def __init__(self, path: Path, rows_per_file: int = DEFAULT_ROWS_PER_FILE) -> None:
+        super().__init__(path)
+        self.rows_per_file = rows_per_file
+        self.rows = []
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def write(self, block: dict) -> None:
+        self.rows.append(self.to_row(block))
+        if len(self.rows) >= self.rows_per_file:
+            self._flush()
+
+    def close(self) -> None:
+        self._flush()
+
+    def get_last_height(self) -> int:
+        heights = [int(match.group(1)) for match in map(self._match_file_name, self.path.iterdir()) if match]  # fmt: skip
+        return max(heights, default=None)
+
+    def _flush(self) -> None:
+        if len(self.rows) == 0:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pylist(self.rows)
+        file_name = f"blocks-{self.rows[0]['height']:010d}-{self.rows[-1]['height']:010d}.parquet"  # fmt: skip
+        tmp_path = self.path / f".{file_name}.tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, self.path / file_name)
+        self.rows = []
+
+    @staticmethod
+    def _match_file_name(path: Path):
+        return re.fullmatch(r"blocks-\d+-(\d+)\.parquet", path.name)
+
+
+BLOCK_WRITERS = {
+    "csv": CsvBlockWriter,
+    "jsonl": JsonlBlockWriter,
+    "parquet": ParquetBlockWriter,
+}
@@ -0,0 +1,214 @@
+import copy
+import json
+import os
+import time
+from typing import List
+
+from iconsdk.exception import JSONRPCException
+
+from icon_cli import DATA_DIR
+from icon_cli.contracts import Contracts
+from icon_cli.decoder import Decoder
+from icon_cli.icx import IcxQuery
+
+
+class Governance(IcxQuery):
+    """
+    Lists the network proposals of the governance contract and their votes.
+
+    Proposals are paged through with `getProposals`, several pages per batch post, and
+    kept in a state file per network. A proposal can't change once it's closed, so
+    after the first run only the pages of open proposals are fetched, starting with a
+    single page per status, plus the final state of proposals that closed since the
+    last run. The votes of closed proposals are
+    also kept, so they're never fetched again. Everything is rescanned once every
+    FULL_SYNC_INTERVAL seconds in case a proposal was missed.
+    """
+
+    STATE_VERSION = 1
+
+    # The governance contract returns at most 10 proposals per page.
+    PAGE_SIZE = 10
+    # How many pages of each status are requested in each batch post of a full sync,
+    # and at most once a refresh has widened.
+    PAGES_PER_BATCH = 8
+    FULL_SYNC_INTERVAL = 86400
+
+    STATUSES = {0: "voting", 1: "approved", 2: "disapproved", 3: "canceled", 4: "applied", 5: "expired"}  # fmt: skip
+    # An approved proposal is open until the network applies it.
+    OPEN_STATUSES = [0, 1]
+
+    # Vote tallies in `getProposals` have a count, and the votes in `getProposal` have
+    # a list of voters ("noVote" lists addresses only).
+    VOTE_SCHEMA = {"count": "int", "size": "int", "amount": "loop", "list": [{"timestamp": "int", "amount": "loop"}]}  # fmt: skip
+    PROPOSAL_SCHEMA = {"status": "int", "startBlockHeight": "int", "endBlockHeight": "int", "vote": {"agree": VOTE_SCHEMA, "disagree": VOTE_SCHEMA, "noVote": VOTE_SCHEMA}}  # fmt: skip
+    # Decoders for the results of each method, compiled once.
+    DECODERS = {
+        "getProposal": Decoder.compile(PROPOSAL_SCHEMA),
+        "getProposals": Decoder.compile([PROPOSAL_SCHEMA]),
+    }
+
+    def __init__(self, network: str, path: str = None) -> None:
+        super().__init__(network)
+        self.path = path if path is not None else f"{DATA_DIR}/governance-{network}.json"  # fmt: skip
+        self.governance = Contracts.get_contract_address_from_name("governance", network)  # fmt: skip
+
+    def get_proposals(self, full_sync: bool = False) -> List[dict]:
+        """
+        Returns every network proposal, newest first, with its vote tallies.
+
+        Args:
+            full_sync: Fetch every proposal instead of only the open ones.
+        """
+        state = self._read_state()
+        if full_sync is True or state is None or time.time() - state["full_synced_at"] > self.FULL_SYNC_INTERVAL:  # fmt: skip
+            proposals = {proposal["id"]: proposal for proposal in self._fetch_pages([None], self.PAGES_PER_BATCH)}  # fmt: skip
+            details = {} if state is None else state["details"]
+            state = {
+                "version": self.STATE_VERSION,
+                "full_synced_at": time.time(),
+                "proposals": proposals,
+                "details": {id: detail for id, detail in details.items() if id in proposals},  # fmt: skip
+            }
+        else:
+            previously_open = [id for id, proposal in state["proposals"].items() if self._is_open(proposal)]  # fmt: skip
+            open_proposals = {proposal["id"]: proposal for proposal in self._fetch_pages(self.OPEN_STATUSES, 1)}  # fmt: skip
+            state["proposals"].update(open_proposals)
+            # Proposals that were open last time and aren't now have closed since.
+            closed = [id for id in previously_open if id not in open_proposals]
+            for detail in self._fetch_proposals(closed):
+                self._store_detail(state, detail)
+        self._write_state(state)
+
+        proposals = self.DECODERS["getProposals"](copy.deepcopy(list(state["proposals"].values())))  # fmt: skip
+        return sorted(proposals, key=lambda proposal: proposal["startBlockHeight"], reverse=True)  # fmt: skip
+
+    def get_proposal(self, proposal_id: str) -> dict:
+        """
+        Returns a network proposal with every vote cast on it.
+
+        Args:
+            proposal_id: The transaction hash that registered the proposal.
+        """
+        state = self._read_state()
+        if state is not None and proposal_id in state["details"]:
+            return self.DECODERS["getProposal"](
+                copy.deepcopy(state["details"][proposal_id])
+            )
+
+        detail = self._fetch_proposals([proposal_id])[0]
+        if state is not None and self._store_detail(state, detail) is True:
+            self._write_state(state)
+        return self.DECODERS["getProposal"](copy.deepcopy(detail))
+
+    def get_votes(self, proposal_id: str) -> List[dict]:
+        """
+        Returns the votes on a network proposal, with validators that haven't voted as
+        "none".
+
+        Args:
+            proposal_id: The transaction hash that registered the proposal.
+        """
+        votes = []
+        proposal_votes = self.get_proposal(proposal_id)["vote"]
+        for vote in ["agree", "disagree"]:
+            for voter in proposal_votes.get(vote, {}).get("list", []):
+                votes.append(
+                    {
+                        "address": voter["address"],
+                        "name": voter.get("name"),
+                        "vote": vote,
+                        "amount": voter["amount"],
+                        "timestamp": voter["timestamp"],
+                        "tx_hash": voter.get("id"),
+                    }
+                )
+        for address in proposal_votes.get("noVote", {}).get("list", []):
+            votes.append({"address": address, "name": None, "vote": "none", "amount": None, "timestamp": None, "tx_hash": None})  # fmt: skip
+        return votes
+
+    ##############################
+    # INTERNAL UTILITY FUNCTIONS #
+    ##############################
+
+    def _fetch_pages(self, statuses: list, pages_per_batch: int) -> List[dict]:
+        # Pages of every status are requested together until each status returns a
+        # short page. A status whose pages all came back full gets twice as many pages
+        # in the next batch, up to PAGES_PER_BATCH. A status of None lists every
+        # proposal.
+        proposals = []
+        starts = {status: 0 for status in statuses}
+        widths = {status: pages_per_batch for status in statuses}
+        while len(starts) > 0:
+            pages = [(status, start + page * self.PAGE_SIZE) for status, start in starts.items() for page in range(widths[status])]  # fmt: skip
+            with self.batch(len(pages), cached=False) as batch:
+                for status, start in pages:
+                    params = {"start": hex(start), "size": hex(self.PAGE_SIZE)}
+                    if status is not None:
+                        params["status"] = hex(status)
+                    batch.call(self.governance, "getProposals", params)
+            self._raise_errors(batch.results)
+
+            for (status, start), result in zip(pages, batch.results):
+                if status not in starts:
+                    continue
+                page = result.result["proposals"]
+                proposals.extend(page)
+                if len(page) < self.PAGE_SIZE:
+                    del starts[status]
+                else:
+                    starts[status] = start + self.PAGE_SIZE
+            for status in starts:
+                widths[status] = min(widths[status] * 2, self.PAGES_PER_BATCH)
+        return proposals
+
+    def _fetch_proposals(self, proposal_ids: List[str]) -> List[dict]:
+        if len(proposal_ids) == 0:
+            return []
+        with self.batch(cached=False) as batch:
+            for proposal_id in proposal_ids:
+                batch.call(self.governance, "getProposal", {"id": proposal_id})
+        self._raise_errors(batch.results)
+        return [result.result for result in batch.results]
+
+    def _store_detail(self, state: dict, detail: dict) -> bool:
+        # Keeps a proposal's votes if it's closed, and returns whether it was kept.
+        state["proposals"][detail["id"]] = self._summarize(detail)
+        if self._is_open(detail):
+            return False
+        state["details"][detail["id"]] = detail
+        return True
+
+    def _is_open(self, proposal: dict) -> bool:
+        return int(proposal["status"], 16) in self.OPEN_STATUSES
+
+    @staticmethod
+    def _summarize(detail: dict) -> dict:
+        # Returns a proposal from `getProposal` in the form `getProposals` lists it.
+        summary = copy.deepcopy(detail)
+        for tally in summary.get("vote", {}).values():
+            if "list" in tally:
+                tally["count"] = tally.pop("size", hex(len(tally["list"])))
+                del tally["list"]
+        return summary
+
+    @staticmethod
+    def _raise_errors(results: list) -> None:
+        errors = [result.error for result in results if not result.ok]
+        if len(errors) > 0:
+            raise JSONRPCException(errors[0])
+
+    def _read_state(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return state if state.get("version") == self.STATE_VERSION else None
+
+    def _write_state(self, state: dict) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
@@ -1,19 +1,43 @@
+import threading
+import time
 from json import JSONDecodeError
+from urllib.parse import urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError
 
+from icon_cli.config import Config
+from icon_cli.trace import Tracer
 from icon_cli.utils import Utils
 
 
 class HttpReq:
+    """
+    HTTP helpers backed by process-wide, per-host keep-alive sessions.
+
+    Every request to the same scheme and host reuses one requests.Session, so long
+    running scripts only pay the TCP and TLS handshake once per pooled connection.
+
+    Every request is recorded by the Tracer.
+    """
+
+    DEFAULT_HEADERS = {
+        "Accept-Encoding": "gzip, deflate",
+        "User-Agent": "icon-cli",
+    }
+
+    _config = None
+    _sessions = {}
+    _sessions_lock = threading.Lock()
+
     def __init__(self) -> None:
         pass
 
     @staticmethod
     def get(url):
         try:
-            r = requests.get(url)
+            r = HttpReq._send("GET", url, HttpReq.get_timeout())
             r.raise_for_status()
             if r.status_code == 200:
                 data = r.json()
@@ -22,3 +46,128 @@ class HttpReq:
             Utils.exit(f"Could not decode JSON response for request to {url}...", "error")  # fmt: skip
         except JSONDecodeError:
             Utils.exit(f"Could not decode JSON response for request to {url}...", "error")  # fmt: skip
+
+    @staticmethod
+    def get_response(url, timeout: int = None) -> requests.Response:
+        """
+        Sends a GET request and returns the response without checking its status, for
+        callers that need the status code or headers (e.g. to handle rate limits).
+
+        Args:
+            url: The URL to get.
+            timeout: Request timeout in seconds. Defaults to `http_timeout` in config.yml.
+        """
+        if timeout is None:
+            timeout = HttpReq.get_timeout()
+        return HttpReq._send("GET", url, timeout)
+
+    @staticmethod
+    def post_response(url, payload, timeout: int = None) -> requests.Response:
+        """
+        Posts a JSON payload and returns the response without decoding it, for callers
+        that need the status code (e.g. to fail over to another endpoint).
+
+        Args:
+            url: The URL to post to.
+            payload: A JSON-serializable payload.
+            timeout: Request timeout in seconds. Defaults to `http_timeout` in config.yml.
+        """
+        if timeout is None:
+            timeout = HttpReq.get_timeout()
+        return HttpReq._send("POST", url, timeout, payload)
+
+    @staticmethod
+    def post(url, payload, timeout: int = None):
+        """
+        Posts a JSON payload and returns the decoded JSON response.
+
+        Unlike `get()`, errors are raised to the caller so that batch requests can
+        report them per request instead of exiting the program.
+
+        Args:
+            url: The URL to post to.
+            payload: A JSON-serializable payload.
+            timeout: Request timeout in seconds. Defaults to `http_timeout` in config.yml.
+        """
+        r = HttpReq.post_response(url, payload, timeout)
+        try:
+            # ICON nodes return JSON-RPC errors with non-2xx status codes, so try to
+            # decode the body before falling back to the HTTP status.
+            return r.json()
+        except JSONDecodeError:
+            r.raise_for_status()
+            raise
+
+    ############
+    # SESSIONS #
+    ############
+
+    @classmethod
+    def get_session(cls, url: str) -> requests.Session:
+        """
+        Returns the shared session for the scheme and host of a URL, creating it on
+        first use. The connection pool size comes from `http_pool_sizes` in config.yml
+        if the host has an entry there, and from `http_pool_size` otherwise.
+
+        Args:
+            url: Any URL on the host to get a session for.
+        """
+        url_parts = urlsplit(url)
+        origin = f"{url_parts.scheme}://{url_parts.netloc}"
+        with cls._sessions_lock:
+            session = cls._sessions.get(origin)
+            if session is None:
+                session = cls._create_session(url_parts.netloc)
+                cls._sessions[origin] = session
+        return session
+
+    @classmethod
+    def get_timeout(cls) -> int:
+        return cls._read_config().http_timeout
+
+    @classmethod
+    def close_sessions(cls) -> None:
+        with cls._sessions_lock:
+            for session in cls._sessions.values():
+                session.close()
+            cls._sessions = {}
+
+    ##############################
+    # INTERNAL UTILITY FUNCTIONS #
+    ##############################
+
+    @classmethod
+    def _send(
+        cls,
+        http_method: str,
+        url: str,
+        timeout: int,
+        payload=None,
+    ) -> requests.Response:
+        name = Tracer.get_request_name(url, payload)
+        started_at = time.perf_counter()
+        try:
+            r = cls.get_session(url).request(http_method, url, json=payload, timeout=timeout)  # fmt: skip
+        except requests.RequestException as e:
+            body = e.request.body if e.request is not None else None
+            Tracer.record_request(name, url, started_at, len(body or b""), 0, error=str(e))  # fmt: skip
+            raise
+        Tracer.record_request(name, url, started_at, len(r.request.body or b""), len(r.content), r.status_code)  # fmt: skip
+        return r
+
+    @classmethod
+    def _create_session(cls, host: str) -> requests.Session:
+        config = cls._read_config()
+        pool_size = config.http_pool_sizes.get(host, config.http_pool_size)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session = requests.Session()
+        session.headers.update(cls.DEFAULT_HEADERS)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @classmethod
+    def _read_config(cls):
+        if cls._config is None:
+            cls._config = Config.read_config()
+        return cls._config
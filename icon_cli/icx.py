@@ -1,50 +1,81 @@
+import copy
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
-from functools import lru_cache
 from getpass import getpass
-from typing import Tuple
-
-from iconsdk.builder.call_builder import CallBuilder
-from iconsdk.builder.transaction_builder import (
-    CallTransactionBuilder,
-    TransactionBuilder,
-)
-from iconsdk.exception import JSONRPCException, KeyStoreException
-from iconsdk.icon_service import IconService
-from iconsdk.providers.http_provider import HTTPProvider
-from iconsdk.signed_transaction import SignedTransaction, Transaction
-from iconsdk.wallet.wallet import KeyWallet
-
-from icon_cli import DEFAULT_NETWORKS, EXA, KEYSTORE_DIR
+from typing import TYPE_CHECKING, Dict, Iterator, List, Tuple
+
+from iconsdk.exception import JSONRPCException
+
+from icon_cli import EXA, KEYSTORE_DIR
+from icon_cli.agent import AgentClient
+from icon_cli.batch import IcxBatch
 from icon_cli.config import Config
+from icon_cli.endpoints import EndpointPool
+from icon_cli.models import RpcResult
+from icon_cli.provider import IcxProvider
+from icon_cli.steps import StepEstimator
 from icon_cli.tokens import Tokens
+from icon_cli.trace import Tracer
 from icon_cli.utils import Utils
 
+# iconsdk's IconService, builders and wallet take a few hundred milliseconds to import,
+# so they're only imported by the methods that need them.
+if TYPE_CHECKING:
+    from iconsdk.icon_service import IconService
+    from iconsdk.signed_transaction import Transaction
+    from iconsdk.wallet.wallet import KeyWallet
+
 
 class Icx(Config):
     def __init__(self, network: str) -> None:
         super().__init__()
 
         self.network = network
-        self.icon_service, self.nid = self._get_icon_service_and_nid(self.network)
+        self.api_endpoint = self.get_network(network).api_endpoint
+        self.pool = EndpointPool.get(network)
+        self.provider, self.nid = self._get_provider_and_nid(self.network)
+        self._icon_service = None
 
-    @lru_cache(maxsize=1)
-    def _get_icon_service_and_nid(self, network) -> Tuple[IconService, int]:
+    @property
+    def icon_service(self) -> "IconService":
         """
-        Parses configuration and returns an IconService object and ICON network ID.
+        An iconsdk IconService that shares this object's provider.
+        """
+        if self._icon_service is None:
+            from iconsdk.icon_service import IconService
+
+            self._icon_service = IconService(self.provider)
+        return self._icon_service
+
+    def _get_provider_and_nid(self, network) -> Tuple[IcxProvider, int]:
+        """
+        Parses configuration and returns an IcxProvider object and ICON network ID.
 
         Args:
             network: Name of the network (e.g. "mainnet").
         """
         # Get IcxNetwork object with network details.
-        _network = DEFAULT_NETWORKS[network]
+        _network = self.get_network(network)
         # Get API endpoint and network ID from IcxNetwork object.
         api_endpoint = _network.api_endpoint
         nid = _network.nid
-        icon_service = IconService(HTTPProvider(api_endpoint, 3))
-        return icon_service, nid
+        provider = IcxProvider(api_endpoint, network=network, pool=self.pool)
+        return provider, nid
 
 
 class IcxQuery(Icx):
+
+    # JSON-RPC error codes for transactions that are pending, executing or not yet
+    # known to the node, plus transport errors, which are all worth polling again.
+    PENDING_TX_ERROR_CODES = [-31002, -31003, -31004, -32000]
+
+    # How many chunks of blocks `iter_blocks()` fetches ahead of the consumer.
+    DEFAULT_PREFETCH_WINDOW = 8
+    # How many times to fetch a chunk of blocks before giving up.
+    MAX_CHUNK_ATTEMPTS = 3
+
     def __init__(self, network: str) -> None:
         super().__init__(network)
 
@@ -55,10 +86,178 @@ class IcxQuery(Icx):
         params: dict = {},
         height: int = None,
     ) -> dict:
-        call = CallBuilder().to(to).method(method).params(params).height(height).build()
-        result = self.icon_service.call(call)
+        call_params = IcxBatch.build_call_params(to, method, params, height)
+        result = self.provider.make_request("icx_call", call_params)
         return result
 
+    ###################
+    # Batched Queries #
+    ###################
+
+    def batch(
+        self,
+        chunk_size: int = IcxBatch.DEFAULT_CHUNK_SIZE,
+        concurrency: int = 1,
+        cached: bool = True,
+    ) -> IcxBatch:
+        """
+        Returns an IcxBatch that sends queued queries as JSON-RPC batch posts.
+
+        Args:
+            chunk_size: The maximum number of requests to send in a single post.
+            concurrency: The maximum number of posts in flight.
+            cached: Answer immutable queries from the on-disk cache and store their
+                results in it.
+        """
+        network = self.network if cached is True else None
+        return IcxBatch(f"{self.api_endpoint}/api/v3", chunk_size, network, concurrency, self.pool)  # fmt: skip
+
+    def call_many(
+        self,
+        calls: List[dict],
+        chunk_size: int = IcxBatch.DEFAULT_CHUNK_SIZE,
+    ) -> List[RpcResult]:
+        """
+        Makes many readonly contract calls in batches and returns their results in order.
+
+        Args:
+            calls: A list of dictionaries with the same keys as the arguments of `call()`.
+            chunk_size: The maximum number of requests to send in a single post.
+        """
+        with self.batch(chunk_size) as batch:
+            for call in calls:
+                batch.call(**call)
+        return batch.results
+
+    def get_balances(
+        self,
+        addresses: List[str],
+        token_symbols: List[str] = [],
+        in_loop: bool = False,
+        chunk_size: int = IcxBatch.DEFAULT_CHUNK_SIZE,
+    ) -> List[dict]:
+        """
+        Returns the ICX and token balances of many addresses, fetched with batch
+        requests. Each dictionary has an "address" key and one key per asset ("ICX"
+        and the upper case token symbols), which is None if the query failed.
+
+        Args:
+            addresses: A list of ICX wallet or contract addresses.
+            token_symbols: A list of IRC-2 token symbols.
+            in_loop: Return balances in loop instead of whole units.
+            chunk_size: The maximum number of requests to send in a single post.
+        """
+        tokens = [Tokens.get_token(symbol) for symbol in token_symbols]
+        with self.batch(chunk_size) as batch:
+            for address in addresses:
+                batch.get_balance(address)
+                for token in tokens:
+                    batch.add(
+                        "icx_call",
+                        IcxBatch.build_call_params(
+                            getattr(token, self.network),
+                            "balanceOf",
+                            {"_owner": address},
+                        ),  # fmt: skip
+                        Utils.to_int,
+                    )
+
+        # Results are queued as [ICX, token, token, ...] for every address.
+        # The divisor of every asset is computed once rather than once per balance.
+        assets = [("ICX", EXA)] + [(token.symbol.upper(), 10 ** (token.decimals or 18)) for token in tokens]  # fmt: skip
+        results = iter(batch.results)
+        balances = []
+        for address in addresses:
+            row = {"address": address}
+            for (symbol, divisor), result in zip(assets, results):
+                if result.ok is False:
+                    row[symbol] = None
+                elif in_loop is True:
+                    row[symbol] = result.result
+                else:
+                    row[symbol] = Decimal(result.result) / divisor
+            balances.append(row)
+        return balances
+
+    def wait_for_results(
+        self,
+        tx_hashes: List[str],
+        timeout: float = 60,
+        poll_interval: float = 1,
+        max_poll_interval: float = 8,
+        chunk_size: int = IcxBatch.DEFAULT_CHUNK_SIZE,
+    ) -> Dict[str, RpcResult]:
+        """
+        Polls for the results of many transactions until all of them are final or the
+        timeout expires, and returns a dictionary of transaction hash to RpcResult.
+
+        Every poll fetches all pending results with batch requests, and the interval
+        between polls grows by half each time up to `max_poll_interval`. Transactions
+        that aren't final before the timeout keep their last pending RpcResult.
+
+        Args:
+            tx_hashes: A list of ICX transaction hashes.
+            timeout: How long to wait in seconds. With a timeout of 0, results are
+                fetched once.
+            poll_interval: The initial number of seconds between polls.
+            max_poll_interval: The maximum number of seconds between polls.
+            chunk_size: The maximum number of requests to send in a single post.
+        """
+        deadline = time.monotonic() + timeout
+        results = {}
+        pending = list(dict.fromkeys(tx_hashes))
+        while True:
+            with self.batch(chunk_size) as batch:
+                for tx_hash in pending:
+                    batch.get_transaction_result(tx_hash)
+            for tx_hash, result in zip(pending, batch.results):
+                results[tx_hash] = result
+            pending = [tx_hash for tx_hash in pending if self._is_pending(results[tx_hash])]  # fmt: skip
+
+            remaining = deadline - time.monotonic()
+            if len(pending) == 0 or remaining <= 0:
+                return results
+            time.sleep(min(poll_interval, remaining))
+            poll_interval = min(poll_interval * 1.5, max_poll_interval)
+
+    def iter_blocks(
+        self,
+        start: int,
+        end: int,
+        include_results: bool = False,
+        window: int = DEFAULT_PREFETCH_WINDOW,
+        chunk_size: int = IcxBatch.DEFAULT_CHUNK_SIZE,
+    ) -> Iterator[dict]:
+        """
+        Yields blocks from `start` to `end` (inclusive) in height order.
+
+        Blocks are fetched in batches of `chunk_size`, and up to `window` batches are
+        fetched concurrently ahead of the consumer, so memory use is bounded by
+        `window * chunk_size` blocks regardless of the size of the range.
+
+        Args:
+            start: The first block height.
+            end: The last block height.
+            include_results: Add the transaction result of every transaction in a
+                block to the transaction under a "result" key.
+            window: The maximum number of batches to fetch ahead.
+            chunk_size: The number of blocks to fetch in a single post.
+        """
+        chunk_starts = iter(range(start, end + 1, chunk_size))
+        executor = ThreadPoolExecutor(max_workers=window)
+        futures = deque()
+        try:
+            for chunk_start in chunk_starts:
+                chunk_end = min(chunk_start + chunk_size - 1, end)
+                futures.append(executor.submit(self._fetch_blocks, chunk_start, chunk_end, include_results))  # fmt: skip
+                if len(futures) < window:
+                    continue
+                yield from futures.popleft().result()
+            while len(futures) > 0:
+                yield from futures.popleft().result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
     ##########################
     # Built-In Query Methods #
     ##########################
@@ -68,7 +267,9 @@ class IcxQuery(Icx):
         address: str,
         in_loop: bool = False,
     ) -> int | Decimal:
-        balance = self.icon_service.get_balance(address)
+        balance = Utils.to_int(
+            self.provider.make_request("icx_getBalance", {"address": address})
+        )
         if in_loop is True:
             return balance
         else:
@@ -85,9 +286,12 @@ class IcxQuery(Icx):
             block_height: The block height to query.
         """
         if block_height == -1:
-            block_height = "latest"
-        result = self.icon_service.get_block(block_height)
-        return result
+            result = self.provider.make_request("icx_getLastBlock")
+        else:
+            result = self.provider.make_request(
+                "icx_getBlockByHeight", {"height": hex(block_height)}
+            )
+        return IcxBatch.convert_block(result)
 
     def get_score_api(
         self,
@@ -101,7 +305,10 @@ class IcxQuery(Icx):
             contract_address: The contract to get the ABI for.
             block_height: The block height to query.
         """
-        result = self.icon_service.get_score_api(contract_address, block_height)
+        params = {"address": contract_address}
+        if block_height is not None:
+            params["height"] = hex(block_height)
+        result = self.provider.make_request("icx_getScoreApi", params)
         return result
 
     def get_token_balance(
@@ -130,8 +337,10 @@ class IcxQuery(Icx):
         Args:
             tx_hash: An ICX transaction hash.
         """
-        result = self.icon_service.get_transaction(tx_hash)
-        return result
+        result = self.provider.make_request(
+            "icx_getTransactionByHash", {"txHash": tx_hash}
+        )
+        return IcxBatch.convert_transaction(result)
 
     def get_transaction_result(
         self,
@@ -143,20 +352,58 @@ class IcxQuery(Icx):
         Args:
             tx_hash: An ICX transaction hash.
         """
-        result = self.icon_service.get_transaction_result(tx_hash)
-        return result
+        result = self.provider.make_request(
+            "icx_getTransactionResult", {"txHash": tx_hash}
+        )
+        return IcxBatch.convert_transaction_result(result)
+
+    def _fetch_blocks(
+        self,
+        start: int,
+        end: int,
+        include_results: bool = False,
+    ) -> List[dict]:
+        # Retry the whole chunk on any failure, since a chunk is small and failures
+        # are almost always transient node or gateway errors.
+        for attempt in range(1, self.MAX_CHUNK_ATTEMPTS + 1):
+            # Streamed ranges would only churn the response cache, so skip it.
+            with self.batch(end - start + 1, cached=False) as batch:
+                for height in range(start, end + 1):
+                    batch.get_block(height)
+            errors = [result.error for result in batch.results if not result.ok]
+            blocks = [result.result for result in batch.results]
+
+            if len(errors) == 0 and include_results is True:
+                transactions = [tx for block in blocks for tx in block["confirmed_transaction_list"]]  # fmt: skip
+                with self.batch(cached=False) as batch:
+                    for tx in transactions:
+                        batch.get_transaction_result(tx["txHash"])
+                errors = [result.error for result in batch.results if not result.ok]
+                for tx, result in zip(transactions, batch.results):
+                    tx["result"] = result.result
+
+            if len(errors) == 0:
+                return blocks
+            if attempt < self.MAX_CHUNK_ATTEMPTS:
+                Tracer.record_retry("batch:icx_getBlockByHeight", attempt, errors[0].get("message"))  # fmt: skip
+                time.sleep(attempt)
+        raise JSONRPCException(errors[0])
+
+    @classmethod
+    def _is_pending(cls, result: RpcResult) -> bool:
+        return result.ok is False and result.error.get("code") in cls.PENDING_TX_ERROR_CODES  # fmt: skip
 
     ######################
     # Common Query Calls #
     ######################
 
-    @lru_cache(maxsize=128)
     def get_icx_usd_price(
         self,
         block_height: int = None,
     ) -> float:
         """
-        Returns a quote for ICX/USD from the Band oracle.
+        Returns a quote for ICX/USD from the Band oracle. Quotes at a block height are
+        cached on disk by the provider.
 
         Args:
             block_height: The block height to query.
@@ -173,6 +420,12 @@ class IcxQuery(Icx):
 
 
 class IcxTx(IcxQuery):
+
+    DEFAULT_STEP_LIMIT = 100_000_000
+    # Nodes reject transactions whose timestamp is further than this from their clock,
+    # in microseconds.
+    TIMESTAMP_WINDOW = 5 * 60 * 10**6
+
     def __init__(
         self,
         network: str,
@@ -186,20 +439,30 @@ class IcxTx(IcxQuery):
         self.wallet = self._load_keystore(self.keystore_name, self.keystore_password)  # fmt: skip
         self.wallet_address = self.wallet.get_address()
 
+    @staticmethod
     def _load_keystore(
-        self,
         keystore_name: str,
         keystore_password: str,
-    ) -> KeyWallet:
+    ) -> "KeyWallet":
+        # Sign through the signing agent if it holds this keystore, which skips the
+        # password prompt and the keystore KDF.
+        agent_wallet = AgentClient.get_wallet(keystore_name)
+        if agent_wallet is not None:
+            return agent_wallet
+
+        from iconsdk.exception import KeyStoreException
+        from iconsdk.wallet.wallet import KeyWallet
+
         try:
             # Prompt user for keystore password if it's not provided.
             if keystore_password is None:
                 keystore_password = getpass("Keystore Password: ")
-            # Load keystore.
-            keystore = KeyWallet.load(
-                f"{KEYSTORE_DIR}/{keystore_name}.json",
-                keystore_password,
-            )
+            # Load keystore. The KDF makes this one of the slowest steps of a command.
+            with Tracer.phase("keystore"):
+                keystore = KeyWallet.load(
+                    f"{KEYSTORE_DIR}/{keystore_name}.json",
+                    keystore_password,
+                )
             return keystore
         except KeyStoreException:
             Utils.exit("The password you supplied is incorrect.", "error")
@@ -212,13 +475,19 @@ class IcxTx(IcxQuery):
         self,
         to: str,
         value: int,
-    ) -> Transaction:
+        nonce: int = None,
+        timestamp: int = None,
+    ) -> "Transaction":
+        from iconsdk.builder.transaction_builder import TransactionBuilder
+
         tx = (
             TransactionBuilder()
             .from_(self.wallet_address)
             .to(to)
             .value(int(value * EXA))
             .nid(self.nid)
+            .nonce(nonce)
+            .timestamp(timestamp)
             .build()
         )
         return tx
@@ -229,24 +498,84 @@ class IcxTx(IcxQuery):
         value: int = 0,
         method: str = None,
         params: dict = {},
-    ):
+        nonce: int = None,
+        timestamp: int = None,
+    ) -> "Transaction":
+        from iconsdk.builder.transaction_builder import CallTransactionBuilder
+
         transaction = (
             CallTransactionBuilder()
             .from_(self.wallet_address)
             .to(to)
             .value(int(value))
             .nid(self.nid)
+            .nonce(nonce)
+            .timestamp(timestamp)
             .method(method)
             .params(params)
             .build()
         )
         return transaction
 
-    def send_transaction(self, tx: Transaction) -> str:
-        signed_tx = SignedTransaction(tx, self.wallet, 100_000_000)
+    def estimate_step_limit(self, tx: "Transaction") -> int:
+        """
+        Returns a step limit for a transaction from StepEstimator, which includes the
+        `step_limit_margin` from config.yml, or `DEFAULT_STEP_LIMIT` if the node can't
+        estimate it.
+
+        Args:
+            tx: An unsigned transaction.
+        """
+        from iconsdk.signed_transaction import SignedTransaction
+
+        # Conversion needs a step limit, which isn't part of the estimate request.
+        tx = copy.copy(tx)
+        tx.step_limit = 0
+        params = SignedTransaction.convert_tx_to_jsonrpc_request(tx, self.wallet)
+        step_limit = StepEstimator.get_step_limit(self, params)
+        return step_limit if step_limit is not None else self.DEFAULT_STEP_LIMIT
+
+    def send_transaction(self, tx: "Transaction", step_limit: int = None) -> str:
+        """
+        Signs and sends a transaction and returns its hash.
+
+        Args:
+            tx: An unsigned transaction.
+            step_limit: The step limit to sign with. Defaults to the transaction's own
+                step limit, or an estimate if it has none.
+        """
+        from iconsdk.signed_transaction import SignedTransaction
+
+        if step_limit is None:
+            step_limit = tx.step_limit or self.estimate_step_limit(tx)
+        signed_tx = SignedTransaction(tx, self.wallet, step_limit)
         tx_hash = self.icon_service.send_transaction(signed_tx)
         return tx_hash
 
-    def is_transaction_successful(self, tx_hash: str) -> bool:
-        tx_result = self.icon_service.get_transaction_result(tx_hash)
-        return
+    def is_transaction_successful(self, tx_hash: str, timeout: float = 60) -> bool:
+        """
+        Waits for a transaction to be final and returns True if it succeeded. Returns
+        False if it failed or wasn't final before the timeout.
+
+        Args:
+            tx_hash: An ICX transaction hash.
+            timeout: How long to wait in seconds.
+        """
+        result = self.wait_for_results([tx_hash], timeout)[tx_hash]
+        return result.ok is True and result.result["status"] == 1
+
+    def wait_for_transaction(self, tx_hash: str, timeout: float = 60) -> dict:
+        """
+        Waits for a transaction to be final and returns its result. Exits the program
+        if the transaction isn't final before the timeout or can't be found.
+
+        Args:
+            tx_hash: An ICX transaction hash.
+            timeout: How long to wait in seconds.
+        """
+        result = self.wait_for_results([tx_hash], timeout)[tx_hash]
+        if result.ok is False:
+            if self._is_pending(result):
+                Utils.exit(f"{tx_hash} was not confirmed within {timeout} seconds.", "error")  # fmt: skip
+            Utils.exit(f"Could not get the result of {tx_hash}: {result.error.get('message')}", "error")  # fmt: skip
+        return result.result
@@ -0,0 +1,297 @@
+import json
+import os
+import re
+import sqlite3
+from typing import Callable, List
+
+from icon_cli import DATA_DIR
+from icon_cli.icx import IcxQuery
+
+
+class Indexer:
+    """
+    Indexes blocks, transactions and (optionally) event logs from an ICON network into
+    a local SQLite database, so address and contract lookups don't depend on a tracker.
+
+    Blocks are ingested in height order from a checkpoint, and the checkpoint is
+    committed in the same SQLite transaction as the blocks it covers, so an
+    interrupted sync always resumes from a consistent state.
+    """
+
+    # How many blocks to insert between commits.
+    DEFAULT_COMMIT_INTERVAL = 1000
+
+    SCHEMA = [
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+        "CREATE TABLE IF NOT EXISTS blocks (height INTEGER PRIMARY KEY, block_hash TEXT, time_stamp INTEGER, transaction_count INTEGER)",
+        "CREATE TABLE IF NOT EXISTS transactions (tx_hash TEXT PRIMARY KEY, height INTEGER, tx_index INTEGER, time_stamp INTEGER, from_address TEXT, to_address TEXT, value TEXT, data_type TEXT, method TEXT, status INTEGER, step_used INTEGER, data TEXT)",
+        "CREATE TABLE IF NOT EXISTS event_logs (tx_hash TEXT, log_index INTEGER, height INTEGER, score_address TEXT, event TEXT, indexed TEXT, data TEXT, PRIMARY KEY (tx_hash, log_index))",
+        "CREATE TABLE IF NOT EXISTS event_addresses (address TEXT, tx_hash TEXT, log_index INTEGER, height INTEGER, PRIMARY KEY (address, tx_hash, log_index))",
+        "CREATE INDEX IF NOT EXISTS transactions_from ON transactions (from_address, height)",
+        "CREATE INDEX IF NOT EXISTS transactions_to ON transactions (to_address, height)",
+        "CREATE INDEX IF NOT EXISTS transactions_method ON transactions (method, height)",
+        "CREATE INDEX IF NOT EXISTS transactions_height ON transactions (height, tx_index)",
+        "CREATE INDEX IF NOT EXISTS event_logs_score ON event_logs (score_address, event, height)",
+        "CREATE INDEX IF NOT EXISTS event_addresses_address ON event_addresses (address, height)",
+    ]
+
+    TRANSACTION_COLUMNS = "tx_hash, height, tx_index, time_stamp, from_address, to_address, value, data_type, method, status, step_used, data"  # fmt: skip
+
+    ADDRESS_PATTERN = re.compile(r"^(hx|cx)[0-9a-f]{40}$")
+
+    def __init__(self, network: str, path: str = None) -> None:
+        self.network = network
+        self.path = path if path is not None else f"{DATA_DIR}/index-{network}.db"
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        for statement in self.SCHEMA:
+            self.db.execute(statement)
+        self.db.commit()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def get_checkpoint(self) -> int:
+        """
+        Returns the height of the last indexed block, or None if nothing is indexed.
+        """
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'last_height'").fetchone()  # fmt: skip
+        return int(row["value"]) if row is not None else None
+
+    def get_status(self) -> dict:
+        """
+        Returns the indexed height range, whether event logs are indexed, and the
+        number of indexed blocks, transactions and event logs.
+        """
+        meta = {row["key"]: row["value"] for row in self.db.execute("SELECT key, value FROM meta")}  # fmt: skip
+        counts = {
+            table: self.db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ["blocks", "transactions", "event_logs"]
+        }
+        heights = {
+            key: int(meta[key]) if key in meta else None
+            for key in ["first_height", "last_height"]
+        }
+        return {
+            "network": self.network,
+            "path": self.path,
+            **heights,
+            "include_results": meta.get("include_results") == "1",
+            **counts,
+        }
+
+    def sync(
+        self,
+        start: int = 0,
+        end: int = None,
+        include_results: bool = False,
+        window: int = IcxQuery.DEFAULT_PREFETCH_WINDOW,
+        chunk_size: int = 100,
+        commit_interval: int = DEFAULT_COMMIT_INTERVAL,
+        on_commit: Callable[[int], None] = None,
+    ) -> int:
+        """
+        Indexes blocks from the checkpoint (or `start` for an empty index) to `end`,
+        and returns the number of indexed blocks.
+
+        An index keeps the `include_results` setting of its first sync, since a mix of
+        blocks with and without transaction results can't answer status or event
+        queries consistently.
+
+        Args:
+            start: The first block height to index if the index is empty.
+            end: The last block height to index. Defaults to the latest block.
+            include_results: Also fetch transaction results and index event logs.
+            window: The number of batches of blocks to fetch ahead.
+            chunk_size: The number of blocks to fetch in a single request.
+            commit_interval: The number of blocks to insert between commits.
+            on_commit: A function that's called with the last committed height.
+        """
+        status = self.get_status()
+        if status["last_height"] is not None:
+            start = status["last_height"] + 1
+            include_results = status["include_results"]
+        else:
+            self._set_meta("first_height", start)
+            self._set_meta("include_results", int(include_results))
+
+        icx = IcxQuery(self.network)
+        if end is None:
+            end = icx.get_block()["height"]
+
+        count = 0
+        for block in icx.iter_blocks(start, end, include_results, window, chunk_size):
+            self._insert_block(block)
+            count += 1
+            if count % commit_interval == 0 or block["height"] == end:
+                self._set_meta("last_height", block["height"])
+                self.db.commit()
+                if on_commit is not None:
+                    on_commit(block["height"])
+        return count
+
+    ###########
+    # QUERIES #
+    ###########
+
+    def get_address_transactions(
+        self,
+        address: str,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> List[dict]:
+        """
+        Returns transactions sent from or to an address, newest first.
+
+        Args:
+            address: An ICX wallet or contract address.
+            limit: The maximum number of transactions to return.
+            offset: The number of transactions to skip.
+        """
+        # A UNION lets SQLite use the from and to indexes instead of a table scan.
+        query = f"SELECT {self.TRANSACTION_COLUMNS} FROM transactions WHERE from_address = :address UNION SELECT {self.TRANSACTION_COLUMNS} FROM transactions WHERE to_address = :address ORDER BY height DESC, tx_index DESC LIMIT :limit OFFSET :offset"  # fmt: skip
+        return self._fetch(query, {"address": address, "limit": limit, "offset": offset})  # fmt: skip
+
+    def get_contract_transactions(
+        self,
+        contract_address: str,
+        method: str = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> List[dict]:
+        """
+        Returns transactions sent to a contract, optionally only calls to one method,
+        newest first.
+
+        Args:
+            contract_address: An ICON contract address.
+            method: The name of a contract method.
+            limit: The maximum number of transactions to return.
+            offset: The number of transactions to skip.
+        """
+        query = f"SELECT {self.TRANSACTION_COLUMNS} FROM transactions WHERE to_address = :to"  # fmt: skip
+        if method is not None:
+            query += " AND method = :method"
+        query += " ORDER BY height DESC, tx_index DESC LIMIT :limit OFFSET :offset"
+        params = {"to": contract_address, "method": method, "limit": limit, "offset": offset}  # fmt: skip
+        return self._fetch(query, params)
+
+    def get_method_transactions(
+        self,
+        method: str,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> List[dict]:
+        """
+        Returns calls to a method name on any contract, newest first.
+
+        Args:
+            method: The name of a contract method.
+            limit: The maximum number of transactions to return.
+            offset: The number of transactions to skip.
+        """
+        query = f"SELECT {self.TRANSACTION_COLUMNS} FROM transactions WHERE method = :method ORDER BY height DESC, tx_index DESC LIMIT :limit OFFSET :offset"  # fmt: skip
+        return self._fetch(query, {"method": method, "limit": limit, "offset": offset})  # fmt: skip
+
+    def get_block_transactions(self, height: int) -> List[dict]:
+        """
+        Returns the transactions in a block, in order.
+
+        Args:
+            height: A block height.
+        """
+        query = f"SELECT {self.TRANSACTION_COLUMNS} FROM transactions WHERE height = :height ORDER BY tx_index"  # fmt: skip
+        return self._fetch(query, {"height": height})
+
+    def get_event_logs(
+        self,
+        address: str,
+        event: str = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> List[dict]:
+        """
+        Returns event logs emitted by a contract or that mention an address in their
+        arguments (e.g. token transfers), newest first. Requires an index synced with
+        transaction results.
+
+        Args:
+            address: An ICX wallet or contract address.
+            event: An event signature (e.g. "Transfer(Address,Address,int,bytes)").
+            limit: The maximum number of event logs to return.
+            offset: The number of event logs to skip.
+        """
+        columns = "l.tx_hash, l.log_index, l.height, l.score_address, l.event, l.indexed, l.data"  # fmt: skip
+        event_filter = "" if event is None else " AND l.event = :event"
+        query = f"SELECT {columns} FROM event_logs l WHERE l.score_address = :address{event_filter} UNION SELECT {columns} FROM event_addresses a JOIN event_logs l ON l.tx_hash = a.tx_hash AND l.log_index = a.log_index WHERE a.address = :address{event_filter} ORDER BY height DESC, log_index DESC LIMIT :limit OFFSET :offset"  # fmt: skip
+        params = {"address": address, "event": event, "limit": limit, "offset": offset}
+        return self._fetch(query, params)
+
+    ##############################
+    # INTERNAL UTILITY FUNCTIONS #
+    ##############################
+
+    def _fetch(self, query: str, params: dict) -> List[dict]:
+        rows = []
+        for row in self.db.execute(query, params):
+            row = dict(row)
+            for key in ["data", "indexed"]:
+                if row.get(key) is not None:
+                    row[key] = json.loads(row[key])
+            rows.append(row)
+        return rows
+
+    def _set_meta(self, key: str, value) -> None:
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, str(value)))
+
+    def _insert_block(self, block: dict) -> None:
+        height = block["height"]
+        transactions = block["confirmed_transaction_list"]
+        self.db.execute(
+            "INSERT OR REPLACE INTO blocks VALUES (?, ?, ?, ?)",
+            (height, block["block_hash"], block["time_stamp"], len(transactions)),
+        )
+
+        tx_rows, log_rows, address_rows = [], [], []
+        for tx_index, tx in enumerate(transactions):
+            data = tx.get("data")
+            method = data.get("method") if isinstance(data, dict) else None
+            result = tx.get("result") or {}
+            tx_rows.append(
+                (
+                    tx["txHash"],
+                    height,
+                    tx_index,
+                    tx.get("timestamp"),
+                    tx.get("from"),
+                    tx.get("to"),
+                    str(tx["value"]) if tx.get("value") is not None else None,
+                    tx.get("dataType"),
+                    method,
+                    result.get("status"),
+                    result.get("stepUsed"),
+                    json.dumps(data) if data is not None else None,
+                )
+            )
+            for log_index, log in enumerate(result.get("eventLogs", [])):
+                indexed = log.get("indexed", [])
+                log_data = log.get("data", [])
+                log_rows.append(
+                    (
+                        tx["txHash"],
+                        log_index,
+                        height,
+                        log.get("scoreAddress"),
+                        indexed[0] if len(indexed) > 0 else None,
+                        json.dumps(indexed[1:]),
+                        json.dumps(log_data),
+                    )
+                )
+                addresses = {value for value in indexed[1:] + log_data if isinstance(value, str) and self.ADDRESS_PATTERN.match(value)}  # fmt: skip
+                address_rows.extend((address, tx["txHash"], log_index, height) for address in addresses)  # fmt: skip
+
+        self.db.executemany("INSERT OR REPLACE INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", tx_rows)  # fmt: skip
+        self.db.executemany("INSERT OR REPLACE INTO event_logs VALUES (?, ?, ?, ?, ?, ?, ?)", log_rows)  # fmt: skip
+        self.db.executemany("INSERT OR REPLACE INTO event_addresses VALUES (?, ?, ?, ?)", address_rows)  # fmt: skip
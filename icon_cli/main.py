@@ -1,11 +1,105 @@
-import typer
+import time
+
+# Taken before anything else is imported, so `--trace` can report startup time.
+STARTED_AT = time.perf_counter()
+
+import importlib  # noqa: E402
+
+import click  # noqa: E402
+import typer  # noqa: E402
+
+
+class LazyGroup(click.Group):
+    """
+    A click Group that only imports a subcommand's module when that subcommand is
+    invoked, so `icon --help` and `icon <command>` don't import every command module
+    and their dependencies.
+    """
+
+    # Map of subcommand name to the module that defines its Typer app and its help text.
+    LAZY_SUBCOMMANDS = {
+        "agent": ("icon_cli.commands.agent", "Run a local agent that holds decrypted keystores."),  # fmt: skip
+        "config": ("icon_cli.commands.config", "Configure settings for icon-cli."),
+        "cps": ("icon_cli.commands.cps", "Snapshot the Contribution Proposal System."),  # fmt: skip
+        "gov": ("icon_cli.commands.tx.gov", "Govern the ICON blockchain."),
+        "index": ("icon_cli.commands.index", "Index ICON blocks into a local database."),  # fmt: skip
+        "query": ("icon_cli.commands.query", "Query a node on the ICON network."),
+        "tx": ("icon_cli.commands.tx", "Build and send ICX transactions."),
+        "watch": ("icon_cli.commands.watch", "Stream new blocks and contract events as they're produced."),  # fmt: skip
+    }
+
+    def list_commands(self, ctx: click.Context) -> list:
+        return sorted(set(super().list_commands(ctx)) | set(self.LAZY_SUBCOMMANDS))
+
+    def get_command(self, ctx: click.Context, name: str) -> click.Command:
+        if name not in self.LAZY_SUBCOMMANDS:
+            return super().get_command(ctx, name)
+        module_name, _ = self.LAZY_SUBCOMMANDS[name]
+        module = importlib.import_module(module_name)
+        command = typer.main.get_group(module.app)
+        command.name = name
+        return command
+
+    def format_commands(self, ctx: click.Context, formatter) -> None:
+        # Use the static help text so that listing commands doesn't import them.
+        rows = [
+            (name, help_text)
+            for name, (_, help_text) in sorted(self.LAZY_SUBCOMMANDS.items())
+        ]
+        with formatter.section("Commands"):
+            formatter.write_dl(rows)
 
-from icon_cli.commands import config, query, tx
 
 # Initialize Typer.
-app = typer.Typer()
+app = typer.Typer(cls=LazyGroup)
+
+
+@app.callback()
+def main(
+    ctx: typer.Context,
+    no_cache: bool = typer.Option(
+        False,
+        "--no-cache",
+        help="Don't read or write the on-disk response cache.",
+    ),
+    trace: bool = typer.Option(
+        False,
+        "--trace",
+        help="Print phase timings and a summary of every request to stderr.",
+    ),
+    trace_file: str = typer.Option(
+        None,
+        "--trace-file",
+        help="Also write the trace to a file. Implies --trace.",
+    ),
+    trace_format: str = typer.Option(
+        "json",
+        "--trace-format",
+        help="The format of --trace-file: json, or chrome for chrome://tracing and Perfetto.",  # fmt: skip
+    ),
+):
+    """
+    A command line interface for interacting with the ICON blockchain network.
+    """
+    if no_cache is True:
+        from icon_cli.cache import Cache
+
+        Cache.enabled = False
+
+    if trace is True or trace_file is not None:
+        from icon_cli.trace import Tracer
+
+        if trace_format not in ["json", "chrome"]:
+            raise typer.BadParameter("Must be json or chrome.", param_hint="--trace-format")  # fmt: skip
+        Tracer.enable(STARTED_AT)
+        # Startup covers importing icon-cli, parsing arguments and importing the command.
+        Tracer.record_phase("startup", STARTED_AT)
+        command_started_at = time.perf_counter()
+
+        def finish_trace():
+            Tracer.record_phase("command", command_started_at)
+            Tracer.print_summary()
+            if trace_file is not None:
+                Tracer.write(trace_file, trace_format)
 
-# Add config, query, and tx commands.
-app.add_typer(config.app, name="config")
-app.add_typer(query.app, name="query")
-app.add_typer(tx.app, name="tx")
+        ctx.call_on_close(finish_trace)
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Any, Dict, List
 
 from pydantic import BaseModel, validator
 
@@ -6,6 +6,8 @@ from pydantic import BaseModel, validator
 class IcxNetwork(BaseModel):
     name: str
     api_endpoint: str
+    # Additional endpoints for the same network that requests can be routed to.
+    api_endpoints: List[str] = []
     nid: int
     tracker_endpoint: str
 
@@ -40,10 +42,18 @@ class IcxToken(BaseModel):
 
 
 class AppConfig(BaseModel):
+    abi_cache_ttl: int = 300
+    cache_max_size_mb: int = 256
     custom_networks: Dict[str, IcxNetwork] = {}
     default_keystore: str = None
     default_network: str = "mainnet"
+    http_pool_size: int = 10
+    http_pool_sizes: Dict[str, int] = {}
+    http_timeout: int = 10
     saved_addresses: Dict[str, str] = {}
+    step_cache_ttl: int = 3600
+    step_limit_margin: float = 0.2
+    tracker_rate_limit: int = 5
 
     class Config:
         anystr_strip_whitespace = True
@@ -54,3 +64,20 @@ class AppConfig(BaseModel):
         if name not in ["mainnet", "lisbon", "berlin", "sejong"]:
             raise ValueError(f"{name} is not a supported network name.")
         return name
+
+    @validator("tracker_rate_limit")
+    def validate_tracker_rate_limit(cls, rate_limit):
+        if rate_limit <= 0:
+            raise ValueError("tracker_rate_limit must be greater than 0.")
+        return rate_limit
+
+
+class RpcResult(BaseModel):
+    method: str
+    params: dict = None
+    result: Any = None
+    error: dict = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
@@ -0,0 +1,264 @@
+import json
+import os
+import time
+from base64 import b64encode
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import sha3_256
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Tuple
+
+from icon_cli import EXA
+from icon_cli.icx import IcxQuery
+
+if TYPE_CHECKING:
+    from iconsdk.wallet.wallet import KeyWallet
+
+
+class OfflineTx:
+    """
+    Builds, signs and submits transactions in three separate steps, so transactions
+    can be built on an online machine, signed on an offline one and submitted later.
+
+    Every transaction is stored in its own JSON file with the file format version, the
+    network, the transaction's JSON-RPC params and its hash. Building and signing never
+    contact a node. Nodes only accept transactions within IcxTx.TIMESTAMP_WINDOW of
+    their timestamp, so signing stamps the current time and recomputes the hash, and
+    signed files have to be submitted within the window.
+    """
+
+    FILE_VERSION = 1
+    DEFAULT_SUBMIT_CHUNK_SIZE = 50
+    DEFAULT_SUBMIT_CONCURRENCY = 4
+    # Fewer transactions than this are signed in this process, since starting a pool
+    # of worker processes takes longer than signing them.
+    MIN_PARALLEL_SIGNATURES = 200
+
+    # The wallet of a signing worker process, loaded once by `_init_worker()`.
+    _worker_wallet = None
+
+    def __init__(self) -> None:
+        pass
+
+    @staticmethod
+    def build(
+        rows: List[dict],
+        from_address: str,
+        network: str,
+        nid: int,
+        step_limit: int,
+        timestamp: int = None,
+    ) -> List[dict]:
+        """
+        Returns an unsigned transaction for every row.
+
+        Args:
+            rows: Rows returned by `BulkSender.read_rows()`.
+            from_address: The address that will sign the transactions.
+            network: Name of the network (e.g. "mainnet").
+            nid: The network ID of the network.
+            step_limit: The step limit of every transaction.
+            timestamp: The timestamp of every transaction in microseconds. Defaults to
+                the current time. `sign()` replaces it.
+        """
+        from iconsdk.builder.transaction_builder import (
+            CallTransactionBuilder,
+            TransactionBuilder,
+        )
+        from iconsdk.signed_transaction import SignedTransaction
+
+        if timestamp is None:
+            timestamp = int(time.time() * 10**6)
+
+        transactions = []
+        for row in rows:
+            # The row index is used as the nonce so identical transfers get distinct
+            # hashes, like transactions sent by BulkSender.
+            builder = CallTransactionBuilder() if row["method"] is not None else TransactionBuilder()  # fmt: skip
+            builder = (
+                builder.from_(from_address)
+                .to(row["to"])
+                .value(int(row["value"] * EXA))
+                .step_limit(step_limit)
+                .nid(nid)
+                .nonce(row["index"])
+                .timestamp(timestamp)
+            )
+            if row["method"] is not None:
+                builder = builder.method(row["method"]).params(row["params"])
+            params = SignedTransaction.convert_tx_to_jsonrpc_request(builder.build())
+            transactions.append(
+                {
+                    "version": OfflineTx.FILE_VERSION,
+                    "network": network,
+                    "index": row["index"],
+                    "params": params,
+                    "tx_hash": OfflineTx.get_tx_hash(params),
+                }
+            )
+        return transactions
+
+    @classmethod
+    def sign(
+        cls,
+        transactions: List[dict],
+        wallet: "KeyWallet",
+        processes: int = None,
+        timestamp: int = None,
+    ) -> List[dict]:
+        """
+        Stamps transactions with a timestamp, signs them and returns them in the same
+        order with their new hashes. Signed transactions are signed again. Large
+        batches are signed by a pool of worker processes, each with its own copy of
+        the wallet.
+
+        Args:
+            transactions: Transactions returned by `build()` or `read()`.
+            wallet: The wallet to sign with. Its address must match the "from" address
+                of every transaction.
+            processes: The number of worker processes. Defaults to the number of CPUs.
+                Wallets held by the signing agent can't be copied, so they always sign
+                in this process.
+            timestamp: The timestamp of every transaction in microseconds. Defaults to
+                the current time.
+        """
+        address = wallet.get_address()
+        for transaction in transactions:
+            if transaction["params"]["from"] != address:
+                raise ValueError(f"Transaction {transaction['tx_hash']} is from {transaction['params']['from']}, not {address}.")  # fmt: skip
+
+        if timestamp is None:
+            timestamp = int(time.time() * 10**6)
+        params_list = []
+        for transaction in transactions:
+            params = {k: v for k, v in transaction["params"].items() if k != "signature"}  # fmt: skip
+            params["timestamp"] = hex(timestamp)
+            params_list.append(params)
+        if processes == 1 or len(params_list) < cls.MIN_PARALLEL_SIGNATURES or not hasattr(wallet, "get_private_key"):  # fmt: skip
+            signatures = [cls._get_signature(wallet, params) for params in params_list]
+        else:
+            processes = processes or os.cpu_count() or 1
+            # Workers get the private key rather than the keystore, so the keystore's
+            # KDF only runs once.
+            with ProcessPoolExecutor(processes, initializer=cls._init_worker, initargs=(bytes.fromhex(wallet.get_private_key()),)) as executor:  # fmt: skip
+                chunksize = max(1, len(params_list) // (processes * 4))
+                signatures = list(executor.map(cls._sign_in_worker, params_list, chunksize=chunksize))  # fmt: skip
+
+        signed_transactions = []
+        for transaction, params, signature in zip(
+            transactions, params_list, signatures
+        ):
+            tx_hash = cls.get_tx_hash(params)
+            signed_transactions.append({**transaction, "params": {**params, "signature": signature}, "tx_hash": tx_hash})  # fmt: skip
+        return signed_transactions
+
+    @staticmethod
+    def submit(
+        icx: IcxQuery,
+        transactions: List[dict],
+        chunk_size: int = DEFAULT_SUBMIT_CHUNK_SIZE,
+        concurrency: int = DEFAULT_SUBMIT_CONCURRENCY,
+    ) -> List[dict]:
+        """
+        Submits signed transactions with JSON-RPC batch posts and returns a result with
+        the index, hash, status ("submitted" or "failed") and error of each one.
+
+        Args:
+            icx: An IcxQuery for the network of the transactions.
+            transactions: Signed transactions returned by `sign()` or `read()`.
+            chunk_size: The maximum number of transactions to send in a single post.
+            concurrency: The maximum number of posts in flight.
+        """
+        for transaction in transactions:
+            if "signature" not in transaction["params"]:
+                raise ValueError(f"Transaction {transaction['tx_hash']} isn't signed.")
+            if transaction["network"] != icx.network:
+                raise ValueError(f"Transaction {transaction['tx_hash']} is for {transaction['network']}, not {icx.network}.")  # fmt: skip
+
+        with icx.batch(chunk_size, concurrency, cached=False) as batch:
+            for transaction in transactions:
+                batch.add("icx_sendTransaction", transaction["params"])
+
+        results = []
+        for transaction, result in zip(transactions, batch.results):
+            results.append(
+                {
+                    "index": transaction["index"],
+                    "tx_hash": transaction["tx_hash"],
+                    "status": "submitted" if result.ok else "failed",
+                    "error": None if result.ok else result.error.get("message"),
+                }
+            )
+        return results
+
+    @staticmethod
+    def write(transactions: List[dict], directory: Path) -> List[Path]:
+        """
+        Writes every transaction to its own file in a directory, named after its index,
+        and returns the paths of the files.
+
+        Args:
+            transactions: Transactions returned by `build()` or `sign()`.
+            directory: The directory to write to. It's created if it doesn't exist.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for transaction in transactions:
+            path = directory / f"{transaction['index']:06d}.json"
+            tmp_path = path.with_suffix(".json.tmp")
+            tmp_path.write_text(json.dumps(transaction, indent=4) + "\n", encoding="utf-8")  # fmt: skip
+            os.replace(tmp_path, path)
+            paths.append(path)
+        return paths
+
+    @classmethod
+    def read(cls, directory: Path) -> List[Tuple[Path, dict]]:
+        """
+        Returns the path and transaction of every transaction file in a directory,
+        ordered by file name.
+
+        Args:
+            directory: A directory written by `write()`.
+        """
+        transactions = []
+        for path in sorted(Path(directory).glob("*.json")):
+            transaction = json.loads(path.read_text(encoding="utf-8"))
+            if transaction.get("version") != cls.FILE_VERSION:
+                raise ValueError(f"{path} isn't a version {cls.FILE_VERSION} transaction file.")  # fmt: skip
+            transactions.append((path, transaction))
+        return transactions
+
+    @staticmethod
+    def get_tx_hash(params: dict) -> str:
+        """
+        Returns the hash of a transaction from its JSON-RPC params.
+
+        Args:
+            params: The params of an icx_sendTransaction request.
+        """
+        from iconsdk.libs.serializer import serialize
+
+        unsigned_params = {k: v for k, v in params.items() if k != "signature"}
+        return f"0x{sha3_256(serialize(unsigned_params)).hexdigest()}"
+
+    ##############################
+    # INTERNAL UTILITY FUNCTIONS #
+    ##############################
+
+    @staticmethod
+    def _get_signature(wallet: "KeyWallet", params: dict) -> str:
+        from iconsdk.libs.serializer import serialize
+
+        unsigned_params = {k: v for k, v in params.items() if k != "signature"}
+        message_hash = sha3_256(serialize(unsigned_params)).digest()
+        return b64encode(wallet.sign(message_hash)).decode()
+
+    @classmethod
+    def _init_worker(cls, private_key: bytes) -> None:
+        from iconsdk.wallet.wallet import KeyWallet
+
+        cls._worker_wallet = KeyWallet.load(private_key)
+
+    @classmethod
+    def _sign_in_worker(cls, params: dict) -> str:
+        return cls._get_signature(cls._worker_wallet, params)
@@ -0,0 +1,88 @@
+from json import JSONDecodeError
+from typing import TYPE_CHECKING, Union
+
+from iconsdk.exception import JSONRPCException
+from iconsdk.providers.provider import Provider
+
+from icon_cli.cache import Cache
+from icon_cli.httpreq import HttpReq
+
+if TYPE_CHECKING:
+    from icon_cli.endpoints import EndpointPool
+
+
+class IcxProvider(Provider):
+    """
+    An iconsdk Provider that sends JSON-RPC requests through HttpReq's shared
+    keep-alive sessions instead of opening a new connection for every request.
+
+    If a network name is given, responses to requests pinned to a block height are
+    served from and stored in the on-disk Cache. If an EndpointPool is given, requests
+    are routed across its endpoints instead of always going to `api_endpoint`.
+    """
+
+    def __init__(
+        self,
+        api_endpoint: str,
+        version: int = 3,
+        network: str = None,
+        pool: "EndpointPool" = None,
+    ) -> None:
+        self.api_endpoint = api_endpoint.rstrip("/")
+        self.version = version
+        self.network = network
+        self.pool = pool
+        self._path_map = {
+            "icx": f"/api/v{self.version}",
+            "debug": f"/api/v{self.version}d",
+        }
+
+    def __str__(self) -> str:
+        return f"RPC connection to {self.api_endpoint}"
+
+    def make_request(
+        self,
+        method: str,
+        params: dict = None,
+        full_response: bool = False,
+    ) -> Union[str, list, dict]:
+        """
+        Sends a JSON-RPC request and returns its result.
+
+        Args:
+            method: A JSON-RPC method name (e.g. "icx_getBalance").
+            params: The JSON-RPC params for the request.
+            full_response: Return the whole JSON-RPC response instead of its result.
+        """
+        cacheable = (
+            self.network is not None
+            and full_response is False
+            and Cache.is_cacheable(method, params)
+        )
+        if cacheable:
+            hit, result = Cache.get(self.network, method, params)
+            if hit is True:
+                return result
+
+        payload = {"jsonrpc": "2.0", "method": method, "id": 1}
+        if params:
+            payload["params"] = params
+
+        path = self._path_map[method.split("_")[0]]
+        try:
+            if self.pool is not None:
+                response = self.pool.post(path, payload)
+            else:
+                response = HttpReq.post(f"{self.api_endpoint}{path}", payload)
+        except JSONDecodeError as e:
+            raise JSONRPCException(f"Unknown response: {e.doc}")
+
+        if full_response:
+            return response
+        if "error" in response:
+            raise JSONRPCException(response["error"])
+
+        result = response["result"]
+        if cacheable:
+            Cache.set(self.network, method, params, result)
+        return result
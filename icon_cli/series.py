@@ -0,0 +1,174 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Callable, List
+
+from icon_cli.batch import IcxBatch
+from icon_cli.icx import IcxQuery
+
+
+class Series:
+    """
+    Samples a readonly query at many block heights to build a time series.
+
+    Every sample is a batched request pinned to a height, so samples are fetched with
+    a few concurrent batch posts, and each one is stored in the on-disk response cache
+    because a query at a fixed height can never change. Rebuilding or extending a
+    series only fetches heights that weren't sampled before.
+    """
+
+    DEFAULT_CONCURRENCY = 4
+
+    def __init__(self) -> None:
+        pass
+
+    @staticmethod
+    def get_heights(start: int, end: int, step: int) -> List[int]:
+        """
+        Returns the heights from `start` to `end` in increments of `step`, always
+        including `end`.
+
+        Args:
+            start: The first block height.
+            end: The last block height.
+            step: The number of blocks between samples.
+        """
+        heights = list(range(start, end + 1, step))
+        if heights[-1] != end:
+            heights.append(end)
+        return heights
+
+    @classmethod
+    def sample_call(
+        cls,
+        icx: IcxQuery,
+        to: str,
+        method: str,
+        heights: List[int],
+        params: dict = {},
+        field: str = None,
+        decimals: int = None,
+        timestamps: bool = True,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> List[dict]:
+        """
+        Samples a readonly contract method and returns one row per height. See
+        `sample()` for the format of rows.
+
+        Args:
+            icx: An IcxQuery object for the network to query.
+            to: The contract address to call.
+            method: The name of the readonly method.
+            heights: The block heights to sample.
+            params: A dictionary of params for the method.
+            field: A key (or dotted path of keys) to extract from a dictionary result.
+            decimals: Divide integer values by 10 ** decimals.
+            timestamps: Add the timestamp of every sampled block.
+            concurrency: The maximum number of batch posts in flight.
+        """
+
+        def queue(batch: IcxBatch, height: int) -> int:
+            return batch.call(to, method, params, height)
+
+        return cls.sample(icx, heights, queue, field, decimals, timestamps, concurrency)
+
+    @classmethod
+    def sample_balance(
+        cls,
+        icx: IcxQuery,
+        address: str,
+        heights: List[int],
+        timestamps: bool = True,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> List[dict]:
+        """
+        Samples the ICX balance of an address and returns one row per height. See
+        `sample()` for the format of rows.
+
+        Args:
+            icx: An IcxQuery object for the network to query.
+            address: An ICX wallet or contract address.
+            heights: The block heights to sample.
+            timestamps: Add the timestamp of every sampled block.
+            concurrency: The maximum number of batch posts in flight.
+        """
+
+        def queue(batch: IcxBatch, height: int) -> int:
+            return batch.get_balance(address, height)
+
+        return cls.sample(icx, heights, queue, None, 18, timestamps, concurrency)
+
+    @classmethod
+    def sample(
+        cls,
+        icx: IcxQuery,
+        heights: List[int],
+        queue: Callable[[IcxBatch, int], int],
+        field: str = None,
+        decimals: int = None,
+        timestamps: bool = True,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> List[dict]:
+        """
+        Samples any query at many heights. Returns a list of dictionaries with
+        "height", "timestamp" (if requested) and "value" keys, where the value is None
+        if the query failed at that height (e.g. before a contract was deployed).
+
+        Args:
+            icx: An IcxQuery object for the network to query.
+            heights: The block heights to sample.
+            queue: A function that queues the query for a height on an IcxBatch.
+            field: A key (or dotted path of keys) to extract from a dictionary result.
+            decimals: Divide integer values by 10 ** decimals.
+            timestamps: Add the timestamp of every sampled block.
+            concurrency: The maximum number of batch posts in flight.
+        """
+        with icx.batch(concurrency=concurrency) as batch:
+            value_indexes = [queue(batch, height) for height in heights]
+            block_indexes = [batch.get_block(height) for height in heights] if timestamps else []  # fmt: skip
+
+        rows = []
+        for position, height in enumerate(heights):
+            row = {"height": height}
+            if timestamps is True:
+                block = batch.results[block_indexes[position]]
+                row["timestamp"] = cls._to_datetime(block.result["time_stamp"]) if block.ok else None  # fmt: skip
+            result = batch.results[value_indexes[position]]
+            try:
+                row["value"] = cls._extract(result.result, field, decimals) if result.ok else None  # fmt: skip
+            except (KeyError, TypeError, ValueError):
+                row["value"] = None
+            rows.append(row)
+        return rows
+
+    @staticmethod
+    def to_dataframe(rows: List[dict]):
+        """
+        Returns the rows of a series as a pandas DataFrame indexed by height. Requires
+        pandas.
+
+        Args:
+            rows: Rows returned by `sample()`.
+        """
+        import pandas as pd
+
+        return pd.DataFrame(rows).set_index("height")
+
+    ##############################
+    # INTERNAL UTILITY FUNCTIONS #
+    ##############################
+
+    @staticmethod
+    def _extract(value, field: str = None, decimals: int = None):
+        if field is not None:
+            for key in field.split("."):
+                value = value[key]
+        if isinstance(value, str) and value.startswith("0x"):
+            value = int(value, 16)
+        if decimals is not None and isinstance(value, int):
+            value = Decimal(value) / 10**decimals
+        return value
+
+    @staticmethod
+    def _to_datetime(time_stamp: int) -> datetime:
+        # Block timestamps are in microseconds.
+        return datetime.fromtimestamp(time_stamp / 1_000_000, tz=timezone.utc)
@@ -0,0 +1,167 @@
+import json
+import math
+import threading
+import time
+from typing import TYPE_CHECKING, Callable
+
+from iconsdk.exception import JSONRPCException
+from requests.exceptions import HTTPError, RequestException
+
+from icon_cli.cache import Cache
+from icon_cli.config import Config
+from icon_cli.contracts import Contracts
+
+if TYPE_CHECKING:
+    from icon_cli.icx import IcxQuery
+
+
+class StepEstimator:
+    """
+    Estimates the step limit of transactions, adding `step_limit_margin` from
+    config.yml to every estimate, so transactions reserve what they need instead of a
+    fixed 100,000,000 steps.
+
+    Plain ICX transfers are priced locally from the governance contract's step costs.
+    Everything else is estimated by the node's `debug_estimateStep`, and the estimate is
+    reused for transactions with the same contract, method and parameter shape (the
+    parameter names and the rough size of each value), so a bulk run only estimates
+    each kind of transaction once. Estimates and step costs are cached in memory and on
+    disk for `step_cache_ttl` seconds from config.yml.
+
+    Nodes that don't expose the debug API (the method isn't found, or /api/v3d answers
+    404) are remembered, and transactions that can't be estimated get no step limit
+    from this class.
+    """
+
+    # The pseudo JSON-RPC method name that entries are stored under in the Cache.
+    CACHE_METHOD = "steps"
+
+    # Entries loaded in this process, keyed by network and cache params.
+    _entries = {}
+    # Networks whose nodes don't support `debug_estimateStep`.
+    _unsupported = set()
+    _lock = threading.Lock()
+
+    def __init__(self) -> None:
+        pass
+
+    @classmethod
+    def get_step_limit(cls, icx: "IcxQuery", params: dict) -> int:
+        """
+        Returns the step limit for a transaction, including the safety margin, or None
+        if its steps can't be estimated.
+
+        Args:
+            icx: An IcxQuery object for the transaction's network.
+            params: The JSON-RPC params of the transaction. "stepLimit" and
+                "signature" are ignored if present.
+        """
+        steps = cls.estimate_steps(icx, params)
+        if steps is None:
+            return None
+        margin = Config.read_config().step_limit_margin
+        return math.ceil(steps * (1 + margin))
+
+    @classmethod
+    def estimate_steps(cls, icx: "IcxQuery", params: dict) -> int:
+        """
+        Returns the number of steps a transaction is expected to use, or None if they
+        can't be estimated.
+
+        Args:
+            icx: An IcxQuery object for the transaction's network.
+            params: The JSON-RPC params of the transaction.
+        """
+        params = {k: v for k, v in params.items() if k not in ("stepLimit", "signature")}  # fmt: skip
+        if "dataType" not in params and params["to"].startswith("hx"):
+            return int(cls.get_step_costs(icx)["default"], 16)
+
+        key = cls._get_shape(params)
+        if key is None:
+            # Deploys are estimated every time, since their content varies too much.
+            return cls._request_estimate(icx, params)
+        return cls._get_cached(icx, {"estimate": key}, lambda: cls._request_estimate(icx, params))  # fmt: skip
+
+    @classmethod
+    def get_step_costs(cls, icx: "IcxQuery") -> dict:
+        """
+        Returns the step cost of each kind of operation from the governance contract,
+        as hex strings keyed by operation (e.g. "default" and "input").
+
+        Args:
+            icx: An IcxQuery object for the network.
+        """
+        governance = Contracts.get_contract_address_from_name("governance", icx.network)  # fmt: skip
+        return cls._get_cached(icx, {"method": "getStepCosts"}, lambda: icx.call(governance, "getStepCosts"))  # fmt: skip
+
+    @classmethod
+    def clear(cls) -> None:
+        """
+        Forgets the entries loaded in this process.
+        """
+        with cls._lock:
+            cls._entries = {}
+            cls._unsupported = set()
+
+    ##############################
+    # INTERNAL UTILITY FUNCTIONS #
+    ##############################
+
+    @classmethod
+    def _get_cached(cls, icx: "IcxQuery", cache_params: dict, fetch: Callable):
+        key = (icx.network, json.dumps(cache_params, sort_keys=True))
+        ttl = Config.read_config().step_cache_ttl
+        entry = cls._entries.get(key)
+        if entry is None and Cache.enabled is True:
+            hit, entry = Cache.get(icx.network, cls.CACHE_METHOD, cache_params)
+        if entry is not None and time.time() - entry["fetched_at"] < ttl:
+            cls._entries[key] = entry
+            return entry["value"]
+
+        value = fetch()
+        if value is None:
+            return None
+        entry = {"value": value, "fetched_at": time.time()}
+        cls._entries[key] = entry
+        if Cache.enabled is True:
+            Cache.set(icx.network, cls.CACHE_METHOD, cache_params, entry)
+        return value
+
+    @classmethod
+    def _request_estimate(cls, icx: "IcxQuery", params: dict) -> int:
+        if icx.network in cls._unsupported:
+            return None
+        try:
+            return int(icx.provider.make_request("debug_estimateStep", params), 16)
+        except JSONRPCException as e:
+            if not isinstance(e.message, dict) or e.message.get("code") != -32601:
+                # The transaction is expected to fail, or a gateway sent something
+                # other than JSON. It's left to the default step limit so the node
+                # reports why when it's sent.
+                return None
+        except HTTPError as e:
+            if e.response is None or e.response.status_code != 404:
+                return None
+        except RequestException:
+            # A dropped connection or timeout says nothing about the debug API.
+            return None
+        # The node doesn't have the debug API.
+        with cls._lock:
+            cls._unsupported.add(icx.network)
+        return None
+
+    @staticmethod
+    def _get_shape(params: dict) -> list:
+        data_type = params.get("dataType")
+        if data_type == "deploy":
+            return None
+
+        data = params.get("data")
+        if data_type == "call":
+            call_params = data.get("params") or {}
+            # Storage costs scale with the size of values, so each value's size is
+            # rounded up to a power of two to keep similar calls under one key.
+            sizes = {name: len(json.dumps(value)).bit_length() for name, value in call_params.items()}  # fmt: skip
+            return [params["to"], data_type, data["method"], sizes]
+        size = len(json.dumps(data)).bit_length() if data is not None else 0
+        return [params["to"], data_type, size]
@@ -0,0 +1,331 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List
+from urllib.parse import urlsplit
+
+
+class Tracer:
+    """
+    Records every HTTP request (JSON-RPC posts and tracker requests), response cache
+    lookup, retry and named phase of a command.
+
+    Counters are always kept, since they're cheap, and are read with `get_counters()`
+    by code that embeds icon-cli. Individual events are only kept after `enable()`
+    (e.g. by the `--trace` option), and functions registered with `add_hook()` are
+    called with every event as it's recorded.
+    """
+
+    enabled = False
+
+    _started_at = time.perf_counter()
+    _events = []
+    _hooks = []
+    _counters = {}
+    _lock = threading.Lock()
+
+    def __init__(self) -> None:
+        pass
+
+    @classmethod
+    def enable(cls, started_at: float = None) -> None:
+        """
+        Starts keeping events.
+
+        Args:
+            started_at: The `time.perf_counter()` value that event times are relative
+                to. Defaults to when this module was imported.
+        """
+        if started_at is not None:
+            cls._started_at = started_at
+        cls.enabled = True
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls._started_at = time.perf_counter()
+            cls._events = []
+            cls._counters = {}
+
+    @classmethod
+    def add_hook(cls, hook: Callable[[dict], None]) -> None:
+        """
+        Registers a function that's called with every recorded event.
+
+        Args:
+            hook: A function that takes an event dictionary. See `get_events()`.
+        """
+        cls._hooks.append(hook)
+
+    @classmethod
+    def remove_hook(cls, hook: Callable[[dict], None]) -> None:
+        cls._hooks.remove(hook)
+
+    #############
+    # RECORDING #
+    #############
+
+    @classmethod
+    def record_request(
+        cls,
+        name: str,
+        url: str,
+        started_at: float,
+        bytes_sent: int,
+        bytes_received: int,
+        status: int = None,
+        error: str = None,
+    ) -> None:
+        """
+        Records an HTTP request.
+
+        Args:
+            name: The JSON-RPC method, "batch:<method>" for a batch, or the URL path.
+            url: The requested URL.
+            started_at: The `time.perf_counter()` value when the request was sent.
+            bytes_sent: The size of the request body.
+            bytes_received: The size of the response body.
+            status: The HTTP status code.
+            error: The error message if no response was received.
+        """
+        duration = time.perf_counter() - started_at
+        with cls._lock:
+            counters = cls._get_method_counters(name)
+            counters["requests"] += 1
+            counters["errors"] += 1 if error is not None or (status or 0) >= 400 else 0
+            counters["seconds"] += duration
+            counters["max_seconds"] = max(counters["max_seconds"], duration)
+            counters["bytes_sent"] += bytes_sent
+            counters["bytes_received"] += bytes_received
+        args = {"url": url, "status": status, "bytes_sent": bytes_sent, "bytes_received": bytes_received, "error": error}  # fmt: skip
+        cls._record_event("request", name, started_at, duration, args)
+
+    @classmethod
+    def record_cache(cls, method: str, hit: bool) -> None:
+        """
+        Records a response cache lookup.
+
+        Args:
+            method: The JSON-RPC method that was looked up.
+            hit: Whether the response was cached.
+        """
+        with cls._lock:
+            cls._get_method_counters(method)[
+                "cache_hits" if hit else "cache_misses"
+            ] += 1
+        cls._record_event("cache", method, time.perf_counter(), 0, {"hit": hit})
+
+    @classmethod
+    def record_retry(cls, name: str, attempt: int, reason: str = None) -> None:
+        """
+        Records that a request is about to be retried.
+
+        Args:
+            name: The JSON-RPC method or URL path being retried.
+            attempt: The number of the attempt that failed.
+            reason: Why the attempt failed.
+        """
+        with cls._lock:
+            cls._get_method_counters(name)["retries"] += 1
+        args = {"attempt": attempt, "reason": reason}
+        cls._record_event("retry", name, time.perf_counter(), 0, args)
+
+    @classmethod
+    @contextmanager
+    def phase(cls, name: str):
+        """
+        A context manager that records how long a phase of a command (e.g. loading a
+        keystore) takes.
+
+        Args:
+            name: The name of the phase.
+        """
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls.record_phase(name, started_at)
+
+    @classmethod
+    def record_phase(cls, name: str, started_at: float) -> None:
+        duration = time.perf_counter() - started_at
+        with cls._lock:
+            phases = cls._counters.setdefault("phases", {})
+            phases[name] = phases.get(name, 0) + duration
+        cls._record_event("phase", name, started_at, duration, {})
+
+    @staticmethod
+    def get_request_name(url: str, payload=None) -> str:
+        """
+        Returns the name that a request is recorded under: its JSON-RPC method,
+        "batch:<method>" for a batch (or "batch:mixed" if it has several methods), or
+        the URL path for other requests.
+
+        Args:
+            url: The requested URL.
+            payload: The JSON payload of the request.
+        """
+        if isinstance(payload, dict):
+            return payload.get("method", "unknown")
+        if isinstance(payload, list):
+            methods = {request.get("method") for request in payload}
+            return f"batch:{methods.pop()}" if len(methods) == 1 else "batch:mixed"
+        return urlsplit(url).path
+
+    ###########
+    # READING #
+    ###########
+
+    @classmethod
+    def get_counters(cls) -> dict:
+        """
+        Returns a dictionary of totals and per-method counters of requests, errors,
+        retries, seconds, bytes and cache hits and misses, and the total seconds of
+        each phase.
+        """
+        with cls._lock:
+            methods = {name: dict(counters) for name, counters in cls._counters.get("methods", {}).items()}  # fmt: skip
+            phases = dict(cls._counters.get("phases", {}))
+        totals = {key: sum(counters[key] for counters in methods.values()) for key in cls._new_counters()}  # fmt: skip
+        totals["max_seconds"] = max([counters["max_seconds"] for counters in methods.values()], default=0)  # fmt: skip
+        return {**totals, "methods": methods, "phases": phases}
+
+    @classmethod
+    def get_events(cls) -> List[dict]:
+        """
+        Returns the events recorded since tracing was enabled. Every event has "type"
+        ("request", "cache", "retry" or "phase"), "name", "start" and "duration" (in
+        seconds since the tracer started), "thread" and "args" keys.
+        """
+        with cls._lock:
+            return list(cls._events)
+
+    @classmethod
+    def write(cls, path: str, format: str = "json") -> None:
+        """
+        Writes the counters and events to a file.
+
+        Args:
+            path: The file to write.
+            format: "json" for counters and events, or "chrome" for the Chrome trace
+                event format, which can be opened in chrome://tracing or Perfetto.
+        """
+        if format == "chrome":
+            data = {"traceEvents": cls._to_chrome_events(cls.get_events())}
+        else:
+            data = {"counters": cls.get_counters(), "events": cls.get_events()}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+    @classmethod
+    def print_summary(cls) -> None:
+        """
+        Prints tables of phase timings and per-method request counters to stderr, so
+        they don't mix with a command's output.
+        """
+        from rich import box
+        from rich.console import Console
+        from rich.table import Table
+
+        counters = cls.get_counters()
+        console = Console(stderr=True)
+
+        phases = Table(title="Phases")
+        for column in ["Phase", "Seconds"]:
+            phases.add_column(
+                column, justify="right" if column == "Seconds" else "left"
+            )
+        for name, seconds in counters["phases"].items():
+            phases.add_row(name, f"{seconds:.3f}")
+        console.print(phases)
+
+        # Columns are only separated by the box's spaces, so the table fits in 80 columns.
+        requests = Table(title="Requests", box=box.SIMPLE_HEAD, padding=0)
+        requests.add_column("Method", no_wrap=True)
+        for column in ["Reqs", "Errs", "Retry", "Hit/Miss", "Total ms", "Mean ms", "Max ms", "KB Out/In"]:  # fmt: skip
+            requests.add_column(column, justify="right")
+        for name, method in sorted(counters["methods"].items()) + [("TOTAL", counters)]:
+            mean = method["seconds"] / method["requests"] if method["requests"] else 0
+            requests.add_row(
+                name,
+                str(method["requests"]),
+                str(method["errors"]),
+                str(method["retries"]),
+                f"{method['cache_hits']}/{method['cache_misses']}",
+                f"{method['seconds'] * 1000:.1f}",
+                f"{mean * 1000:.1f}",
+                f"{method['max_seconds'] * 1000:.1f}",
+                f"{method['bytes_sent'] / 1024:.1f}/{method['bytes_received'] / 1024:.1f}",
+            )
+        console.print(requests)
+
+    ##############################
+    # INTERNAL UTILITY FUNCTIONS #
+    ##############################
+
+    @staticmethod
+    def _new_counters() -> Dict[str, float]:
+        return {
+            "requests": 0,
+            "errors": 0,
+            "retries": 0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "seconds": 0.0,
+            "bytes_sent": 0,
+            "bytes_received": 0,
+        }
+
+    @classmethod
+    def _get_method_counters(cls, name: str) -> dict:
+        # Callers hold the lock.
+        methods = cls._counters.setdefault("methods", {})
+        if name not in methods:
+            methods[name] = {**cls._new_counters(), "max_seconds": 0.0}
+        return methods[name]
+
+    @classmethod
+    def _record_event(
+        cls,
+        event_type: str,
+        name: str,
+        started_at: float,
+        duration: float,
+        args: dict,
+    ) -> None:
+        if cls.enabled is False and len(cls._hooks) == 0:
+            return
+        event = {
+            "type": event_type,
+            "name": name,
+            "start": started_at - cls._started_at,
+            "duration": duration,
+            "thread": threading.get_ident(),
+            "args": args,
+        }
+        if cls.enabled is True:
+            with cls._lock:
+                cls._events.append(event)
+        for hook in cls._hooks:
+            hook(event)
+
+    @staticmethod
+    def _to_chrome_events(events: List[dict]) -> List[dict]:
+        chrome_events = []
+        for event in events:
+            chrome_event = {
+                "name": event["name"],
+                "cat": event["type"],
+                "ph": "X" if event["duration"] > 0 else "i",
+                "ts": round(event["start"] * 1_000_000),
+                "pid": 1,
+                "tid": event["thread"],
+                "args": event["args"],
+            }
+            if chrome_event["ph"] == "X":
+                chrome_event["dur"] = round(event["duration"] * 1_000_000)
+            else:
+                chrome_event["s"] = "t"
+            chrome_events.append(chrome_event)
+        return chrome_events
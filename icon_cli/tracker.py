@@ -1,9 +1,36 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+from urllib.parse import urlsplit
+
+from requests.exceptions import HTTPError
+
+from icon_cli.config import Config
 from icon_cli.httpreq import HttpReq
+from icon_cli.trace import Tracer
 
 
 class Tracker:
+
+    # The largest page size the tracker API accepts.
+    MAX_PAGE_SIZE = 100
+    # How many pages `iter_address_transactions()` fetches ahead of the consumer.
+    DEFAULT_PREFETCH_PAGES = 4
+    # How many times to request a page that was rate limited or failed.
+    MAX_PAGE_ATTEMPTS = 5
+
+    # The time before which the next tracker request may not be sent, shared by every
+    # Tracker in the process since the tracker rate limits per client.
+    _next_request_at = 0
+    _rate_limit_lock = threading.Lock()
+
     def __init__(self, network) -> None:
-        self.icon_tracker_endpoint = "https://tracker.icon.community"
+        self.network = network
+        self.icon_tracker_endpoint = Config.get_network(network).tracker_endpoint
+        # The minimum number of seconds between requests, read once per Tracker.
+        self._request_interval = 1 / Config.read_config().tracker_rate_limit
 
     def get_address_details(self, address: str):
         url = f"{self.icon_tracker_endpoint}/api/v1/addresses/details/{ address }/"
@@ -19,3 +46,92 @@ class Tracker:
         url = f"{self.icon_tracker_endpoint}/api/v1/transactions/address/{ address }/?limit={limit}&skip={skip}"
         transactions = HttpReq.get(url)
         return transactions
+
+    def iter_address_transactions(
+        self,
+        address: str,
+        page_size: int = MAX_PAGE_SIZE,
+        prefetch: int = DEFAULT_PREFETCH_PAGES,
+    ) -> Iterator[dict]:
+        """
+        Yields every transaction of an address, newest first.
+
+        Up to `prefetch` pages are fetched concurrently ahead of the consumer, so memory
+        use is bounded by `prefetch * page_size` transactions. Requests are spaced to
+        stay under `tracker_rate_limit` requests per second from config.yml, and a
+        rate limited page is retried after the delay the tracker asks for.
+
+        Args:
+            address: An ICX wallet or contract address.
+            page_size: The number of transactions to fetch per request.
+            prefetch: The maximum number of pages to fetch ahead.
+        """
+        url = f"{self.icon_tracker_endpoint}/api/v1/transactions/address/{address}/"
+        # The first page tells us the total, which bounds how many pages to request.
+        transactions, total = self._get_page(url, page_size, 0)
+        yield from transactions
+        if len(transactions) < page_size:
+            return
+
+        skips = iter(
+            range(page_size, total if total is not None else 2**63, page_size)
+        )
+        executor = ThreadPoolExecutor(max_workers=prefetch)
+        futures = deque()
+        try:
+            while True:
+                while len(futures) < prefetch:
+                    skip = next(skips, None)
+                    if skip is None:
+                        break
+                    futures.append(executor.submit(self._get_page, url, page_size, skip))  # fmt: skip
+                if len(futures) == 0:
+                    return
+                transactions, _ = futures.popleft().result()
+                yield from transactions
+                # Without a total, the first short page is the last page.
+                if len(transactions) < page_size:
+                    return
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    ##############################
+    # INTERNAL UTILITY FUNCTIONS #
+    ##############################
+
+    def _get_page(self, url: str, limit: int, skip: int) -> tuple:
+        """
+        Returns a tuple of (transactions, total) for one page. The total is None if
+        the tracker didn't send an X-Total-Count header.
+        """
+        for attempt in range(1, self.MAX_PAGE_ATTEMPTS + 1):
+            self._wait_for_rate_limit(self._request_interval)
+            r = HttpReq.get_response(f"{url}?limit={limit}&skip={skip}")
+            if r.status_code == 429 or r.status_code >= 500:
+                if attempt == self.MAX_PAGE_ATTEMPTS:
+                    r.raise_for_status()
+                retry_after = r.headers.get("Retry-After")
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else 2**attempt  # fmt: skip
+                Tracer.record_retry(urlsplit(url).path, attempt, f"HTTP {r.status_code}")  # fmt: skip
+                self._delay_requests(delay)
+                continue
+            # The tracker answers a skip past the last transaction with a 204 or 404.
+            if r.status_code in (204, 404):
+                return [], None
+            r.raise_for_status()
+            total = r.headers.get("X-Total-Count")
+            return r.json(), int(total) if total is not None else None
+        raise HTTPError(f"Could not get {url} after {self.MAX_PAGE_ATTEMPTS} attempts.")
+
+    @classmethod
+    def _wait_for_rate_limit(cls, interval: float) -> None:
+        with cls._rate_limit_lock:
+            now = time.monotonic()
+            request_at = max(now, cls._next_request_at)
+            cls._next_request_at = request_at + interval
+        time.sleep(request_at - now)
+
+    @classmethod
+    def _delay_requests(cls, delay: float) -> None:
+        with cls._rate_limit_lock:
+            cls._next_request_at = max(cls._next_request_at, time.monotonic() + delay)
@@ -3,9 +3,6 @@ import json
 import os
 from pathlib import Path
 
-import jsonschema
-from yarl import URL
-
 from icon_cli import ICX_KEYSTORE_JSON_SCHEMA, KEYSTORE_DIR
 from icon_cli.contracts import Contracts
 from icon_cli.utils import Utils
@@ -53,6 +50,9 @@ class Validators:
 
     @staticmethod
     def validate_keystore_file(keystore_path: Path) -> Path:
+        # jsonschema is slow to import, so it's only imported when it's needed.
+        import jsonschema
+
         with io.open(keystore_path, "r", encoding="utf-8-sig") as keystore_file:
             keystore_data = json.load(keystore_file)
         try:
@@ -83,6 +83,7 @@ class Validators:
         Args:
             keystore_path: File path to an ICX keystore file.
         """
+        import jsonschema
 
         try:
             jsonschema.validate(keystore_data, ICX_KEYSTORE_JSON_SCHEMA)
@@ -122,6 +123,8 @@ class Validators:
 
     @staticmethod
     def validate_url(url: str) -> str:
+        from yarl import URL
+
         try:
             URL(url)
             return url
@@ -0,0 +1,260 @@
+import asyncio
+import json
+import time
+from typing import Iterator, List
+
+import aiohttp
+
+from icon_cli.decoder import Decoder
+from icon_cli.icx import IcxQuery
+from icon_cli.trace import Tracer
+
+
+class Watcher:
+    """
+    Streams new blocks, or the events of a contract, from an ICON network.
+
+    The node pushes a notification over its websocket endpoints as soon as a block (or
+    a transaction with a matching event) is final, so nothing is polled. A dropped
+    connection (including one that stops answering pings) is reconnected with a backoff
+    and resubscribed from the next height, so nothing is skipped or delivered twice. If
+    the node doesn't accept websocket connections, the watcher falls back to polling
+    for new blocks.
+    """
+
+    # The channel of ICON's main chain on goloop nodes.
+    CHANNEL = "icon_dex"
+    TRANSPORTS = ["auto", "websocket", "poll"]
+
+    DEFAULT_POLL_INTERVAL = 2
+    # The delay before reconnecting a dropped websocket, doubled after every
+    # consecutive failure.
+    MIN_RECONNECT_DELAY = 1
+    MAX_RECONNECT_DELAY = 30
+    CONNECT_TIMEOUT = 10
+    # Websockets are pinged this often, and a node that doesn't answer within half of
+    # it is treated as a dropped connection, since an event stream can be silent for
+    # hours.
+    HEARTBEAT_INTERVAL = 20
+
+    def __init__(
+        self,
+        icx: IcxQuery,
+        transport: str = "auto",
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        ws_endpoint: str = None,
+    ) -> None:
+        if transport not in self.TRANSPORTS:
+            raise ValueError(f"{transport} is not a transport. Use one of: {', '.join(self.TRANSPORTS)}.")  # fmt: skip
+        self.icx = icx
+        self.transport = transport
+        self.poll_interval = poll_interval
+        if ws_endpoint is None:
+            ws_endpoint = self.get_ws_endpoint(icx.api_endpoint)
+        self.ws_endpoint = ws_endpoint.rstrip("/")
+        # The height to resume from.
+        self.next_height = None
+
+    @classmethod
+    def get_ws_endpoint(cls, api_endpoint: str) -> str:
+        """
+        Returns the websocket base URL of a node's API.
+
+        Args:
+            api_endpoint: The node's API endpoint (e.g. "https://api.icon.community").
+        """
+        if api_endpoint.startswith("https://"):
+            api_endpoint = "wss://" + api_endpoint[len("https://") :]
+        elif api_endpoint.startswith("http://"):
+            api_endpoint = "ws://" + api_endpoint[len("http://") :]
+        return f"{api_endpoint.rstrip('/')}/api/v3/{cls.CHANNEL}"
+
+    def iter_blocks(self, start: int = None) -> Iterator[dict]:
+        """
+        Yields every block from a height onwards as it's produced. Never returns.
+
+        Args:
+            start: The first block height. Defaults to the block after the last one.
+        """
+        self._set_start(start)
+        for notification in self._iter_websocket("block", {}):
+            height = int(notification["height"], 16)
+            self.next_height = height + 1
+            yield self.icx.get_block(height)
+
+        for block in self._poll_blocks():
+            self.next_height = block["height"] + 1
+            yield block
+
+    def iter_events(
+        self,
+        contract: str,
+        signature: str,
+        start: int = None,
+    ) -> Iterator[dict]:
+        """
+        Yields every event of a contract with a signature from a height onwards, as
+        decoded by `decode_event()`. Never returns.
+
+        Args:
+            contract: The contract that emits the events.
+            signature: The event's signature (e.g. "Transfer(Address,Address,int,bytes)").
+            start: The first block height. Defaults to the block after the last one.
+        """
+        self._set_start(start)
+        decoders = self.compile_signature(signature)
+        # The last transaction delivered, since a resubscription starts from the
+        # beginning of its block.
+        last_position = (-1, -1)
+
+        filters = {"addr": contract, "event": signature}
+        for notification in self._iter_websocket("event", filters):
+            height = int(notification["height"], 16)
+            tx_index = int(notification["index"], 16)
+            if (height, tx_index) <= last_position:
+                continue
+            self.next_height = height
+            last_position = (height, tx_index)
+
+            block = self.icx.get_block(height)
+            tx_hash = block["confirmed_transaction_list"][tx_index]["txHash"]
+            tx_result = self.icx.get_transaction_result(tx_hash)
+            for log_index in notification["events"]:
+                log_index = int(log_index, 16)
+                yield self.decode_event(block, tx_result, log_index, decoders)
+
+        for block in self._poll_blocks(include_results=True):
+            self.next_height = block["height"] + 1
+            for tx in block["confirmed_transaction_list"]:
+                for log_index, log in enumerate(tx["result"]["eventLogs"]):
+                    if log["scoreAddress"] == contract and log["indexed"][0] == signature:  # fmt: skip
+                        yield self.decode_event(block, tx["result"], log_index, decoders)  # fmt: skip
+
+    @staticmethod
+    def compile_signature(signature: str) -> List:
+        """
+        Returns a Decoder function for each argument of an event signature.
+
+        Args:
+            signature: An event signature (e.g. "Transfer(Address,Address,int,bytes)").
+        """
+        types = signature[signature.index("(") + 1 : signature.rindex(")")]
+        return [Decoder.compile(arg_type) for arg_type in types.split(",") if arg_type]  # fmt: skip
+
+    @staticmethod
+    def decode_event(
+        block: dict,
+        tx_result: dict,
+        log_index: int,
+        decoders: List,
+    ) -> dict:
+        """
+        Returns an event log with its position in the chain and its arguments decoded,
+        indexed arguments first.
+
+        Args:
+            block: The block of the event.
+            tx_result: The result of the transaction that emitted the event.
+            log_index: The index of the event in the transaction's event logs.
+            decoders: Functions returned by `compile_signature()`.
+        """
+        log = tx_result["eventLogs"][log_index]
+        args = log["indexed"][1:] + log.get("data", [])
+        return {
+            "height": block["height"],
+            "tx_hash": tx_result["txHash"],
+            "tx_index": tx_result["txIndex"],
+            "log_index": log_index,
+            "contract": log["scoreAddress"],
+            "signature": log["indexed"][0],
+            "args": [decode(arg) for decode, arg in zip(decoders, args)],
+        }
+
+    ##############################
+    # INTERNAL UTILITY FUNCTIONS #
+    ##############################
+
+    def _set_start(self, start: int) -> None:
+        if start is None:
+            start = self.icx.get_block()["height"] + 1
+        self.next_height = start
+
+    def _poll_blocks(self, include_results: bool = False) -> Iterator[dict]:
+        while True:
+            last_height = self.icx.get_block()["height"]
+            if self.next_height > last_height:
+                time.sleep(self.poll_interval)
+                continue
+            # Catching up from an old height is fetched in concurrent batches.
+            yield from self.icx.iter_blocks(self.next_height, last_height, include_results)  # fmt: skip
+
+    def _iter_websocket(self, kind: str, filters: dict) -> Iterator[dict]:
+        """
+        Yields notifications from the node's "block" or "event" websocket, subscribing
+        from `next_height` on every connection. Returns if the transport is "auto" and
+        the first connection fails, so the caller can poll instead.
+        """
+        if self.transport == "poll":
+            return
+
+        loop = asyncio.new_event_loop()
+        session = None
+        connected = False
+        failures = 0
+        try:
+            while True:
+                if failures > 0:
+                    time.sleep(min(self.MIN_RECONNECT_DELAY * 2 ** (failures - 1), self.MAX_RECONNECT_DELAY))  # fmt: skip
+                try:
+                    if session is None:
+                        session = loop.run_until_complete(self._create_session())
+                    ws = loop.run_until_complete(self._subscribe(session, kind, filters))  # fmt: skip
+                except (aiohttp.ClientError, asyncio.TimeoutError, OSError, ValueError) as e:  # fmt: skip
+                    # A rejected or unreadable subscription is handled like a failed
+                    # connection.
+                    if connected is False:
+                        if self.transport == "auto":
+                            return
+                        raise
+                    failures += 1
+                    Tracer.record_retry(f"ws:{kind}", failures, str(e))
+                    continue
+
+                connected = True
+                # A connection that closes before delivering anything backs off like a
+                # failed one, so a node that keeps dropping us isn't hammered.
+                failures += 1
+                try:
+                    while True:
+                        message = loop.run_until_complete(ws.receive())
+                        if message.type != aiohttp.WSMsgType.TEXT:
+                            # Closed, errored or missed a heartbeat, so reconnect from
+                            # `next_height`.
+                            break
+                        failures = 0
+                        yield json.loads(message.data)
+                finally:
+                    loop.run_until_complete(ws.close())
+        finally:
+            if session is not None:
+                loop.run_until_complete(session.close())
+            loop.close()
+
+    async def _create_session(self) -> aiohttp.ClientSession:
+        timeout = aiohttp.ClientTimeout(sock_connect=self.CONNECT_TIMEOUT)
+        return aiohttp.ClientSession(timeout=timeout)
+
+    async def _subscribe(
+        self,
+        session: aiohttp.ClientSession,
+        kind: str,
+        filters: dict,
+    ) -> aiohttp.ClientWebSocketResponse:
+        ws = await session.ws_connect(f"{self.ws_endpoint}/{kind}", heartbeat=self.HEARTBEAT_INTERVAL)  # fmt: skip
+        await ws.send_json({"height": hex(self.next_height), **filters})
+        # The node acknowledges a subscription with a code of 0, or rejects it.
+        response = await ws.receive_json(timeout=self.CONNECT_TIMEOUT)
+        if response.get("code") != 0:
+            await ws.close()
+            raise ValueError(f"The node rejected the subscription: {response.get('message')}")  # fmt: skip
+        return ws
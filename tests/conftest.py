@@ -0,0 +1,35 @@
+import threading
+
+import pytest
+
+from icon_cli import DEFAULT_NETWORKS
+from icon_cli.cache import Cache
+from icon_cli.endpoints import EndpointPool
+from icon_cli.steps import StepEstimator
+from tests.mock_node import MockIconNode
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    # Keep tests from reading or writing the user's response cache, or sharing cached
+    # step estimates.
+    monkeypatch.setattr(Cache, "CACHE_FILE", str(tmp_path / "cache.db"))
+    monkeypatch.setattr(Cache, "_local", threading.local())
+    monkeypatch.setattr(StepEstimator, "_entries", {})
+    monkeypatch.setattr(StepEstimator, "_unsupported", set())
+
+
+@pytest.fixture(autouse=True)
+def single_endpoint_networks(monkeypatch):
+    # Route every request to a network's primary endpoint, which is the one tests mock,
+    # and start every test with fresh endpoint pools.
+    for name, network in DEFAULT_NETWORKS.items():
+        monkeypatch.setitem(DEFAULT_NETWORKS, name, network.copy(update={"api_endpoints": []}))  # fmt: skip
+    monkeypatch.setattr(EndpointPool, "_pools", {})
+
+
+@pytest.fixture
+def mock_node():
+    # A local mainnet node and tracker, so tests never touch the live network.
+    with MockIconNode("mainnet") as node:
+        yield node
@@ -0,0 +1,306 @@
+import json
+import threading
+import time
+from hashlib import sha3_256
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict
+from urllib.parse import parse_qs, urlsplit
+
+from icon_cli import DEFAULT_NETWORKS
+
+
+class MockIconNode:
+    """
+    An in-process ICON node and tracker for tests and benchmarks.
+
+    The server listens on a random local port in a background thread and answers
+    JSON-RPC posts (single or batch) to /api/v3 and tracker GETs to /api/v1. Used as a
+    context manager, it points a network in DEFAULT_NETWORKS at itself, so IcxQuery,
+    IcxTx, Cps and Tracker objects created inside the block talk to the mock.
+
+    Every HTTP request is delayed by `latency` seconds to emulate a remote node.
+    Readonly contract methods are answered by the functions in `call_handlers`, which
+    take the call's "to" address and params and return its result.
+    """
+
+    ABI = [
+        {"type": "function", "name": "balanceOf", "inputs": [{"name": "_owner", "type": "Address"}], "outputs": [{"type": "int"}], "readonly": "0x1"},  # fmt: skip
+        {"type": "function", "name": "transfer", "inputs": [{"name": "_to", "type": "Address"}, {"name": "_value", "type": "int"}, {"name": "_data", "type": "bytes", "default": None}], "outputs": []},  # fmt: skip
+    ]
+
+    def __init__(
+        self,
+        network: str = "mainnet",
+        latency: float = 0.0,
+        height: int = 100_000,
+        transactions_per_block: int = 2,
+        contributors: int = 10,
+        tracker_transactions: int = 250,
+    ) -> None:
+        self.network = network
+        self.latency = latency
+        self.height = height
+        self.transactions_per_block = transactions_per_block
+        self.contributors = [f"hx{i:040x}" for i in range(1, contributors + 1)]
+        self.tracker_transactions = tracker_transactions
+        self.call_handlers: Dict[str, Callable[[str, dict], object]] = {
+            "balanceOf": lambda to, params: hex(10**18),
+            "decimals": lambda to, params: "0x12",
+            "getProposal": self._get_proposal,
+            "getProposals": self._get_proposals,
+            "getScoreStatus": lambda to, params: {"current": {"deployTxHash": "0x" + "0" * 64}},  # fmt: skip
+            "get_active_proposals": self._get_active_proposals,
+            "get_contributors": lambda to, params: self.contributors,
+            "get_progress_reports": self._get_progress_reports,
+            "get_PReps": self._get_preps,
+            "get_remaining_fund": self._get_remaining_fund,
+            "getStepCosts": lambda to, params: {"default": "0x186a0", "input": "0xc8"},
+        }
+        # Counters for assertions and benchmarks.
+        self.http_requests = 0
+        self.rpc_requests = 0
+        self.sent = {}
+        # Event logs of transactions by hash.
+        self.event_logs: Dict[str, list] = {}
+        # Network proposals by ID, as `getProposal` returns them.
+        self.proposals: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+        self._original_network = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "MockIconNode":
+        self.start()
+        self._original_network = DEFAULT_NETWORKS[self.network]
+        DEFAULT_NETWORKS[self.network] = self._original_network.copy(
+            update={
+                "api_endpoint": self.url,
+                "api_endpoints": [],
+                "tracker_endpoint": self.url,
+            }
+        )
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        DEFAULT_NETWORKS[self.network] = self._original_network
+        self.stop()
+
+    def start(self) -> None:
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.http_requests = 0
+            self.rpc_requests = 0
+
+    ############
+    # JSON-RPC #
+    ############
+
+    def handle_rpc(self, rpc: dict) -> dict:
+        with self._lock:
+            self.rpc_requests += 1
+        handler = getattr(self, f"_rpc_{rpc.get('method')}", None)
+        if handler is None:
+            return self._error(rpc, -32601, "Method not found")
+        try:
+            return {"jsonrpc": "2.0", "id": rpc.get("id"), "result": handler(rpc.get("params") or {})}  # fmt: skip
+        except LookupError as e:
+            return self._error(rpc, e.args[0], e.args[1])
+
+    def _rpc_icx_call(self, params: dict):
+        data = params["data"]
+        handler = self.call_handlers.get(data["method"])
+        if handler is None:
+            raise LookupError(-32601, f"Method not found: {data['method']}")
+        return handler(params["to"], data.get("params") or {})
+
+    def _rpc_icx_getBalance(self, params: dict) -> str:
+        return hex(int(params["address"][2:], 16) % 10**6 * 10**18)
+
+    def _rpc_icx_getLastBlock(self, params: dict) -> dict:
+        return self._block(self.height)
+
+    def _rpc_icx_getBlockByHeight(self, params: dict) -> dict:
+        height = int(params["height"], 16)
+        if height > self.height:
+            raise LookupError(-31004, "Not found")
+        return self._block(height)
+
+    def _rpc_icx_getScoreApi(self, params: dict) -> list:
+        return self.ABI
+
+    def _rpc_icx_sendTransaction(self, params: dict) -> str:
+        from iconsdk.libs.serializer import serialize
+
+        unsigned_params = {k: v for k, v in params.items() if k != "signature"}
+        tx_hash = f"0x{sha3_256(serialize(unsigned_params)).hexdigest()}"
+        with self._lock:
+            self.sent[tx_hash] = params
+        return tx_hash
+
+    def _rpc_icx_getTransactionByHash(self, params: dict) -> dict:
+        tx_hash = params["txHash"]
+        if tx_hash in self.sent:
+            return {**self.sent[tx_hash], "txHash": tx_hash, "txIndex": "0x0", "blockHeight": hex(self.height), "blockHash": "0x" + "0" * 64}  # fmt: skip
+        if not self._is_block_transaction(tx_hash):
+            raise LookupError(-31004, "Not found")
+        height, tx_index = int(tx_hash[2:58], 16), int(tx_hash[58:], 16)
+        tx = self._block(height)["confirmed_transaction_list"][tx_index]
+        return {**tx, "txIndex": hex(tx_index), "blockHeight": hex(height), "blockHash": f"0x{height:064x}"}  # fmt: skip
+
+    def _rpc_debug_estimateStep(self, params: dict) -> str:
+        # Roughly what a node charges: a base cost plus a cost per byte of data.
+        data = params.get("data")
+        return hex(100_000 + 200 * len(json.dumps(data)) if data is not None else 100_000)  # fmt: skip
+
+    def _rpc_icx_getTransactionResult(self, params: dict) -> dict:
+        tx_hash = params["txHash"]
+        if tx_hash not in self.sent and not self._is_block_transaction(tx_hash):
+            raise LookupError(-31004, "Not found")
+        height, tx_index = (int(tx_hash[2:58], 16), int(tx_hash[58:], 16)) if tx_hash not in self.sent else (self.height, 0)  # fmt: skip
+        return {"txHash": tx_hash, "status": "0x1", "blockHeight": hex(height), "blockHash": "0x" + "0" * 64, "txIndex": hex(tx_index), "to": "hx" + "0" * 40, "stepUsed": "0x186a0", "stepPrice": "0x2e90edd00", "cumulativeStepUsed": "0x186a0", "eventLogs": self.event_logs.get(tx_hash, []), "logsBloom": "0x" + "0" * 512}  # fmt: skip
+
+    def _block(self, height: int) -> dict:
+        transactions = [
+            {
+                "version": "0x3",
+                "from": self.contributors[0],
+                "to": f"hx{height:040x}",
+                "value": "0xde0b6b3a7640000",
+                "stepLimit": "0x186a0",
+                "timestamp": hex(height * 2_000_000),
+                "nid": "0x1",
+                "signature": "",
+                "txHash": f"0x{height:056x}{index:08x}",
+            }  # fmt: skip
+            for index in range(self.transactions_per_block)
+        ]
+        return {"version": "2.0", "height": height, "time_stamp": height * 2_000_000, "block_hash": f"{height:064x}", "prev_block_hash": f"{max(height - 1, 0):064x}", "merkle_tree_root_hash": "", "peer_id": self.contributors[0], "signature": "", "next_leader": "", "confirmed_transaction_list": transactions}  # fmt: skip
+
+    def _is_block_transaction(self, tx_hash: str) -> bool:
+        return len(tx_hash) == 66 and int(tx_hash[2:58], 16) <= self.height
+
+    ##################
+    # CONTRACT CALLS #
+    ##################
+
+    def _get_active_proposals(self, to: str, params: dict) -> list:
+        address = params["_wallet_address"]
+        return [{"ipfs_hash": f"bafy{address}", "project_title": f"Proposal by {address}", "contributor_address": address, "last_progress_report": "0x1", "new_progress_report": "0x0"}]  # fmt: skip
+
+    def _get_progress_reports(self, to: str, params: dict) -> dict:
+        # Pages of 10 from `_start_index`, like the CPS contract.
+        reports = [{"ipfs_hash": f"bafy{address}", "report_hash": f"report{address}", "progress_report_title": f"Report by {address}", "timestamp": hex(self.height)} for address in self.contributors]  # fmt: skip
+        start = params.get("_start_index", 0)
+        start = int(start, 16) if isinstance(start, str) else start
+        return {"data": reports[start : start + 10], "count": hex(len(reports))}
+
+    def _get_preps(self, to: str, params: dict) -> list:
+        return [{"address": address, "name": f"Validator {address}", "delegated": hex(10**24)} for address in self.contributors[:3]]  # fmt: skip
+
+    def _get_remaining_fund(self, to: str, params: dict) -> dict:
+        return {"ICX": hex(10**24), "bnUSD": hex(5 * 10**23)}
+
+    def _get_proposal(self, to: str, params: dict) -> dict:
+        if params["id"] not in self.proposals:
+            raise LookupError(-30032, "Proposal not found")
+        return self.proposals[params["id"]]
+
+    def _get_proposals(self, to: str, params: dict) -> dict:
+        # Newest first, like the governance contract.
+        proposals = sorted(self.proposals.values(), key=lambda proposal: int(proposal["startBlockHeight"], 16), reverse=True)  # fmt: skip
+        if "status" in params:
+            proposals = [proposal for proposal in proposals if proposal["status"] == params["status"]]  # fmt: skip
+        start = int(params.get("start", "0x0"), 16)
+        page = proposals[start : start + int(params.get("size", "0xa"), 16)]
+        summaries = []
+        for proposal in page:
+            votes = {name: {"count": hex(len(tally["list"])), "amount": tally["amount"]} for name, tally in proposal["vote"].items()}  # fmt: skip
+            summaries.append({**proposal, "vote": votes})
+        return {"proposals": summaries}
+
+    ###########
+    # TRACKER #
+    ###########
+
+    def handle_tracker(self, path: str, query: dict) -> tuple:
+        """
+        Returns a tuple of (status, headers, body) for a tracker request.
+        """
+        parts = [part for part in path.split("/") if part]
+        if parts[:4] == ["api", "v1", "transactions", "address"] and len(parts) == 5:
+            limit = int(query.get("limit", ["25"])[0])
+            skip = int(query.get("skip", ["0"])[0])
+            end = min(skip + limit, self.tracker_transactions)
+            transactions = [{"hash": f"0x{i:064x}", "from_address": parts[4], "to_address": self.contributors[0], "value": "1", "block_number": self.height - i} for i in range(skip, end)]  # fmt: skip
+            return 200, {"X-Total-Count": str(self.tracker_transactions)}, transactions
+        if parts[:4] == ["api", "v1", "addresses", "details"] and len(parts) == 5:
+            return 200, {}, {"address": parts[4], "balance": 1.0, "transaction_count": self.tracker_transactions}  # fmt: skip
+        return 404, {}, {"detail": "Not Found"}
+
+    ##############################
+    # INTERNAL UTILITY FUNCTIONS #
+    ##############################
+
+    @staticmethod
+    def _error(rpc: dict, code: int, message: str) -> dict:
+        return {"jsonrpc": "2.0", "id": rpc.get("id"), "error": {"code": code, "message": message}}  # fmt: skip
+
+    def _make_handler(self):
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 keeps connections alive, like a real node behind a load balancer.
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately, which would otherwise stall
+            # every response on delayed ACKs.
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                node._count_request()
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))  # fmt: skip
+                if isinstance(payload, list):
+                    body = [node.handle_rpc(rpc) for rpc in payload]
+                else:
+                    body = node.handle_rpc(payload)
+                self._respond(200, {}, body)
+
+            def do_GET(self):
+                node._count_request()
+                url = urlsplit(self.path)
+                self._respond(*node.handle_tracker(url.path, parse_qs(url.query)))
+
+            def log_message(self, format, *args):
+                pass
+
+            def _respond(self, status: int, headers: dict, body) -> None:
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def _count_request(self) -> None:
+        with self._lock:
+            self.http_requests += 1
+        if self.latency > 0:
+            time.sleep(self.latency)
@@ -0,0 +1,107 @@
+import json
+import threading
+
+import pytest
+import requests_mock
+from typer.testing import CliRunner
+
+from icon_cli.abi import AbiCache
+from icon_cli.cache import Cache
+from icon_cli.commands.query import app
+from icon_cli.icx import IcxQuery
+
+CONTRACT = "cx" + "1" * 40
+ABI = [
+    {
+        "type": "function",
+        "name": "transfer",
+        "inputs": [
+            {"name": "_to", "type": "Address"},
+            {"name": "_data", "type": "bytes", "default": None},
+        ],
+        "outputs": [],
+    },  # fmt: skip
+    {
+        "type": "function",
+        "name": "balanceOf",
+        "inputs": [{"name": "_owner", "type": "Address"}],
+        "outputs": [{"type": "int"}],
+        "readonly": "0x1",
+    },  # fmt: skip
+    {"type": "eventlog", "name": "Transfer", "inputs": []},
+]
+
+
+@pytest.fixture
+def node(tmp_path, monkeypatch):
+    monkeypatch.setattr(Cache, "CACHE_FILE", str(tmp_path / "cache.db"))
+    monkeypatch.setattr(Cache, "_local", threading.local())
+    monkeypatch.setattr(AbiCache, "_entries", {})
+    state = {"deploy_tx_hash": "0x" + "a" * 64, "methods": [], "calls": []}
+
+    def _respond(request, context):
+        rpc = request.json()
+        state["methods"].append(rpc["method"])
+        if rpc["method"] == "icx_getScoreApi":
+            result = ABI
+        elif rpc["params"]["data"]["method"] == "balanceOf":
+            state["calls"].append(rpc["params"])
+            result = "0x64"
+        else:
+            result = {"current": {"deployTxHash": state["deploy_tx_hash"], "status": "active"}}  # fmt: skip
+        return {"jsonrpc": "2.0", "id": rpc["id"], "result": result}
+
+    with requests_mock.Mocker() as m:
+        m.post(f"{IcxQuery('lisbon').api_endpoint}/api/v3", json=_respond)
+        yield state
+
+
+def test_abi_is_cached_and_revalidated_by_deploy_hash(node, monkeypatch):
+    icx = IcxQuery("lisbon")
+    methods = AbiCache.get_methods(icx, CONTRACT)
+    assert list(methods) == ["transfer"]
+    assert methods["transfer"]["inputs"][1] == {"name": "_data", "type": "bytes", "optional": True}  # fmt: skip
+    assert list(AbiCache.get_methods(icx, CONTRACT, readonly=True)) == ["balanceOf"]
+    assert node["methods"] == ["icx_call", "icx_getScoreApi"]
+
+    # A new process reads the entry from the on-disk cache without any request.
+    monkeypatch.setattr(AbiCache, "_entries", {})
+    assert AbiCache.get_abi(icx, CONTRACT) == ABI
+    assert len(node["methods"]) == 2
+
+    # Once the TTL expires, an unchanged contract is only revalidated...
+    monkeypatch.setattr(AbiCache, "_get_ttl", staticmethod(lambda: 0))
+    AbiCache.get_abi(icx, CONTRACT)
+    assert node["methods"][2:] == ["icx_call"]
+
+    # ...and an updated contract has its ABI fetched again.
+    node["deploy_tx_hash"] = "0x" + "b" * 64
+    AbiCache.get_abi(icx, CONTRACT)
+    assert node["methods"][3:] == ["icx_call", "icx_getScoreApi"]
+
+
+def test_coerce_converts_user_input():
+    assert AbiCache.coerce("int", "0x10") == 16
+    assert AbiCache.coerce("int", "16") == 16
+    # Leading zeros are decimal, not an error or octal.
+    assert AbiCache.coerce("int", "010") == 10
+    assert AbiCache.coerce("int", "-0x10") == -16
+    assert AbiCache.coerce("int", "-16") == -16
+    assert AbiCache.coerce("bool", "false") is False
+    assert AbiCache.coerce("Address", " HX" + "1" * 40) == "hx" + "1" * 40
+    with pytest.raises(ValueError):
+        AbiCache.coerce("Address", "hx123")
+
+
+def test_call_decodes_results_with_the_abi(node):
+    runner = CliRunner()
+    result = runner.invoke(app, ["call", CONTRACT, "balanceOf", "-p", "_owner=HX" + "2" * 40, "--height", "16", "-n", "lisbon"])  # fmt: skip
+    assert result.exit_code == 0 and json.loads(result.stdout) == 100
+    assert node["calls"][0] == {"to": CONTRACT, "dataType": "call", "data": {"method": "balanceOf", "params": {"_owner": "hx" + "2" * 40}}, "height": "0x10"}  # fmt: skip
+
+    result = runner.invoke(app, ["call", CONTRACT, "balanceOf", "-p", "_owner=hx" + "2" * 40, "--raw", "-n", "lisbon"])  # fmt: skip
+    assert json.loads(result.stdout) == "0x64"
+    # Writable methods and unknown params are rejected before calling.
+    assert "not a readonly method" in runner.invoke(app, ["call", CONTRACT, "transfer", "-n", "lisbon"]).stdout  # fmt: skip
+    assert "not a param" in runner.invoke(app, ["call", CONTRACT, "balanceOf", "-p", "owner=hx" + "2" * 40, "-n", "lisbon"]).stdout  # fmt: skip
+    assert len(node["calls"]) == 2
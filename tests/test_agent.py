@@ -0,0 +1,39 @@
+import threading
+import time
+
+from iconsdk.builder.transaction_builder import TransactionBuilder
+from iconsdk.signed_transaction import SignedTransaction
+from iconsdk.wallet.wallet import KeyWallet
+
+from icon_cli.agent import AgentClient, SigningAgent
+
+
+def test_agent_signs_transactions_like_the_keystore(tmp_path):
+    socket_path = str(tmp_path / "agent.sock")
+    wallet = KeyWallet.create()
+    agent = SigningAgent({"test": wallet}, ttl=30, socket_path=socket_path)
+    thread = threading.Thread(target=agent.serve_forever, daemon=True)
+    thread.start()
+    while AgentClient.get_status(socket_path) is None:
+        time.sleep(0.01)
+
+    assert AgentClient.get_wallet("missing", socket_path) is None
+    agent_wallet = AgentClient.get_wallet("test", socket_path)
+    assert agent_wallet.get_address() == wallet.get_address()
+
+    tx = (
+        TransactionBuilder()
+        .to("hx0000000000000000000000000000000000000001")
+        .value(1)
+        .nid(1)
+        .timestamp(1_000_000)
+        .build()
+    )
+    signed_by_agent = SignedTransaction(tx, agent_wallet, 100_000)
+    signed_by_wallet = SignedTransaction(tx, wallet, 100_000)
+    assert signed_by_agent.signed_transaction_dict == signed_by_wallet.signed_transaction_dict  # fmt: skip
+
+    AgentClient.request({"action": "stop"}, socket_path)
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert agent.wallets == {}
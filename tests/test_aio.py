@@ -0,0 +1,144 @@
+import asyncio
+import threading
+import time
+from decimal import Decimal
+
+import pytest
+from aiohttp import web
+from iconsdk.exception import JSONRPCException
+from iconsdk.signed_transaction import SignedTransaction
+from iconsdk.wallet.wallet import KeyWallet
+
+from icon_cli.aio import AsyncIcxQuery, AsyncIcxTx
+from icon_cli.config import Config
+from icon_cli.icx import IcxQuery, IcxTx
+from icon_cli.models import AppConfig, IcxNetwork
+
+
+def test_queries_match_the_sync_client(mock_node):
+    addresses = [f"hx{i:040x}" for i in range(1, 21)]
+
+    async def query():
+        async with AsyncIcxQuery("mainnet") as icx:
+            balances = await icx.gather(*[icx.get_balance(address) for address in addresses])  # fmt: skip
+            token_balance = await icx.get_token_balance(addresses[0], "BALN", "mainnet")  # fmt: skip
+            in_loop = await icx.get_balance(addresses[0], in_loop=True)
+            decimals = await icx.call("cx" + "1" * 40, "decimals")
+            block = await icx.get_block()
+            tx = await icx.get_transaction(f"0x{mock_node.height:056x}{1:08x}")
+            return balances, token_balance, in_loop, decimals, block, tx
+
+    balances, token_balance, in_loop, decimals, block, tx = asyncio.run(query())
+    assert balances == [Decimal(i) for i in range(1, 21)]
+    assert token_balance == Decimal(1)
+    assert in_loop == 10**18
+    assert decimals == "0x12"
+    assert block["height"] == mock_node.height
+    assert tx == IcxQuery("mainnet").get_transaction(tx["txHash"])
+    assert tx["blockHeight"] == mock_node.height and tx["txIndex"] == 1
+
+
+def test_connector_limits_requests_in_flight(mock_node, monkeypatch):
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+    get_balance = mock_node._rpc_icx_getBalance
+
+    def _slow_get_balance(params):
+        with lock:
+            in_flight.append(1)
+            peak.append(len(in_flight))
+        time.sleep(0.05)
+        with lock:
+            in_flight.pop()
+        return get_balance(params)
+
+    monkeypatch.setattr(mock_node, "_rpc_icx_getBalance", _slow_get_balance)
+
+    async def query():
+        async with AsyncIcxQuery("mainnet", max_connections=3) as icx:
+            return await icx.gather(*[icx.get_balance(f"hx{i:040x}") for i in range(12)])  # fmt: skip
+
+    assert len(asyncio.run(query())) == 12
+    assert max(peak) == 3
+
+
+def test_transactions_are_signed_with_estimated_step_limits(mock_node, monkeypatch):  # fmt: skip
+    wallet = KeyWallet.create()
+    monkeypatch.setattr(IcxTx, "_load_keystore", staticmethod(lambda name, password: wallet))  # fmt: skip
+    contract = "cx" + "1" * 40
+
+    async def send():
+        async with await AsyncIcxTx.load("mainnet", "test", None) as icx:
+            call = icx.build_call_transaction(contract, 0, "transfer", {"_value": 1}, timestamp=10**15)  # fmt: skip
+            transfer = icx.build_transaction("hx" + "3" * 40, 1, timestamp=10**15)
+            return call, transfer, await icx.send_transaction(call), await icx.send_transaction(transfer, 150_000)  # fmt: skip
+
+    call, transfer, call_hash, transfer_hash = asyncio.run(send())
+    step_limit = IcxTx("mainnet", "test", None).estimate_step_limit(call)
+    assert step_limit < IcxTx.DEFAULT_STEP_LIMIT
+    assert mock_node.sent[call_hash]["stepLimit"] == hex(step_limit)
+    assert mock_node.sent[call_hash]["signature"] == SignedTransaction(call, wallet, step_limit).signed_transaction_dict["signature"]  # fmt: skip
+    assert mock_node.sent[transfer_hash]["stepLimit"] == hex(150_000)
+    assert mock_node.sent[transfer_hash]["from"] == wallet.get_address()
+
+
+def test_errors_raise_jsonrpc_exceptions(mock_node):
+    async def query():
+        async with AsyncIcxQuery("mainnet") as icx:
+            return await icx.gather(
+                icx.call("cx" + "1" * 40, "unknown"),
+                icx.get_block(mock_node.height + 1),
+                icx.get_balance("hx" + "0" * 39 + "1"),
+                return_exceptions=True,
+            )
+
+    unknown_method, unknown_block, balance = asyncio.run(query())
+    assert isinstance(unknown_method, JSONRPCException)
+    assert unknown_method.message["code"] == -32601
+    assert isinstance(unknown_block, JSONRPCException)
+    assert unknown_block.message["code"] == -31004
+    # One failed query doesn't affect the others.
+    assert balance == Decimal(1)
+
+
+def test_requests_fail_over_across_the_endpoint_pool(mock_node, monkeypatch):
+    # A gateway in front of a node answers with an HTML error page.
+    responses = {"status": 502}
+
+    async def _gateway(request):
+        return web.Response(status=responses["status"], text="<html>Gateway</html>")
+
+    def _use_endpoints(urls):
+        network = IcxNetwork(name="mainnet", api_endpoint=urls[0], api_endpoints=urls[1:], nid=1, tracker_endpoint=mock_node.url)  # fmt: skip
+        monkeypatch.setattr(Config, "_read_config", classmethod(lambda cls: AppConfig(custom_networks={"mainnet": network})))  # fmt: skip
+
+    async def query():
+        app = web.Application()
+        app.router.add_post("/api/v3", _gateway)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        gateway = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        try:
+            # The custom network's gateway fails, so the request goes to the node.
+            _use_endpoints([gateway, mock_node.url])
+            async with AsyncIcxQuery("mainnet") as icx:
+                balance = await icx.get_balance("hx" + "0" * 39 + "1")
+                status = icx.pool.get_status()
+
+            # A gateway that answers 200 with something other than JSON.
+            responses["status"] = 200
+            _use_endpoints([gateway])
+            async with AsyncIcxQuery("mainnet") as icx:
+                error = (await icx.gather(icx.get_balance("hx" + "0" * 40), return_exceptions=True))[0]  # fmt: skip
+            return balance, status, error
+        finally:
+            await runner.cleanup()
+
+    balance, status, error = asyncio.run(query())
+    assert balance == Decimal(1)
+    assert [(endpoint["available"], endpoint["failures"]) for endpoint in status] == [(False, 1), (True, 0)]  # fmt: skip
+    assert "502" in status[0]["last_error"]
+    assert isinstance(error, JSONRPCException) and "Unknown response: <html>Gateway" in error.message  # fmt: skip
@@ -0,0 +1,111 @@
+import requests_mock
+
+from icon_cli.batch import IcxBatch
+
+API_URL = "https://api.icon.community/api/v3"
+
+
+def _echo_balances(request, context):
+    # Answer in reverse order to make sure results are mapped back by id.
+    responses = []
+    for rpc in reversed(request.json()):
+        if rpc["params"]["address"] == "hx0000000000000000000000000000000000000bad":
+            responses.append({"jsonrpc": "2.0", "id": rpc["id"], "error": {"code": -32602, "message": "bad"}})  # fmt: skip
+        else:
+            responses.append({"jsonrpc": "2.0", "id": rpc["id"], "result": hex(len(responses))})  # fmt: skip
+    return responses
+
+
+def test_batch_maps_results_in_order_with_per_item_errors():
+    addresses = [f"hx{i:040x}" for i in range(5)] + ["hx0000000000000000000000000000000000000bad"]  # fmt: skip
+    with requests_mock.Mocker() as m:
+        m.post(API_URL, json=_echo_balances)
+        with IcxBatch(API_URL, chunk_size=4) as batch:
+            for address in addresses:
+                batch.get_balance(address)
+        assert m.call_count == 2
+
+    results = batch.results
+    assert len(results) == len(addresses)
+    assert [result.params["address"] for result in results] == addresses
+    assert [result.result for result in results[:4]] == [3, 2, 1, 0]
+    assert results[-1].ok is False
+    assert results[-1].error["code"] == -32602
+
+
+def test_batch_transport_error_only_fails_its_chunk():
+    with requests_mock.Mocker() as m:
+        m.post(
+            API_URL,
+            [
+                {"json": [{"jsonrpc": "2.0", "id": 0, "result": "0x1"}]},
+                {"status_code": 502, "text": "Bad Gateway"},
+            ],
+        )
+        batch = IcxBatch(API_URL, chunk_size=1)
+        batch.call("cx0000000000000000000000000000000000000000", "getIISSInfo")
+        batch.call("cx0000000000000000000000000000000000000000", "getIISSInfo")
+        results = batch.execute()
+
+    assert results[0].ok and results[0].result == "0x1"
+    assert not results[1].ok
+
+
+def test_wait_for_results_polls_pending_hashes_in_batches(monkeypatch):
+    from icon_cli import icx as icx_module
+    from icon_cli.icx import IcxQuery
+
+    monkeypatch.setattr(icx_module.time, "sleep", lambda seconds: None)
+    icx = IcxQuery("lisbon")
+    tx_hashes = [f"0x{i:064x}" for i in range(250)]
+    polled = set()
+
+    def _results(request, context):
+        # Even transactions are final on the first poll and odd ones on the second.
+        responses = []
+        for rpc in request.json():
+            tx_hash = rpc["params"]["txHash"]
+            if int(tx_hash, 16) % 2 == 1 and tx_hash not in polled:
+                polled.add(tx_hash)
+                responses.append({"jsonrpc": "2.0", "id": rpc["id"], "error": {"code": -31002, "message": "Pending"}})  # fmt: skip
+            else:
+                result = {"txHash": tx_hash, "status": "0x1", "blockHeight": "0x1"}
+                responses.append({"jsonrpc": "2.0", "id": rpc["id"], "result": result})  # fmt: skip
+        return responses
+
+    with requests_mock.Mocker() as m:
+        m.post(f"{icx.api_endpoint}/api/v3", json=_results)
+        results = icx.wait_for_results(tx_hashes, timeout=60)
+        assert m.call_count == 5
+
+    assert list(results) == tx_hashes
+    assert all(result.ok and result.result["status"] == 1 for result in results.values())  # fmt: skip
+
+
+def test_get_balances_fetches_icx_and_tokens_in_one_batch():
+    from icon_cli.icx import IcxQuery
+
+    icx = IcxQuery("mainnet")
+    addresses = [f"hx{i:040x}" for i in range(3)]
+
+    def _balances(request, context):
+        responses = []
+        for rpc in request.json():
+            if rpc["method"] == "icx_getBalance":
+                result = hex(int(rpc["params"]["address"][2:], 16) * 10**18)
+            elif rpc["params"]["data"]["params"]["_owner"] == addresses[2]:
+                responses.append({"jsonrpc": "2.0", "id": rpc["id"], "error": {"code": -30001, "message": "Reverted"}})  # fmt: skip
+                continue
+            else:
+                result = hex(15 * 10**17)
+            responses.append({"jsonrpc": "2.0", "id": rpc["id"], "result": result})
+        return responses
+
+    with requests_mock.Mocker() as m:
+        m.post(f"{icx.api_endpoint}/api/v3", json=_balances)
+        balances = icx.get_balances(addresses, ["baln"])
+        assert m.call_count == 1
+
+    assert [str(row["ICX"]) for row in balances] == ["0", "1", "2"]
+    assert str(balances[1]["BALN"]) == "1.5"
+    assert balances[2]["BALN"] is None
@@ -0,0 +1,116 @@
+import json
+
+import pytest
+import requests_mock
+from iconsdk.wallet.wallet import KeyWallet
+
+from icon_cli import DEFAULT_NETWORKS
+from icon_cli.bulk import BulkSender
+from icon_cli.icx import IcxTx
+
+NETWORK = "lisbon"
+API_URL = DEFAULT_NETWORKS[NETWORK].api_endpoint + "/api/v3"
+
+
+class MockNode:
+    def __init__(self, fail_after: int = None) -> None:
+        self.fail_after = fail_after
+        self.sent = []
+
+    def __call__(self, request, context):
+        payload = request.json()
+        if isinstance(payload, list):
+            return json.dumps([self._handle(rpc) for rpc in payload])
+        if payload["method"] == "icx_sendTransaction":
+            if self.fail_after is not None and len(self.sent) >= self.fail_after:
+                context.status_code = 502
+                return "Bad Gateway"
+        return json.dumps(self._handle(payload))
+
+    def _handle(self, rpc):
+        if rpc["method"] == "icx_sendTransaction":
+            tx_hash = BulkSender._get_tx_hash(rpc["params"])
+            self.sent.append(tx_hash)
+            return {"jsonrpc": "2.0", "id": rpc["id"], "result": tx_hash}
+        if rpc["method"] == "icx_call":
+            # Transfers are priced from the governance contract's step costs.
+            return {"jsonrpc": "2.0", "id": rpc["id"], "result": {"default": "0x186a0", "input": "0xc8"}}  # fmt: skip
+        tx_hash = rpc["params"]["txHash"]
+        if tx_hash not in self.sent:
+            return {"jsonrpc": "2.0", "id": rpc["id"], "error": {"code": -32602, "message": "Pending"}}  # fmt: skip
+        result = {"txHash": tx_hash, "status": "0x1", "blockHeight": "0x64", "blockHash": "0x" + "0" * 64, "txIndex": "0x0", "to": "hx" + "0" * 40, "stepUsed": "0x1", "stepPrice": "0x1", "cumulativeStepUsed": "0x1", "eventLogs": [], "logsBloom": "0x0"}  # fmt: skip
+        return {"jsonrpc": "2.0", "id": rpc["id"], "result": result}
+
+
+@pytest.fixture
+def icx(monkeypatch):
+    wallet = KeyWallet.create()
+    monkeypatch.setattr(IcxTx, "_load_keystore", staticmethod(lambda name, password: wallet))  # fmt: skip
+    return IcxTx(NETWORK, "test", None)
+
+
+@pytest.fixture
+def batch_file(tmp_path):
+    path = tmp_path / "payouts.csv"
+    lines = ["to,value"] + [f"hx{i:040x},1.5" for i in range(4)]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def test_read_rows_parses_csv_and_jsonl(batch_file, tmp_path):
+    rows = BulkSender.read_rows(batch_file)
+    assert [row["index"] for row in rows] == [0, 1, 2, 3]
+    assert str(rows[0]["value"]) == "1.5"
+
+    jsonl_file = tmp_path / "calls.jsonl"
+    jsonl_file.write_text(json.dumps({"to": "cx" + "0" * 40, "method": "claim", "params": {"a": "0x1"}}) + "\n")  # fmt: skip
+    row = BulkSender.read_rows(jsonl_file)[0]
+    assert row["method"] == "claim" and row["params"] == {"a": "0x1"}
+
+
+def test_interrupted_batch_resumes_without_resending(icx, batch_file, tmp_path):
+    results_path = tmp_path / "payouts.results.jsonl"
+    rows = BulkSender.read_rows(batch_file)
+    node = MockNode(fail_after=2)
+
+    with requests_mock.Mocker() as m:
+        m.post(API_URL, text=node)
+        results = BulkSender(icx, results_path, concurrency=1).send(rows)
+        assert [result["status"] for result in results] == ["success", "success", "failed", "failed"]  # fmt: skip
+
+        node.fail_after = None
+        resumed = BulkSender(icx, results_path, concurrency=2).send(rows)
+
+    assert [result["status"] for result in resumed] == ["success"] * 4
+    assert len(node.sent) == 4
+    assert {result["step_limit"] for result in resumed} == {120_000}
+    # Failed rows are re-signed with their recorded timestamp, so their hash is unchanged.
+    assert [result["tx_hash"] for result in resumed] == [result["tx_hash"] for result in results]  # fmt: skip
+    assert len(results_path.read_text().splitlines()) == 4
+
+
+def test_resumed_rows_past_the_timestamp_window_are_restamped(icx, batch_file, tmp_path):  # fmt: skip
+    results_path = tmp_path / "payouts.results.jsonl"
+    rows = BulkSender.read_rows(batch_file)
+    node = MockNode(fail_after=2)
+
+    with requests_mock.Mocker() as m:
+        m.post(API_URL, text=node)
+        results = BulkSender(icx, results_path, concurrency=1).send(rows)
+
+        # The run is resumed an hour later, and row 1 was recorded as failed although
+        # its transaction made it on chain.
+        expired_results = [{**result, "timestamp": result["timestamp"] - 3600 * 10**6} for result in results]  # fmt: skip
+        expired_results[1]["status"] = "failed"
+        BulkSender.write_results(results_path, dict(enumerate(expired_results)))
+        node.fail_after = None
+        resumed = BulkSender(icx, results_path, concurrency=1).send(rows)
+
+    assert [result["status"] for result in resumed] == ["success"] * 4
+    # Row 1 is found on chain instead of being sent again, and rows 2 and 3 are signed
+    # with a new timestamp and hash.
+    assert len(node.sent) == 4
+    assert resumed[1]["tx_hash"] == results[1]["tx_hash"]
+    assert [result["tx_hash"] for result in resumed[2:]] == node.sent[2:]
+    assert all(resumed[i]["tx_hash"] != results[i]["tx_hash"] for i in [2, 3])
+    assert all(resumed[i]["timestamp"] > results[i]["timestamp"] for i in [2, 3])
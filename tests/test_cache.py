@@ -0,0 +1,53 @@
+import threading
+
+import pytest
+
+from icon_cli.cache import Cache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(Cache, "CACHE_FILE", str(tmp_path / "cache.db"))
+    monkeypatch.setattr(Cache, "_local", threading.local())
+    monkeypatch.setattr(Cache, "_max_size", 2048)
+    return Cache
+
+
+def test_only_height_pinned_requests_are_cacheable(cache):
+    call = {"to": "cx0000000000000000000000000000000000000000", "dataType": "call"}
+    assert cache.is_cacheable("icx_call", call) is False
+    assert cache.is_cacheable("icx_call", {**call, "height": "0x10"}) is True
+    assert cache.is_cacheable("icx_getBlockByHeight", {"height": "0x10"}) is True
+    assert cache.is_cacheable("icx_getLastBlock") is False
+    assert cache.is_cacheable("icx_sendTransaction", {"height": "0x10"}) is False
+
+
+def test_get_set_round_trip(cache):
+    params = {"height": "0x10"}
+    assert cache.get("mainnet", "icx_getBlockByHeight", params) == (False, None)
+    cache.set("mainnet", "icx_getBlockByHeight", params, {"height": 16})
+    assert cache.get("mainnet", "icx_getBlockByHeight", params) == (True, {"height": 16})  # fmt: skip
+    assert cache.get("lisbon", "icx_getBlockByHeight", params) == (False, None)
+
+
+def test_recent_hits_are_not_written(cache):
+    params = {"height": "0x10"}
+    cache.set("mainnet", "icx_getBlockByHeight", params, {"height": 16})
+    db = cache._get_connection()
+    changes = db.total_changes
+    for _ in range(3):
+        assert cache.get("mainnet", "icx_getBlockByHeight", params)[0] is True
+    assert db.total_changes == changes
+
+
+def test_evict_removes_least_recently_used_entries(cache, monkeypatch):
+    monkeypatch.setattr(Cache, "TOUCH_INTERVAL", -1)
+    for height in range(10):
+        cache.set("mainnet", "icx_getBlockByHeight", {"height": hex(height)}, "x" * 500)  # fmt: skip
+    # Touch the first entry so it's the most recently used one.
+    cache.get("mainnet", "icx_getBlockByHeight", {"height": "0x0"})
+
+    assert cache.evict() > 0
+    assert cache.stats()["size"] <= 2048
+    assert cache.get("mainnet", "icx_getBlockByHeight", {"height": "0x0"})[0] is True
+    assert cache.get("mainnet", "icx_getBlockByHeight", {"height": "0x1"})[0] is False
@@ -0,0 +1,51 @@
+import os
+
+import pytest
+import yaml
+
+from icon_cli import config as config_module
+from icon_cli.config import Config
+from icon_cli.models import AppConfig
+
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    path = tmp_path / "config.yml"
+    path.write_text(yaml.safe_dump({"default_network": "lisbon"}))
+    monkeypatch.setattr(config_module, "CONFIG_FILE", str(path))
+    monkeypatch.setattr(Config, "_config", None)
+    monkeypatch.setattr(Config, "_config_mtime", None)
+    return path
+
+
+def test_config_is_parsed_once_until_modified(config_file, monkeypatch):
+    loads = []
+    safe_load = yaml.safe_load
+    monkeypatch.setattr(yaml, "safe_load", lambda f: loads.append(1) or safe_load(f))
+
+    assert Config.get_default_network() == "lisbon"
+    assert Config.get_default_network() == "lisbon"
+    assert Config.get_default_keystore() is None
+    assert len(loads) == 1
+
+    config_file.write_text(yaml.safe_dump({"default_network": "berlin"}))
+    stat = os.stat(config_file)
+    os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert Config.get_default_network() == "berlin"
+    assert len(loads) == 2
+
+
+def test_read_config_returns_a_copy(config_file):
+    config = Config.read_config()
+    config.default_network = "sejong"
+    assert Config.get_default_network() == "lisbon"
+
+    Config.write_config(config)
+    assert Config.get_default_network() == "sejong"
+
+
+def test_tracker_rate_limit_must_be_positive():
+    assert AppConfig(tracker_rate_limit=1).tracker_rate_limit == 1
+    for rate_limit in [0, -1]:
+        with pytest.raises(ValueError):
+            AppConfig(tracker_rate_limit=rate_limit)
@@ -0,0 +1,39 @@
+from decimal import Decimal
+
+from icon_cli.cps import Cps
+from icon_cli.decoder import Decoder
+
+
+def test_schema_decodes_declared_fields_only():
+    decode = Decoder.compile({"data": [{"votes": "int", "budget": "loop", "active": "bool"}], "count": "int"})  # fmt: skip
+    result = {
+        "data": [
+            {"votes": "0x10", "budget": hex(15 * 10**17), "active": "0x0", "tx_hash": "0xabc", "title": "0x1 more"},  # fmt: skip
+            {"votes": "", "budget": None, "active": "0x1"},
+        ],
+        "count": "0x2",
+    }
+    assert decode(result) == {
+        "data": [
+            {"votes": 16, "budget": Decimal("1.5"), "active": False, "tx_hash": "0xabc", "title": "0x1 more"},  # fmt: skip
+            # Unset numbers are left as they are.
+            {"votes": "", "budget": None, "active": True},
+        ],
+        "count": 2,
+    }
+
+
+def test_abi_outputs_decode_scalars_and_leave_structures():
+    assert Decoder.from_abi({"outputs": [{"type": "int"}]})("0x64") == 100
+    assert Decoder.from_abi({"outputs": [{"type": "str"}]})("0x64") == "0x64"
+    assert Decoder.from_abi({"outputs": [{"type": "dict"}]})({"a": "0x1"}) == {
+        "a": "0x1"
+    }
+
+
+def test_cps_results_keep_hash_strings(mock_node):
+    report = {"report_hash": "0x" + "ab" * 32, "timestamp": "0x5", "approved_votes": "0x3", "budget_adjustment": "0x0"}  # fmt: skip
+    mock_node.call_handlers["get_progress_reports"] = lambda to, params: {"data": [dict(report)], "count": "0x1"}  # fmt: skip
+    progress_reports = Cps("mainnet").get_progress_reports()
+    assert progress_reports["count"] == 1
+    assert progress_reports["data"][0] == {**report, "timestamp": 5, "approved_votes": 3, "budget_adjustment": 0}  # fmt: skip
@@ -0,0 +1,75 @@
+import pytest
+import requests
+import requests_mock
+
+from icon_cli.endpoints import EndpointPool
+
+FIRST = "https://first.example.com"
+SECOND = "https://second.example.com"
+
+
+def _rpc(method: str) -> dict:
+    return {"jsonrpc": "2.0", "method": method, "id": 1}
+
+
+def _ok(request, context):
+    return {"jsonrpc": "2.0", "id": 1, "result": "0x1"}
+
+
+def test_reads_fail_over_and_failed_endpoints_cool_down():
+    pool = EndpointPool("mainnet", [FIRST, SECOND])
+    with requests_mock.Mocker() as m:
+        m.post(f"{FIRST}/api/v3", exc=requests.ConnectionError)
+        m.post(f"{SECOND}/api/v3", json=_ok)
+        assert pool.post("/api/v3", _rpc("icx_getBalance"))["result"] == "0x1"
+        # The failed endpoint is tried last until its cooldown ends.
+        assert [e.url for e in pool.get_route()] == [SECOND, FIRST]
+        pool.post("/api/v3", [_rpc("icx_getBalance")] * 2)
+        assert m.call_count == 3
+
+    first, second = pool.get_status()
+    assert (first["available"], first["failures"]) == (False, 1)
+    assert second["available"] is True and second["latency_ms"] is not None
+
+
+def test_transactions_are_not_resubmitted_after_a_gateway_error():
+    pool = EndpointPool("mainnet", [FIRST, SECOND])
+    with requests_mock.Mocker() as m:
+        m.post(f"{FIRST}/api/v3", status_code=502, text="Bad Gateway")
+        m.post(f"{SECOND}/api/v3", json=_ok)
+        with pytest.raises(requests.HTTPError):
+            pool.post("/api/v3", _rpc("icx_sendTransaction"))
+        assert m.call_count == 1
+
+        # A refused connection never reached the node, so the transaction is sent to
+        # the next endpoint, which then gets the result lookups too.
+        pool.endpoints[0].available_at = 0
+        m.post(f"{FIRST}/api/v3", exc=requests.ConnectionError)
+        pool.post("/api/v3", _rpc("icx_sendTransaction"))
+        pool.endpoints[0].available_at = 0
+        pool.endpoints[0].latency = 0.001
+        pool.post("/api/v3", _rpc("icx_getTransactionResult"))
+        assert [r.url for r in m.request_history[1:]] == [f"{url}/api/v3" for url in [FIRST, SECOND, SECOND]]  # fmt: skip
+
+
+def test_faster_endpoints_get_most_requests():
+    pool = EndpointPool("mainnet", [FIRST, SECOND])
+    pool.endpoints[0].latency = 0.5
+    pool.endpoints[1].latency = 0.05
+    firsts = [pool.get_route()[0].url for _ in range(500)]
+    assert firsts.count(SECOND) > 450
+
+
+def test_health_check_cools_down_lagging_endpoints():
+    pool = EndpointPool("mainnet", [FIRST, SECOND])
+
+    def _block(height):
+        return lambda request, context: {"jsonrpc": "2.0", "id": 1, "result": {"height": height}}  # fmt: skip
+
+    with requests_mock.Mocker() as m:
+        m.post(f"{FIRST}/api/v3", json=_block(1000))
+        m.post(f"{SECOND}/api/v3", json=_block(1000 - EndpointPool.MAX_BLOCK_LAG - 1))
+        status = pool.check_health()
+
+    assert [endpoint["available"] for endpoint in status] == [True, False]
+    assert "blocks behind" in status[1]["last_error"]
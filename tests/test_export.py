@@ -0,0 +1,68 @@
+import json
+
+import requests_mock
+from typer.testing import CliRunner
+
+from icon_cli.commands.query import app
+from icon_cli.export import CsvBlockWriter
+from icon_cli.icx import IcxQuery
+
+NETWORK = "lisbon"
+LAST_HEIGHT = 249
+
+
+def _block(height: int) -> dict:
+    tx = {"version": "0x3", "from": "hx" + "1" * 40, "to": "hx" + "2" * 40, "value": "0x1", "stepLimit": "0x1", "timestamp": "0x1", "nid": "0x2", "signature": "", "txHash": f"0x{height:064x}", "dataType": "base", "data": {}}  # fmt: skip
+    return {"version": "2.0", "height": height, "time_stamp": height * 2_000_000, "block_hash": f"{height:064x}", "prev_block_hash": f"{height - 1:064x}", "merkle_tree_root_hash": "", "peer_id": "hx" + "3" * 40, "signature": "", "next_leader": "", "confirmed_transaction_list": [tx]}  # fmt: skip
+
+
+def _node(request, context):
+    payload = request.json()
+    if isinstance(payload, dict):
+        return {"jsonrpc": "2.0", "id": payload["id"], "result": _block(LAST_HEIGHT)}
+    responses = []
+    for rpc in payload:
+        if rpc["method"] == "icx_getBlockByHeight":
+            result = _block(int(rpc["params"]["height"], 16))
+        else:
+            result = {"txHash": rpc["params"]["txHash"], "status": "0x1", "blockHeight": "0x1"}  # fmt: skip
+        responses.append({"jsonrpc": "2.0", "id": rpc["id"], "result": result})
+    return responses
+
+
+def test_iter_blocks_yields_in_height_order_with_results():
+    icx = IcxQuery(NETWORK)
+    with requests_mock.Mocker() as m:
+        m.post(f"{icx.api_endpoint}/api/v3", json=_node)
+        blocks = list(icx.iter_blocks(5, 104, include_results=True, window=4, chunk_size=7))  # fmt: skip
+
+    assert [block["height"] for block in blocks] == list(range(5, 105))
+    assert blocks[0]["confirmed_transaction_list"][0]["result"]["status"] == 1
+
+
+def test_export_resumes_after_a_partial_line(tmp_path):
+    output = tmp_path / "blocks.jsonl"
+    runner = CliRunner()
+    with requests_mock.Mocker() as m:
+        m.post(f"{IcxQuery(NETWORK).api_endpoint}/api/v3", json=_node)
+        result = runner.invoke(app, ["blocks", "--from", "0", "--to", "99", "-o", str(output), "-n", NETWORK])  # fmt: skip
+        assert result.exit_code == 0
+
+        # Simulate an export that was killed in the middle of writing a block.
+        with open(output, "a") as f:
+            f.write('{"height": 100, "block_ha')
+
+        result = runner.invoke(app, ["blocks", "--from", "0", "-o", str(output), "-n", NETWORK, "--resume"])  # fmt: skip
+        assert result.exit_code == 0
+
+    heights = [json.loads(line)["height"] for line in output.read_text().splitlines()]
+    assert heights == list(range(0, LAST_HEIGHT + 1))
+
+
+def test_csv_writer_reports_last_height(tmp_path):
+    output = tmp_path / "blocks.csv"
+    with CsvBlockWriter(output) as writer:
+        assert writer.get_last_height() is None
+        writer.write(_block(7) | {"confirmed_transaction_list": []})
+    assert CsvBlockWriter(output).get_last_height() == 7
+    assert output.read_text().splitlines()[0].startswith("height,")
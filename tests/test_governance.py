@@ -0,0 +1,49 @@
+from decimal import Decimal
+
+from icon_cli.governance import Governance
+
+
+def _proposal(index: int, status: int) -> dict:
+    voters = [{"id": f"0x{index:062x}{i:02x}", "address": f"hx{i:040x}", "name": f"validator {i}", "amount": hex(10**18), "timestamp": hex(index)} for i in range(1, 4)]  # fmt: skip
+    return {"id": f"0x{index:064x}", "proposer": "hx" + "1" * 40, "proposerName": "validator", "status": hex(status), "startBlockHeight": hex(index * 100), "endBlockHeight": hex(index * 100 + 50), "contents": {"title": f"Proposal {index}", "description": "", "type": "0x1"}, "vote": {"agree": {"list": voters[:2], "amount": hex(2 * 10**18)}, "disagree": {"list": voters[2:], "amount": hex(10**18)}, "noVote": {"list": ["hx" + "f" * 40], "amount": "0x0"}}}  # fmt: skip
+
+
+def test_only_open_proposals_are_refreshed(mock_node, tmp_path):
+    for index in range(1, 26):
+        proposal = _proposal(index, 0 if index > 22 else 4)
+        mock_node.proposals[proposal["id"]] = proposal
+    governance = Governance("mainnet", str(tmp_path / "governance.json"))
+
+    proposals = governance.get_proposals()
+    assert [proposal["startBlockHeight"] for proposal in proposals] == [index * 100 for index in range(25, 0, -1)]  # fmt: skip
+    assert proposals[0]["status"] == 0 and proposals[0]["vote"]["agree"] == {"count": 2, "amount": Decimal(2)}  # fmt: skip
+    # Three pages of 10 fit in a single batch post.
+    assert mock_node.http_requests == 1
+
+    # Proposal 25 is applied and a new one is registered.
+    mock_node.proposals[f"0x{25:064x}"]["status"] = "0x4"
+    new_proposal = _proposal(26, 0)
+    mock_node.proposals[new_proposal["id"]] = new_proposal
+    mock_node.reset_counters()
+    proposals = governance.get_proposals()
+    assert [proposal["status"] for proposal in proposals[:4]] == [0, 4, 0, 0]
+    # One page for each open status, and the proposal that closed.
+    assert mock_node.rpc_requests == 2 + 1
+
+    # A full page widens the next batch of that status.
+    for index in range(27, 47):
+        proposal = _proposal(index, 0)
+        mock_node.proposals[proposal["id"]] = proposal
+    mock_node.reset_counters()
+    assert len(governance.get_proposals()) == 46
+    assert mock_node.http_requests == 2 and mock_node.rpc_requests == 2 + 2
+
+    # Closed proposals keep their votes, open ones are fetched every time.
+    mock_node.reset_counters()
+    votes = governance.get_votes(f"0x{25:064x}")
+    assert mock_node.rpc_requests == 0
+    assert [(vote["address"], vote["vote"]) for vote in votes] == [("hx" + "0" * 39 + "1", "agree"), ("hx" + "0" * 39 + "2", "agree"), ("hx" + "0" * 39 + "3", "disagree"), ("hx" + "f" * 40, "none")]  # fmt: skip
+    assert votes[0]["amount"] == Decimal(1) and votes[0]["timestamp"] == 25
+    governance.get_votes(new_proposal["id"])
+    governance.get_votes(new_proposal["id"])
+    assert mock_node.rpc_requests == 2
@@ -0,0 +1,49 @@
+import pytest
+import requests_mock
+from iconsdk.exception import JSONRPCException
+
+from icon_cli.httpreq import HttpReq
+from icon_cli.models import AppConfig
+from icon_cli.provider import IcxProvider
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    monkeypatch.setattr(HttpReq, "_sessions", {})
+    yield HttpReq._sessions
+    HttpReq.close_sessions()
+
+
+def test_one_session_is_reused_per_origin(mock_node, sessions, monkeypatch):
+    host = mock_node.url.split("://")[1]
+    monkeypatch.setattr(HttpReq, "_config", AppConfig(http_pool_size=3, http_pool_sizes={host: 7}))  # fmt: skip
+
+    for _ in range(3):
+        HttpReq.post(f"{mock_node.url}/api/v3", {"jsonrpc": "2.0", "method": "icx_getLastBlock", "id": 1})  # fmt: skip
+    session = HttpReq.get_session(f"{mock_node.url}/api/v3")
+    assert HttpReq.get_session(f"{mock_node.url}/api/v1/transactions") is session
+    assert list(sessions) == [mock_node.url]
+    # Keep-alive connections are reused, so one connection served every request.
+    pools = session.get_adapter(mock_node.url).poolmanager.pools
+    assert len(pools) == 1
+    assert pools[list(pools.keys())[0]].num_connections == 1
+
+    # The pool size comes from http_pool_sizes for a configured host, and from
+    # http_pool_size for any other.
+    assert session.get_adapter(mock_node.url)._pool_maxsize == 7
+    other_session = HttpReq.get_session("https://api.icon.community/api/v3")
+    assert other_session is not session
+    assert other_session.get_adapter("https://api.icon.community")._pool_maxsize == 3
+
+
+def test_provider_raises_jsonrpc_exceptions(mock_node, sessions):
+    provider = IcxProvider(mock_node.url)
+    assert provider.make_request("icx_getLastBlock")["height"] == mock_node.height
+    with pytest.raises(JSONRPCException) as e:
+        provider.make_request("icx_getBlockByHeight", {"height": hex(mock_node.height + 1)})  # fmt: skip
+    assert e.value.message["code"] == -31004
+
+    with requests_mock.Mocker() as m:
+        m.post("https://node.example/api/v3", text="<html>Maintenance</html>")
+        with pytest.raises(JSONRPCException, match="Unknown response: <html>Maintenance"):  # fmt: skip
+            IcxProvider("https://node.example").make_request("icx_getLastBlock")
@@ -1,27 +1,74 @@
 from icon_cli.cps import Cps
+from icon_cli.icx import IcxQuery
+from icon_cli.tracker import Tracker
 
 
-def test_cps_get_active_proposals():
+def test_cps_get_active_proposals(mock_node):
     cps = Cps("mainnet")
     proposals = cps.get_active_proposals()
     assert type(proposals) == list
-    print("get_active_proposals() OK!")
+    assert [proposal["contributor_address"] for proposal in proposals] == mock_node.contributors  # fmt: skip
+    assert proposals[0]["last_progress_report"] == 1
 
 
-def test_cps_get_progress_reports():
+def test_cps_get_progress_reports(mock_node):
     cps = Cps("mainnet")
     progress_reports = cps.get_progress_reports()
-    assert type(proposals) == list
-    print(progress_reports)
+    assert type(progress_reports["data"]) == list
+    assert progress_reports["data"][0]["timestamp"] == mock_node.height
 
 
-def test_cps_get_contributors():
+def test_cps_get_contributors(mock_node):
     cps = Cps("mainnet")
     contributors = cps.get_contributors()
     assert type(contributors) == list
-    print("get_contributors() OK!")
+    assert contributors == mock_node.contributors
+
+
+def test_cps_snapshots_are_collected_in_two_posts_and_diffed(mock_node, tmp_path):
+    cps = Cps("mainnet")
+    old = cps.get_snapshot()
+    # Everything but the active proposals in one post, and the proposals in another.
+    assert mock_node.http_requests == 3
+    assert len(old["active_proposals"]) == len(mock_node.contributors)
+    assert old["treasury"] == {"ICX": 10**24, "bnUSD": 5 * 10**23}
+    old_path = Cps.write_snapshot(old, tmp_path)
+
+    # The new contributor's report is on a second page of progress reports.
+    mock_node.contributors.append(f"hx{99:040x}")
+    mock_node.height += 10
+    mock_node.call_handlers["get_remaining_fund"] = lambda to, params: {"ICX": hex(9 * 10**23), "bnUSD": hex(5 * 10**23)}  # fmt: skip
+    mock_node.reset_counters()
+    new = cps.get_snapshot()
+    assert mock_node.http_requests == 3
+    assert [report["report_hash"] for report in new["progress_reports"]][-2:] == [f"reporthx{10:040x}", f"reporthx{99:040x}"]  # fmt: skip
+    new_path = Cps.write_snapshot(new, tmp_path)
+    assert Cps.list_snapshots("mainnet", tmp_path) == [old_path, new_path]
+
+    diff = Cps.diff_snapshots(Cps.read_snapshot(old_path), Cps.read_snapshot(new_path))
+    assert diff["contributors"] == {"added": [f"hx{99:040x}"], "removed": []}
+    assert [proposal["contributor_address"] for proposal in diff["active_proposals"]["added"]] == [f"hx{99:040x}"]  # fmt: skip
+    # Every progress report's timestamp is the mock node's height.
+    assert len(diff["progress_reports"]["changed"]) == 10
+    assert diff["progress_reports"]["changed"][f"reporthx{1:040x}"] == {"timestamp": [old["height"], old["height"] + 10]}  # fmt: skip
+    assert [report["report_hash"] for report in diff["progress_reports"]["added"]] == [f"reporthx{99:040x}"]  # fmt: skip
+    assert diff["validators"] == {"added": [], "removed": [], "changed": {}}
+    assert diff["treasury"] == {"ICX": [10**24, 9 * 10**23]}
+
+    # A height that was already collected is answered from the cache.
+    mock_node.reset_counters()
+    assert cps.get_snapshot(old["height"])["contributors"] == old["contributors"]
+    assert mock_node.rpc_requests == 0
+
 
+def test_mock_node_answers_batches_and_tracker_pages(mock_node):
+    icx = IcxQuery("mainnet")
+    addresses = [f"hx{i:040x}" for i in range(250)]
+    rows = icx.get_balances(addresses, chunk_size=100)
+    assert [row["ICX"] for row in rows] == [i % 10**6 for i in range(250)]
+    assert icx.get_block()["height"] == mock_node.height
+    # One post per chunk of balances, plus one for the last block.
+    assert mock_node.http_requests == 4
 
-test_cps_get_active_proposals()
-test_cps_get_contributors()
-test_cps_get_progress_reports()
+    transactions = list(Tracker("mainnet").iter_address_transactions(addresses[1]))
+    assert len(transactions) == mock_node.tracker_transactions
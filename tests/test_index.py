@@ -0,0 +1,60 @@
+import requests_mock
+
+from icon_cli.icx import IcxQuery
+from icon_cli.index import Indexer
+
+NETWORK = "lisbon"
+SENDER = "hx" + "1" * 40
+RECEIVER = "hx" + "2" * 40
+TOKEN = "cx" + "3" * 40
+
+
+def _block(height: int) -> dict:
+    # Every block has one token transfer from SENDER to RECEIVER.
+    tx = {"version": "0x3", "from": SENDER, "to": TOKEN, "value": "0x0", "stepLimit": "0x1", "timestamp": "0x1", "nid": "0x2", "signature": "", "txHash": f"0x{height:064x}", "dataType": "call", "data": {"method": "transfer", "params": {"_to": RECEIVER, "_value": "0x1"}}}  # fmt: skip
+    return {"version": "2.0", "height": height, "time_stamp": height, "block_hash": f"{height:064x}", "prev_block_hash": "", "merkle_tree_root_hash": "", "peer_id": "", "signature": "", "next_leader": "", "confirmed_transaction_list": [tx]}  # fmt: skip
+
+
+def _tx_result(tx_hash: str) -> dict:
+    event_log = {"scoreAddress": TOKEN, "indexed": ["Transfer(Address,Address,int,bytes)", SENDER, RECEIVER, "0x1"], "data": ["0x"]}  # fmt: skip
+    return {"txHash": tx_hash, "status": "0x1", "blockHeight": "0x1", "stepUsed": "0x64", "eventLogs": [event_log]}  # fmt: skip
+
+
+def _node(request, context):
+    responses = []
+    for rpc in request.json():
+        if rpc["method"] == "icx_getBlockByHeight":
+            result = _block(int(rpc["params"]["height"], 16))
+        else:
+            result = _tx_result(rpc["params"]["txHash"])
+        responses.append({"jsonrpc": "2.0", "id": rpc["id"], "result": result})
+    return responses
+
+
+def test_sync_is_incremental_and_indexes_addresses(tmp_path):
+    indexer = Indexer(NETWORK, str(tmp_path / "index.db"))
+    commits = []
+    with requests_mock.Mocker() as m:
+        m.post(f"{IcxQuery(NETWORK).api_endpoint}/api/v3", json=_node)
+        assert indexer.sync(10, 49, include_results=True, chunk_size=7, commit_interval=15, on_commit=commits.append) == 40  # fmt: skip
+        # A second sync continues from the checkpoint and keeps the results setting.
+        assert indexer.sync(0, 59, chunk_size=7) == 10
+
+    assert commits == [24, 39, 49]
+    status = indexer.get_status()
+    assert (status["first_height"], status["last_height"]) == (10, 59)
+    assert status["transactions"] == 50 and status["event_logs"] == 50
+
+    sender_txs = indexer.get_address_transactions(SENDER, limit=5)
+    assert [tx["height"] for tx in sender_txs] == [59, 58, 57, 56, 55]
+    assert sender_txs[0]["method"] == "transfer" and sender_txs[0]["status"] == 1
+    assert len(indexer.get_contract_transactions(TOKEN, "transfer", limit=1000)) == 50
+    assert indexer.get_contract_transactions(TOKEN, "claim") == []
+    assert len(indexer.get_method_transactions("transfer", limit=1000)) == 50
+
+    # RECEIVER never sends a transaction, but shows up in Transfer events.
+    assert indexer.get_address_transactions(RECEIVER) == []
+    events = indexer.get_event_logs(RECEIVER, limit=1000)
+    assert len(events) == 50
+    assert events[0]["indexed"] == [SENDER, RECEIVER, "0x1"]
+    indexer.close()
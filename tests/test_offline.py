@@ -0,0 +1,70 @@
+import time
+
+import pytest
+from iconsdk.wallet.wallet import KeyWallet
+
+from icon_cli import DEFAULT_NETWORKS
+from icon_cli.bulk import BulkSender
+from icon_cli.icx import IcxQuery
+from icon_cli.offline import OfflineTx
+
+
+@pytest.fixture
+def rows(tmp_path):
+    path = tmp_path / "payouts.jsonl"
+    lines = [f'{{"to": "hx{i:040x}", "value": "1.5"}}' for i in range(6)]
+    lines.append('{"to": "cx' + "1" * 40 + '", "method": "transfer", "params": {"_value": 10}}')  # fmt: skip
+    path.write_text("\n".join(lines) + "\n")
+    return BulkSender.read_rows(path)
+
+
+def test_built_files_sign_in_parallel_like_in_process(rows, tmp_path, monkeypatch):
+    wallet = KeyWallet.create()
+    transactions = OfflineTx.build(rows, wallet.get_address(), "mainnet", 1, 10**6)
+    OfflineTx.write(transactions, tmp_path / "txs")
+    paths, transactions = zip(*OfflineTx.read(tmp_path / "txs"))
+    assert [path.name for path in paths][:2] == ["000000.json", "000001.json"]
+    assert transactions[0]["params"]["value"] == hex(15 * 10**17)
+    assert transactions[6]["params"]["data"] == {"method": "transfer", "params": {"_value": "0xa"}}  # fmt: skip
+
+    signed = OfflineTx.sign(list(transactions), wallet, timestamp=10**15)
+    monkeypatch.setattr(OfflineTx, "MIN_PARALLEL_SIGNATURES", 1)
+    assert OfflineTx.sign(list(transactions), wallet, processes=2, timestamp=10**15) == signed  # fmt: skip
+    assert [tx["tx_hash"] for tx in signed] == [OfflineTx.get_tx_hash(tx["params"]) for tx in signed]  # fmt: skip
+
+    with pytest.raises(ValueError):
+        OfflineTx.sign(list(transactions), KeyWallet.create())
+
+
+def test_signed_transactions_are_submitted_in_batches(rows, mock_node):
+    wallet = KeyWallet.create()
+    nid = DEFAULT_NETWORKS["mainnet"].nid
+    transactions = OfflineTx.build(rows, wallet.get_address(), "mainnet", nid, 10**6)
+    icx = IcxQuery("mainnet")
+    with pytest.raises(ValueError):
+        OfflineTx.submit(icx, transactions)
+
+    mock_node.reset_counters()
+    results = OfflineTx.submit(icx, OfflineTx.sign(transactions, wallet), chunk_size=3)  # fmt: skip
+    assert [result["status"] for result in results] == ["submitted"] * 7
+    assert {result["tx_hash"] for result in results} == set(mock_node.sent)
+    assert mock_node.http_requests == 3
+
+
+def test_signing_stamps_the_current_time(rows, monkeypatch):
+    wallet = KeyWallet.create()
+    built_at = 1_600_000_000
+    transactions = OfflineTx.build(rows, wallet.get_address(), "mainnet", 1, 10**6, built_at * 10**6)  # fmt: skip
+
+    # Files signed a day after they were built get the time they were signed at.
+    monkeypatch.setattr(time, "time", lambda: built_at + 86400)
+    signed = OfflineTx.sign(transactions, wallet)
+    assert {tx["params"]["timestamp"] for tx in signed} == {hex((built_at + 86400) * 10**6)}  # fmt: skip
+    assert [tx["tx_hash"] for tx in signed] == [OfflineTx.get_tx_hash(tx["params"]) for tx in signed]  # fmt: skip
+    assert not {tx["tx_hash"] for tx in signed} & {tx["tx_hash"] for tx in transactions}
+
+    # Signing signed files again re-stamps them.
+    resigned = OfflineTx.sign(signed, wallet, timestamp=(built_at + 90000) * 10**6)
+    assert resigned[0]["params"]["timestamp"] == hex((built_at + 90000) * 10**6)
+    assert resigned[0]["tx_hash"] != signed[0]["tx_hash"]
+    assert resigned[0]["params"]["signature"] != signed[0]["params"]["signature"]
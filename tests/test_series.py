@@ -0,0 +1,52 @@
+import pytest
+import requests_mock
+
+from icon_cli.icx import IcxQuery
+from icon_cli.series import Series
+
+ORACLE = "cx087b4164a87fdfb7b714f3bafe9dfb050fd6b132"
+
+
+def _node(request, context):
+    responses = []
+    for rpc in request.json():
+        height = int(rpc["params"]["height"], 16)
+        if rpc["method"] == "icx_getBlockByHeight":
+            result = {"version": "2.0", "height": height, "time_stamp": height * 2_000_000, "block_hash": "", "prev_block_hash": "", "merkle_tree_root_hash": "", "peer_id": "", "signature": "", "next_leader": "", "confirmed_transaction_list": []}  # fmt: skip
+        elif height < 20:
+            # The contract didn't exist yet.
+            responses.append({"jsonrpc": "2.0", "id": rpc["id"], "error": {"code": -32602, "message": "No contract"}})  # fmt: skip
+            continue
+        else:
+            result = {"rate": hex(height * 10**9)}
+        responses.append({"jsonrpc": "2.0", "id": rpc["id"], "result": result})
+    return responses
+
+
+def test_get_heights_includes_end():
+    assert Series.get_heights(0, 10, 4) == [0, 4, 8, 10]
+    assert Series.get_heights(5, 5, 100) == [5]
+
+
+def test_sample_call_uses_cached_heights_on_later_runs():
+    icx = IcxQuery("mainnet")
+    heights = Series.get_heights(0, 100, 10)
+    with requests_mock.Mocker() as m:
+        m.post(f"{icx.api_endpoint}/api/v3", json=_node)
+        rows = Series.sample_call(icx, ORACLE, "get_ref_data", heights, {"_symbol": "ICX"}, field="rate", decimals=9)  # fmt: skip
+        first_run_requests = m.call_count
+
+        extended = Series.get_heights(0, 150, 10)
+        Series.sample_call(icx, ORACLE, "get_ref_data", extended, {"_symbol": "ICX"}, field="rate", decimals=9)  # fmt: skip
+        assert m.call_count == first_run_requests + 1
+        # Only the failed and new heights were requested the second time.
+        assert len(m.request_history[-1].json()) == 2 + 2 * 5
+
+    assert [row["value"] for row in rows[:3]] == [None, None, 20]
+    assert rows[-1]["timestamp"].year == 1970
+
+
+def test_to_dataframe():
+    pytest.importorskip("pandas")
+    df = Series.to_dataframe([{"height": 1, "value": 2}])
+    assert df.loc[1, "value"] == 2
@@ -0,0 +1,44 @@
+import subprocess
+import sys
+
+# Cumulative import time budget for `icon_cli.main`, in microseconds.
+IMPORT_TIME_BUDGET = 400_000
+
+# Modules that are slow to import and should only be loaded by commands that use them.
+HEAVY_MODULES = ["iconsdk.icon_service", "iconsdk.wallet", "jsonschema", "pandas", "petl"]  # fmt: skip
+
+
+def _import_in_subprocess(module: str) -> subprocess.CompletedProcess:
+    code = f"import sys, {module}; print(','.join(sorted(sys.modules)))"
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+
+def _cumulative_import_time(importtime_output: str, module: str) -> int:
+    for line in importtime_output.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1])
+    raise AssertionError(f"{module} not found in -X importtime output.")
+
+
+def test_main_import_time_is_within_budget():
+    result = _import_in_subprocess("icon_cli.main")
+    assert _cumulative_import_time(result.stderr, "icon_cli.main") < IMPORT_TIME_BUDGET
+
+
+def test_main_does_not_import_commands_or_heavy_modules():
+    result = _import_in_subprocess("icon_cli.main")
+    modules = result.stdout.strip().split(",")
+    assert not [module for module in modules if module.startswith("icon_cli.commands")]
+    assert not [module for module in modules if module.startswith(tuple(HEAVY_MODULES))]  # fmt: skip
+
+
+def test_query_commands_do_not_import_heavy_modules():
+    result = _import_in_subprocess("icon_cli.commands.query")
+    modules = result.stdout.strip().split(",")
+    assert not [module for module in modules if module.startswith(tuple(HEAVY_MODULES))]  # fmt: skip
@@ -0,0 +1,72 @@
+import json
+import math
+
+import pytest
+import requests
+import requests_mock
+from iconsdk.wallet.wallet import KeyWallet
+
+from icon_cli.icx import IcxQuery, IcxTx
+from icon_cli.steps import StepEstimator
+
+CONTRACT = "cx" + "1" * 40
+
+
+def _call(value: int) -> dict:
+    return {"from": "hx" + "2" * 40, "to": CONTRACT, "dataType": "call", "data": {"method": "transfer", "params": {"_to": "hx" + "3" * 40, "_value": hex(value)}}}  # fmt: skip
+
+
+@pytest.fixture
+def estimates(mock_node, monkeypatch):
+    requests = []
+    estimate_step = mock_node._rpc_debug_estimateStep
+    monkeypatch.setattr(mock_node, "_rpc_debug_estimateStep", lambda params: requests.append(params) or estimate_step(params))  # fmt: skip
+    return requests
+
+
+def test_estimates_are_shared_by_calls_with_the_same_shape(mock_node, estimates):
+    icx = IcxQuery("mainnet")
+    step_limit = StepEstimator.get_step_limit(icx, _call(1))
+    # The mock node charges 200 steps per byte of data, and the default margin is 20%.
+    assert step_limit == math.ceil((100_000 + 200 * len(json.dumps(_call(1)["data"]))) * 1.2)  # fmt: skip
+    assert StepEstimator.get_step_limit(icx, _call(2)) == step_limit
+    assert len(estimates) == 1
+    # A much larger value is estimated again.
+    StepEstimator.get_step_limit(icx, _call(10**30))
+    assert len(estimates) == 2
+
+    # Transfers to wallets are priced from the step costs, which are cached like the
+    # estimates.
+    transfer = {"from": "hx" + "2" * 40, "to": "hx" + "3" * 40, "value": "0x1"}
+    mock_node.reset_counters()
+    assert StepEstimator.get_step_limit(icx, transfer) == 120_000
+    assert StepEstimator.get_step_limit(icx, transfer) == 120_000
+    assert mock_node.rpc_requests == 1 and len(estimates) == 2
+
+
+def test_nodes_without_the_debug_api_use_the_default_step_limit(mock_node, monkeypatch):  # fmt: skip
+    monkeypatch.setattr(mock_node, "_rpc_debug_estimateStep", None)
+    wallet = KeyWallet.create()
+    monkeypatch.setattr(IcxTx, "_load_keystore", staticmethod(lambda name, password: wallet))  # fmt: skip
+    icx = IcxTx("mainnet", "test", None)
+
+    tx_hash = icx.send_transaction(icx.build_call_transaction(CONTRACT, 0, "transfer", {"_value": 1}))  # fmt: skip
+    assert mock_node.sent[tx_hash]["stepLimit"] == hex(IcxTx.DEFAULT_STEP_LIMIT)
+    mock_node.reset_counters()
+    assert icx.estimate_step_limit(icx.build_call_transaction(CONTRACT, 0, "claim")) == IcxTx.DEFAULT_STEP_LIMIT  # fmt: skip
+    assert mock_node.rpc_requests == 0
+
+
+def test_only_missing_debug_apis_are_remembered(mock_node):
+    icx = IcxQuery("mainnet")
+    with requests_mock.Mocker(real_http=True) as m:
+        # A gateway error or a dropped connection is retried by the next transaction.
+        m.post(f"{mock_node.url}/api/v3d", status_code=502, text="<html>Bad Gateway</html>")  # fmt: skip
+        assert StepEstimator.estimate_steps(icx, _call(1)) is None
+        m.post(f"{mock_node.url}/api/v3d", exc=requests.ConnectionError)  # fmt: skip
+        assert StepEstimator.estimate_steps(icx, _call(1)) is None
+        assert StepEstimator._unsupported == set()
+
+        m.post(f"{mock_node.url}/api/v3d", status_code=404, text="<html>Not Found</html>")  # fmt: skip
+        assert StepEstimator.estimate_steps(icx, _call(1)) is None
+        assert StepEstimator._unsupported == {"mainnet"}
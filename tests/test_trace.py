@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from icon_cli.icx import IcxQuery
+from icon_cli.trace import Tracer
+
+
+@pytest.fixture
+def tracer(monkeypatch):
+    monkeypatch.setattr(Tracer, "enabled", False)
+    monkeypatch.setattr(Tracer, "_hooks", [])
+    Tracer.reset()
+    yield Tracer
+    Tracer.reset()
+
+
+def test_requests_and_cache_lookups_are_counted(tracer, mock_node):
+    events = []
+    tracer.add_hook(events.append)
+    icx = IcxQuery("mainnet")
+    icx.get_balance("hx" + "1" * 40)
+    # A block at a fixed height is cached, so the second lookup is a hit.
+    icx.get_block(10)
+    icx.get_block(10)
+
+    counters = tracer.get_counters()
+    assert counters["requests"] == 2 and counters["errors"] == 0
+    assert counters["methods"]["icx_getBalance"]["requests"] == 1
+    block_counters = counters["methods"]["icx_getBlockByHeight"]
+    assert (block_counters["requests"], block_counters["cache_hits"], block_counters["cache_misses"]) == (1, 1, 1)  # fmt: skip
+    assert counters["bytes_sent"] > 0 and counters["bytes_received"] > 0
+    # Hooks get every event even though tracing isn't enabled.
+    assert [event["type"] for event in events] == ["request", "cache", "request", "cache"]  # fmt: skip
+    assert tracer.get_events() == []
+
+
+def test_enabled_tracer_writes_json_and_chrome_traces(tracer, mock_node, tmp_path):
+    tracer.enable()
+    with tracer.phase("work"):
+        IcxQuery("mainnet").get_balance("hx" + "1" * 40)
+
+    tracer.write(tmp_path / "trace.json")
+    trace = json.loads((tmp_path / "trace.json").read_text())
+    assert [event["name"] for event in trace["events"]] == ["icx_getBalance", "work"]
+    assert trace["counters"]["phases"]["work"] > 0
+
+    tracer.write(tmp_path / "trace.chrome.json", "chrome")
+    chrome_events = json.loads((tmp_path / "trace.chrome.json").read_text())["traceEvents"]  # fmt: skip
+    assert {event["ph"] for event in chrome_events} == {"X"}
+    assert chrome_events[0]["args"]["status"] == 200
@@ -0,0 +1,49 @@
+import requests_mock
+
+from icon_cli import DEFAULT_NETWORKS
+from icon_cli import tracker as tracker_module
+from icon_cli.tracker import Tracker
+
+ADDRESS = "hx" + "1" * 40
+TOTAL = 250
+URL = f"{DEFAULT_NETWORKS['mainnet'].tracker_endpoint}/api/v1/transactions/address/{ADDRESS}/"  # fmt: skip
+
+
+def test_iter_address_transactions_pages_in_order_and_retries(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(tracker_module.time, "sleep", sleeps.append)
+    requests = []
+
+    def _page(request, context):
+        skip, limit = int(request.qs["skip"][0]), int(request.qs["limit"][0])
+        requests.append(skip)
+        # Rate limit the second page once.
+        if skip == 100 and requests.count(100) == 1:
+            context.status_code = 429
+            context.headers["Retry-After"] = "3"
+            return []
+        context.headers["X-Total-Count"] = str(TOTAL)
+        return [{"hash": f"0x{i:064x}"} for i in range(skip, min(skip + limit, TOTAL))]
+
+    with requests_mock.Mocker() as m:
+        m.get(URL, json=_page)
+        transactions = list(Tracker("mainnet").iter_address_transactions(ADDRESS, prefetch=3))  # fmt: skip
+
+    assert [int(tx["hash"], 16) for tx in transactions] == list(range(TOTAL))
+    # Pages past the total are never requested.
+    assert sorted(requests) == [0, 100, 100, 200]
+    assert any(seconds >= 2.9 for seconds in sleeps)
+
+
+def test_iter_address_transactions_stops_at_a_short_page_without_total(monkeypatch):
+    monkeypatch.setattr(tracker_module.time, "sleep", lambda seconds: None)
+
+    def _page(request, context):
+        skip = int(request.qs["skip"][0])
+        return [{"hash": str(i)} for i in range(skip, min(skip + 10, 35))]
+
+    with requests_mock.Mocker() as m:
+        m.get(URL, json=_page)
+        transactions = list(Tracker("mainnet").iter_address_transactions(ADDRESS, page_size=10, prefetch=2))  # fmt: skip
+
+    assert [tx["hash"] for tx in transactions] == [str(i) for i in range(35)]
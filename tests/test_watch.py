@@ -0,0 +1,149 @@
+import asyncio
+import threading
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from icon_cli.icx import IcxQuery
+from icon_cli.watch import Watcher
+
+CONTRACT = "cx" + "1" * 40
+SIGNATURE = "Transfer(Address,Address,int,bytes)"
+
+
+class MockWebsocket:
+    """
+    Serves a node's block and event websockets. Every connection acknowledges the
+    subscription, sends `per_connection` notifications from the requested height and
+    then closes, so clients have to reconnect and resume. With `stall`, connections go
+    quiet instead of closing, without answering pings, until the server stops. With
+    `reject`, every subscription is rejected.
+    """
+
+    def __init__(self, per_connection: int = 2, stall: bool = False, reject: bool = False) -> None:  # fmt: skip
+        self.per_connection = per_connection
+        self.stall = stall
+        self.reject = reject
+        self.subscriptions = []
+        self.loop = asyncio.new_event_loop()
+        self._stopping = asyncio.Event()
+        self._runner = None
+        self._thread = None
+        self.url = None
+
+    def __enter__(self) -> "MockWebsocket":
+        app = web.Application()
+        app.router.add_get("/api/v3/icon_dex/{kind}", self._handle)
+        self._runner = web.AppRunner(app)
+        self.loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        self.loop.run_until_complete(site.start())
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}/api/v3/icon_dex"
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.loop.call_soon_threadsafe(self._stopping.set)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.run_until_complete(self._runner.cleanup())
+        self.loop.close()
+
+    async def _handle(self, request):
+        transport = request.transport
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        kind = request.match_info["kind"]
+        subscription = await ws.receive_json()
+        self.subscriptions.append((kind, int(subscription["height"], 16)))
+        if self.reject is True:
+            await ws.send_json({"code": -32600, "message": "Unsupported"})
+            await ws.close()
+            return ws
+        await ws.send_json({"code": 0})
+        start = int(subscription["height"], 16)
+        for height in range(start, start + self.per_connection):
+            notification = {"hash": "0x" + "0" * 64, "height": hex(height)}
+            if kind == "event":
+                notification.update({"index": "0x1", "events": ["0x0"]})
+            await ws.send_json(notification)
+        if self.stall is True:
+            # Pings are only answered while the handler reads, and the connection is
+            # dropped without a closing handshake.
+            await self._stopping.wait()
+            transport.close()
+            return ws
+        await ws.close()
+        return ws
+
+
+def _add_transfer_events(node, heights) -> None:
+    for height in heights:
+        log = {"scoreAddress": CONTRACT, "indexed": [SIGNATURE, "hx" + "2" * 40, "hx" + "3" * 40, hex(height)], "data": ["0x"]}  # fmt: skip
+        node.event_logs[f"0x{height:056x}{1:08x}"] = [log]
+
+
+def test_websocket_streams_resume_after_reconnecting(mock_node):
+    start = mock_node.height - 10
+    _add_transfer_events(mock_node, range(start, start + 5))
+    with MockWebsocket() as websocket:
+        watcher = Watcher(IcxQuery("mainnet"), "websocket", ws_endpoint=websocket.url)
+        blocks = watcher.iter_blocks(start)
+        assert [next(blocks)["height"] for _ in range(5)] == list(range(start, start + 5))  # fmt: skip
+        blocks.close()
+
+        events = watcher.iter_events(CONTRACT, SIGNATURE, start)
+        delivered = [next(events) for _ in range(3)]
+        events.close()
+
+    assert websocket.subscriptions[:3] == [("block", start), ("block", start + 2), ("block", start + 4)]  # fmt: skip
+    # An event subscription resumes from the block of the last event, and events that
+    # were already delivered are skipped.
+    assert [height for kind, height in websocket.subscriptions if kind == "event"][:2] == [start, start + 1]  # fmt: skip
+    assert [(event["height"], event["tx_index"], event["log_index"]) for event in delivered] == [(height, 1, 0) for height in range(start, start + 3)]  # fmt: skip
+    assert delivered[0]["args"] == ["hx" + "2" * 40, "hx" + "3" * 40, start, "0x"]
+
+
+def test_silent_websockets_are_reconnected(mock_node, monkeypatch):
+    monkeypatch.setattr(Watcher, "HEARTBEAT_INTERVAL", 0.2)
+    monkeypatch.setattr(Watcher, "MIN_RECONNECT_DELAY", 0)
+    start = mock_node.height - 10
+    with MockWebsocket(stall=True) as websocket:
+        blocks = Watcher(IcxQuery("mainnet"), "websocket", ws_endpoint=websocket.url).iter_blocks(start)  # fmt: skip
+        assert [next(blocks)["height"] for _ in range(3)] == list(range(start, start + 3))  # fmt: skip
+    blocks.close()
+    assert websocket.subscriptions[:2] == [("block", start), ("block", start + 2)]
+
+
+def test_falls_back_to_polling_without_a_websocket(mock_node, monkeypatch):
+    # The mock node answers websocket handshakes with a 404, like a gateway would, and
+    # produces a block every time it's polled.
+    get_last_block = mock_node._rpc_icx_getLastBlock
+
+    def _produce_block(params):
+        mock_node.height += 1
+        return get_last_block(params)
+
+    monkeypatch.setattr(mock_node, "_rpc_icx_getLastBlock", _produce_block)
+    start = mock_node.height - 1
+    _add_transfer_events(mock_node, [start + 2])
+
+    blocks = Watcher(IcxQuery("mainnet"), poll_interval=0.01).iter_blocks(start)
+    assert [next(blocks)["height"] for _ in range(4)] == list(range(start, start + 4))
+    blocks.close()
+
+    events = Watcher(IcxQuery("mainnet"), "poll", 0.01).iter_events(CONTRACT, SIGNATURE, start)  # fmt: skip
+    assert next(events)["tx_hash"] == f"0x{start + 2:056x}{1:08x}"
+
+    with pytest.raises(aiohttp.ClientError):
+        next(Watcher(IcxQuery("mainnet"), "websocket").iter_blocks(start))
+
+    # A node that rejects the subscription is polled too.
+    with MockWebsocket(reject=True) as websocket:
+        blocks = Watcher(IcxQuery("mainnet"), poll_interval=0.01, ws_endpoint=websocket.url).iter_blocks(start)  # fmt: skip
+        assert next(blocks)["height"] == start
+        blocks.close()
+    assert websocket.subscriptions == [("block", start)]